@@ -7,9 +7,13 @@ import glob
 import numpy as np
 import json
 import math
+import functools
 import random
 import time
 import pygame
+from rect_array import RectArray
+from scheduling import SimulationLod
+from spatial import KDTree
 
 
 class Keyframe:
@@ -245,8 +249,7 @@ class hit_box(pygame.sprite.Sprite):
         self.rect.x, self.rect.y = cords
         self.colliding = False
         self.parentRect = parentRect
-        # mask for pixel perfect collision detection
-        self.mask = pygame.mask.from_surface(self.image)
+        # masks for pixel perfect collision are made on demand by collision.MaskCache
         
     def isColliding(self, value):
         self.colliding = value    
@@ -275,6 +278,15 @@ class hb_group(pygame.sprite.Group):
         # Update the original sprite objects with the new colliding status
         for e, status in zip(self.sprites(), colliding_status):
             e.colliding = status
+
+    def walkable_update(self, walk_grid):
+        '''set the colliding status of every hit box with one vectorized WalkGrid lookup\n
+        returns the colliding mask in sprites() order'''
+        sprites = self.sprites()
+        colliding_status = walk_grid.colliding([e.rect for e in sprites])
+        for e, status in zip(sprites, colliding_status.tolist()):
+            e.colliding = status
+        return colliding_status
             
     def __repr__(self):
         return f'hit_box_group({self.sprites()})'
@@ -288,7 +300,60 @@ class agro_group(pygame.sprite.Group):
     
     def __str__(self):
         return f'{self.sprites()}'
-        
+
+class YSortGroup(pygame.sprite.Group):
+    def __init__(self, *sprites):
+        """drop in sprite group that draws its sprites back to front by rect.bottom\n
+        the draw order is kept between frames and repaired with an insertion sort pass,
+        entities only move a few pixels per frame so the order is almost sorted already
+        and the repair is close to linear instead of a full O(n log n) sort every frame.\n
+        """
+        # order must exist before Group.__init__ adds any sprites
+        self._order = []
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self._order.append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self._order.remove(sprite)
+
+    def sprites(self):
+        """return the sprites in their current draw order\n"""
+        return list(self._order)
+
+    def sort(self):
+        """repair the draw order with a single insertion sort pass\n
+        returns the number of shifts made, 0 means the order was still valid.
+        """
+        order = self._order
+        # read each key once, sprites like Enemy replace their rect every frame
+        keys = [spr.rect.bottom for spr in order]
+        shifts = 0
+        for i in range(1, len(order)):
+            key = keys[i]
+            if keys[i-1] <= key:
+                continue
+            spr = order[i]
+            j = i - 1
+            while j >= 0 and keys[j] > key:
+                keys[j+1] = keys[j]
+                order[j+1] = order[j]
+                j -= 1
+                shifts += 1
+            keys[j+1] = key
+            order[j+1] = spr
+        return shifts
+
+    def draw(self, surface, bgsurf=None, special_flags=0):
+        self.sort()
+        return super().draw(surface, bgsurf, special_flags)
+
+    def __repr__(self):
+        return f'YSortGroup({len(self)} sprites)'
+
 class Player(PlayerInterface):
     def __init__(self, screen):
         # Call the parent inits to inherit from both classes
@@ -354,6 +419,8 @@ class Player(PlayerInterface):
         self.show_debug = False
         self.dot = self.get_dot()
         self.no_clip = False
+        # collision.WalkGrid, when set the hit box is swept along each move instead of snapping back after overlap
+        self.walk_grid = None
 
     @property
     def colliding(self):
@@ -376,7 +443,9 @@ class Player(PlayerInterface):
         #
         # check for player collision with the test_collision_group
         self.player_collision()
+        start = self.x, self.y
         self.wasd_movement()
+        self.sweep_movement(start)
         self.pos_update()
         self.hit_box_update()
         
@@ -430,6 +499,17 @@ class Player(PlayerInterface):
             self.x += self.speed
             self.current_idle = self.idle_walk_r
 
+    def sweep_movement(self, start: tuple):
+        '''clip this frame's move against the walk grid, the rest of the move slides along walls\n'''
+        if self.walk_grid is None or self.no_clip:
+            return
+        velocity = self.x - start[0], self.y - start[1]
+        # the hit box still sits where the last frame left it, place it at the start of this move first
+        self.collisionSprite.parentRect = self.image.get_rect(topleft=start)
+        self.collisionSprite.update()
+        (dx, dy), _, _ = self.walk_grid.move(self.collisionSprite.rect, velocity)
+        self.x, self.y = start[0] + dx, start[1] + dy
+
     def player_collision(self):
         if not self.no_clip:
             # check for collision with the test_collision_group
@@ -477,6 +557,8 @@ class EnemyPath:
         self.x = random.randint(0, self.screen_size[0])
         self.y = random.randint(0, self.screen_size[1])
         self.frame_count = frame_count
+        # optional callable returning the next goal, e.g. a reachable point from navigation.NavGrid
+        self.pick = None
 
     def __iter__(self):
         return self
@@ -486,10 +568,17 @@ class EnemyPath:
         # calculate current game tic from frame count
         game_tic = self.frame_count//self.game_tics
         if game_tic >= self.game_tics:
+            self.renew()
+        return (self.x, self.y)
+
+    def renew(self):
+        '''pick the next point now, a TimerWheel driven enemy calls it when its goal timer fired\n'''
+        if self.pick is not None:
+            self.x, self.y = self.pick()
+        else:
             self.x = random.randint(0, self.screen_size[0])
             self.y = random.randint(0, self.screen_size[1])
-            self.frame_count = 0
-        return (self.x, self.y)
+        self.frame_count = 0
              
 class AniRig(pygame.sprite.Group):
     def __init__(self, screen, offSet=[[1,1]], imgPaths: list = [], surfSize: tuple = (100, 100), cords: tuple = (0, 0)):
@@ -671,33 +760,41 @@ class NpcVision(pygame.sprite.Sprite):
     def __init__(self, parentRect: tuple, radius: int, screen: pygame.Surface):
         super().__init__()
         self.screen = screen
-        self.image = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
         self.transparentColor = (255, 255, 255, 15)
         self.size = (radius, radius)
-        self.rect = pygame.draw.circle(self.image, self.transparentColor, self.size, radius)
+        self.rect = pygame.Rect(0, 0, radius*2, radius*2)
         self.radius = radius
         self.parentRect = parentRect
         self.rect.center = parentRect.center
-        self.image.fill((0,0,0,0))
-        pygame.draw.circle(self.image,
-                           self.transparentColor,
-                           self.size,
-                           self.radius)
+        # the circle surface is only made if the sprite is drawn,
+        # the agro range is normally shown by the LightMap pass
+        self._image = None
+
+    @property
+    def image(self):
+        if self._image is None:
+            self._image = pygame.Surface((self.radius*2, self.radius*2), pygame.SRCALPHA)
+            self.refresh()
+        return self._image
     
     def refresh(self):
-        self.image.fill((0,0,0,0))
-        pygame.draw.circle(self.image, self.transparentColor, self.size, self.radius)
+        if self._image is None:
+            return
+        self._image.fill((0,0,0,0))
+        pygame.draw.circle(self._image, self.transparentColor, self.size, self.radius)
         
     def update(self, *args, **kwargs):
         self.rect.center = self.parentRect.center
         
 # enemy base class
 class Enemy(pygame.sprite.Sprite):
-    def __init__(self, screen, animation, img, cords: tuple = (0, 0)):
+    def __init__(self, screen, animation, img, cords: tuple = (0, 0), world_rect: pygame.Rect = None):
         super().__init__()
         self.flipped = 'right'
         self.screen = screen
         self.screen_rect = screen.get_rect()
+        # area the enemy is allowed to move in, the world can be larger than the screen
+        self.world_rect = world_rect if world_rect is not None else self.screen_rect
         self.rect = img.get_rect()
         if cords != (0, 0):
             self.rect.x, self.rect.y = cords
@@ -728,9 +825,39 @@ class Enemy(pygame.sprite.Sprite):
         # pathing sequence for the enemy to follow using a generator to yield the next point
         self.e_pathing = EnemyPath(
             random.randint(20, 40),
-            self.screen_rect.size)
+            self.world_rect.size)
         # store the last stable ground position as a fallback for collision detection
         self.stable_ground = (0, 0)
+        # collision.WalkGrid, when set moves are swept against it and slide along walls
+        self.walk_grid = None
+        # collision.DistanceField, when set the enemy steers away from walls closer than wall_margin
+        self.distance_field = None
+        self.wall_margin = 40
+        # navigation.NavGrid, when set roam goals are reachable and the enemy follows an A* route to them
+        self.nav = None
+        self.route = []
+        self.route_goal = None
+        # navigation.FlowField toward the player, when set chasing follows it around walls
+        self.flow = None
+        # navigation.PathJobs, when set routes are searched on worker threads
+        self.path_jobs = None
+        # set by EnemyGroup.lod_update, frames the next move covers (0 skips moving this frame)
+        # and whether the enemy is in the camera view, enemies out of view are not animated
+        self.lod_step = 1
+        self.visible = True
+        # set while a scheduling.AiScheduler decides for the enemy, think plans a per frame velocity
+        # on the enemy's turn and glide moves along it every frame, for at most glide_left pixels
+        self.scheduled = False
+        self.planning = False
+        self.velocity = (0, 0)
+        self.glide_left = 0
+        # scheduling.TimerWheel, when set roaming stretches and new roam goals are started by timers
+        # instead of checking the frame count every frame
+        self.timers = None
+        self.roaming = False
+        self.goal_due = False
+        self.roam_timer = None
+        self.goal_timer = None
         # ----------------------------
         # this is all debug garbage for agro circle and pathing line, will be removed later.
         # controls how debug groups interact with flags set during runtime from dev console.
@@ -753,7 +880,12 @@ class Enemy(pygame.sprite.Sprite):
         # self.walking_ani.get_frame()
         self.idle_sprite = self.clean_image.copy()
         self.idle_sprite_l = pygame.transform.flip(self.clean_image.copy(), True, False)
+        # flipped walking frames are made once, frames keep the same surface between loops
+        # so caches keyed on the image (mip levels) stay valid
+        self.flipped_frames = {}
         self.updateMe = False
+        # set while an EnemyBatch moves this enemy
+        self.batched = False
         self.saveCount = 0
         self.update([(self.x+2, self.y+2)])
         
@@ -772,14 +904,24 @@ class Enemy(pygame.sprite.Sprite):
     def update(self, enemy_events=[], debug=False, *args, **kwargs):
         self.show_debug = debug
         
-        
-        self.enemyMovement(enemy_events)
+        # an EnemyBatch already moved the enemy, placed its rect and picked its frame this frame
+        if self.batched:
+            return
+        if self.lod_step:
+            if self.scheduled:
+                self.glide()
+            else:
+                self.enemyMovement(enemy_events)
         
         self.handleAnimationState()
         
         self.posUpdate()
 
     def handleAnimationState(self):
+        if not self.visible:
+            # nobody sees the frame, keep the last one
+            self.updateMe = False
+            return
         match self.updateMe:
             case True:
                 image = self.walking_ani.get_frame()
@@ -787,17 +929,28 @@ class Enemy(pygame.sprite.Sprite):
                 # get the current frame of the animation
                 image = self.idle_sprite
         
+        self.showFrame(image)
+        
+        # reset the update flag for the next frame
+        self.updateMe = False
+
+    def showFrame(self, image):
+        '''show a walking frame or the idle sprite turned the way the enemy faces\n'''
         match self.flipped:
             case 'left':
-                self.tempImage = pygame.transform.flip(image, True, False)
+                self.tempImage = self.getFlippedFrame(image)
             case 'right':
-                self.tempImage = image.copy()
+                self.tempImage = image
             case 'idle':
                 self.tempImage = self.idle_sprite
-        
-        
-        # reset the update flag for the next frame
-        self.updateMe = False
+
+    def getFlippedFrame(self, image):
+        '''return the horizontally flipped copy of a frame, flipping it the first time it is seen\n'''
+        flipped = self.flipped_frames.get(id(image))
+        if flipped is None or flipped[0] is not image:
+            flipped = image, pygame.transform.flip(image, True, False)
+            self.flipped_frames[id(image)] = flipped
+        return flipped[1]
 
     def dist_from_me(self, p_x, p_y):
         '''return the distance from the player\n
@@ -808,24 +961,43 @@ class Enemy(pygame.sprite.Sprite):
     def enemyMovement(self, enemy_events):
         # move the enemy towards the player if the player is within range
         has_target = 0
-        on_screen = True if self.screen_rect.contains(self.rect) else False
+        in_world = self.world_rect.contains(self.rect)
         
-        if not self.colliding and on_screen:
+        if not self.colliding and in_world:
             self.stable_ground = (self.x, self.y)
-            my_roaming_window = self.e_pathing.frame_count % self.rand_mod > self.frame_seed
-            has_target = self.checkAggroStatus(*enemy_events)
+            if self.timers is not None:
+                my_roaming_window = self.roaming
+            else:
+                my_roaming_window = self.e_pathing.frame_count % self.rand_mod > self.frame_seed
+            # enemy_events are the positions the enemy can aggro on, players, decoys or allies
+            target = self.nearestTarget(enemy_events)
+            has_target = self.checkAggroStatus(target) if target is not None else 0
             
             # flag the enemy to update sprite
             if my_roaming_window and has_target == 0:
                 # move the enemy towards the next position in the pathing sequence
-                head_towards = next(self.e_pathing)
+                if self.goal_due:
+                    self.pickGoal()
+                if self.timers is not None:
+                    head_towards = self.e_pathing.x, self.e_pathing.y
+                else:
+                    head_towards = next(self.e_pathing)
+                if self.distance_field is not None and self.distance_field.distance(head_towards) < 0:
+                    # the target is inside a wall, pick a new one next frame instead of walking into it
+                    self.replan()
+                if self.nav is not None:
+                    head_towards = self.nextWaypoint(head_towards)
                 e_x, e_y = self.rect.center
                 dist = self.dist_from_me(*head_towards)
                 
                 if abs(dist) >= 2:
+                    # long lod steps stop on the target instead of overshooting it
                     s1, s2 = self.getScaledSpeed(
-                        dist, e_x, e_y, *head_towards)
+                        dist, e_x, e_y, *head_towards, reach=min(self.speed * self.lod_step, abs(dist)))
+                    s1, s2 = self.avoidWalls(s1, s2)
                     self.adjustRefPos(s1, s2)
+                    # a planned roam move stops on the target
+                    self.glide_left = abs(dist)
                     self.toggleFlippedFlag(s1,s2)
                     # draw a dot at the target position
                     self.path_line = (*head_towards, e_x, e_y, self.screen)
@@ -833,11 +1005,143 @@ class Enemy(pygame.sprite.Sprite):
                     
         else:
             self.x, self.y = self.stable_ground
-            self.e_pathing.frame_count += 1000000
+            self.replan()
             # self.colliding = False
-        self.e_pathing.frame_count += 1
+        # while planning glide keeps the roam clock
+        if not self.planning:
+            self.e_pathing.frame_count += self.lod_step
+
+    def think(self, enemy_events):
+        '''decide where to head next, called by the AiScheduler on the enemy's turn before the update\n'''
+        self.planning = True
+        self.velocity, self.glide_left = (0, 0), 0
+        self.enemyMovement(enemy_events)
+        self.planning = False
+
+    def glide(self):
+        '''move along the last decision, every frame including the ones without a turn\n'''
+        self.e_pathing.frame_count += self.lod_step
+        if self.colliding or not self.world_rect.contains(self.rect):
+            # the next decision moves the enemy back to stable ground
+            return
+        v_x, v_y = self.velocity
+        length = math.hypot(v_x, v_y) * self.lod_step
+        if length == 0 or self.glide_left <= 0:
+            return
+        moved = min(length, self.glide_left)
+        self.glide_left -= moved
+        scale = moved / length * self.lod_step
+        self.adjustRefPos(v_x * scale, v_y * scale)
+
+    def setNavigation(self, nav):
+        self.nav = nav
+        self.route = []
+        self.route_goal = None
+        if nav is None:
+            self.e_pathing.pick = None
+        else:
+            self.e_pathing.pick = lambda: nav.random_goal(self.collisionSprite.rect.center)
+
+    def nextWaypoint(self, goal):
+        '''point the rect center should head to for the next step of the route to goal\n
+        routes are planned for the hit box, the rect center is steered by the same offset.'''
+        hb_x, hb_y = self.collisionSprite.rect.center
+        if goal != self.route_goal:
+            self.route_goal = goal
+            if self.path_jobs is not None:
+                # head straight for the goal until the route arrives
+                self.route = []
+                self.path_jobs.submit((hb_x, hb_y), goal, functools.partial(self.setRoute, goal), owner=self)
+            else:
+                self.setRoute(goal, self.nav.find_path((hb_x, hb_y), goal))
+        # drop the waypoints already reached, the last one is the goal itself
+        while len(self.route) > 1 and math.dist(self.route[0], (hb_x, hb_y)) < 4:
+            self.route.pop(0)
+        if not self.route:
+            return goal
+        w_x, w_y = self.route[0]
+        c_x, c_y = self.rect.center
+        return w_x + c_x - hb_x, w_y + c_y - hb_y
+
+    def setRoute(self, goal, route):
+        if goal != self.route_goal:
+            # the goal changed while the route was searched
+            return
+        if route is None:
+            # unreachable, pick a new goal next frame
+            route = []
+            self.replan()
+        self.route = route
+
+    def replan(self):
+        '''pick a new roam goal on the next roaming step\n'''
+        self.goal_due = True
+
+    def setTimers(self, timers):
+        '''start and stop roaming with a scheduling.TimerWheel instead of frame count checks, None goes back to them\n
+        same cycle as the frame counts: frame_seed + 1 ticks of rest, then roaming until rand_mod ticks are up,
+        and a new goal every game_tics ** 2 ticks.'''
+        if self.timers is not None:
+            self.timers.cancel(self.roam_timer)
+            self.timers.cancel(self.goal_timer)
+        self.timers = timers
+        self.roaming = self.goal_due = False
+        self.roam_timer = self.goal_timer = None
+        if timers is not None:
+            self.roam_timer = timers.schedule(self.frame_seed + 1, (self, 'roam'))
+            self.scheduleGoal()
+
+    def wake(self, kind: str):
+        '''a timer fired, 'roam' starts a roaming stretch, 'rest' ends it and 'goal' asks for a new roam goal\n'''
+        match kind:
+            case 'roam':
+                self.roaming = True
+                self.roam_timer = self.timers.schedule(self.rand_mod - self.frame_seed - 1, (self, 'rest'))
+            case 'rest':
+                self.roaming = False
+                self.roam_timer = self.timers.schedule(self.frame_seed + 1, (self, 'roam'))
+            case 'goal':
+                self.goal_due = True
+
+    def scheduleGoal(self):
+        self.timers.cancel(self.goal_timer)
+        self.goal_timer = self.timers.schedule(self.e_pathing.game_tics ** 2, (self, 'goal'))
+
+    def pickGoal(self):
+        self.goal_due = False
+        self.e_pathing.renew()
+        if self.timers is not None:
+            self.scheduleGoal()
+
+    def flowStep(self):
+        '''point the rect center should head to for the next flow field step, None to head straight at the target\n'''
+        hb_x, hb_y = self.collisionSprite.rect.center
+        step = self.flow.next_point((hb_x, hb_y))
+        if step is None or math.dist(step, (hb_x, hb_y)) < 1:
+            return None
+        c_x, c_y = self.rect.center
+        return step[0] + c_x - hb_x, step[1] + c_y - hb_y
+
+    def avoidWalls(self, s1, s2):
+        '''bend the move away from walls closer than wall_margin, harder the closer the wall is\n'''
+        if self.distance_field is None:
+            return s1, s2
+        pos = self.collisionSprite.rect.center
+        dist = self.distance_field.distance(pos)
+        if dist >= self.wall_margin:
+            return s1, s2
+        g_x, g_y = self.distance_field.direction(pos)
+        push = self.speed * self.lod_step * (1 - max(dist, 0) / self.wall_margin)
+        return s1 + g_x * push, s2 + g_y * push
 
     def adjustRefPos(self, s1, s2):
+        if self.planning:
+            # think only decides, glide moves, chasing moves glide until the next decision
+            self.velocity = (s1 / self.lod_step, s2 / self.lod_step)
+            self.glide_left = math.inf
+            return
+        if self.walk_grid is not None:
+            (s1, s2), _, _ = self.walk_grid.move(self.collisionSprite.rect, (s1, s2))
         self.x += s1
         self.y += s2
         self.updateMe = True
@@ -850,6 +1154,13 @@ class Enemy(pygame.sprite.Sprite):
         else:
             self.flipped = 'idle'
   
+    def nearestTarget(self, targets):
+        '''closest of the target positions, None without targets\n
+        EnemyGroup.think narrows them down to the one nearest target in range with a batched query.'''
+        if len(targets) == 1:
+            return targets[0]
+        return min(targets, key=lambda t: self.dist_from_me(*t), default=None)
+
     def checkAggroStatus(self, enemy):
 
         p_x, p_y = enemy
@@ -869,6 +1180,12 @@ class Enemy(pygame.sprite.Sprite):
                 return 0
 
     def trackTarget(self, p_x, p_y, dist):
+        # the flow field only leads to its own goal, other targets are chased straight on
+        if self.flow is not None and self.flow.leads_to((p_x, p_y))[0]:
+            step = self.flowStep()
+            if step is not None:
+                p_x, p_y = step
+                dist = self.dist_from_me(p_x, p_y)
         s_x, s_y = self.agro_circle.rect.x, self.agro_circle.rect.y
         e_x, e_y = self.rect.center
         scaled_pos = self.calculateDistanceVector(p_x, p_y, s_x, s_y, e_x, e_y)
@@ -884,8 +1201,10 @@ class Enemy(pygame.sprite.Sprite):
         self.adjustRefPos(s1, s2) # also sets the update flag because we are moving
         self.toggleFlippedFlag(s1,s2)
         
-    def getScaledSpeed(self, dist, e_x, e_y, t_x, t_y):
-        def f_of_x(x1, x2): return (x1 - x2) / dist * self.speed
+    def getScaledSpeed(self, dist, e_x, e_y, t_x, t_y, reach=None):
+        # reach is the length of the move, by default speed for every frame the lod step covers
+        reach = self.speed * self.lod_step if reach is None else reach
+        def f_of_x(x1, x2): return (x1 - x2) / dist * reach
         def f_of_xy(x, y): return (f_of_x(*x), f_of_x(*y))
         s1, s2 = f_of_xy((t_x, e_x), (t_y, e_y))
         return s1, s2
@@ -923,12 +1242,337 @@ class Enemy(pygame.sprite.Sprite):
         # update the collision sprite
         self.collisionSprite.parentRect = self.rect
         
-        
+
+class EnemyBatch:
+    # aggro states, same as the values returned by Enemy.checkAggroStatus
+    IDLE, CHASE, REACHED = 0, 1, 2
+
+    def __init__(self, group: pygame.sprite.AbstractGroup, world_rect: pygame.Rect):
+        """structure of arrays version of Enemy.enemyMovement for a whole group\n
+        positions, speeds, aggro radii, pathing targets and counters live in NumPy arrays, one kernel per frame
+        moves every enemy and the results are written back to the sprites. the arrays are rebuilt from the
+        sprites only when the group's members change.
+
+        Args:
+            group (pygame.sprite.AbstractGroup): group of Enemy sprites.
+            world_rect (pygame.Rect): area the enemies are allowed to move in.
+        """
+        self.group = group
+        self.world_rect = pygame.Rect(world_rect)
+        self.enemies = []
+        self.index = {}
+        self.min_dist = 50
+        self.state = np.zeros(0, dtype=np.int8)
+        # seconds the deciding part of the last update took, see EnemyGroup.batch_update
+        self.think_seconds = 0.0
+
+    def pack(self):
+        '''copy the per enemy state into the arrays\n'''
+        enemies = self.enemies = self.group.sprites()
+        self.index = {e: i for i, e in enumerate(enemies)}
+        n = len(enemies)
+        def column(get, dtype=np.float64, width=None):
+            shape = (n,) if width is None else (n, width)
+            return np.array([get(e) for e in enemies], dtype=dtype).reshape(shape)
+        self.pos = column(lambda e: (e.x, e.y), width=2)
+        self.size = column(lambda e: e.rect.size, width=2)
+        self.hb_size = column(lambda e: e.collisionSprite.rect.size, width=2)
+        self.speed = column(lambda e: e.speed)
+        self.agro_range = column(lambda e: e.agro_range)
+        self.wall_margin = column(lambda e: e.wall_margin)
+        self.stable = column(lambda e: e.stable_ground, width=2)
+        self.targets = column(lambda e: (e.e_pathing.x, e.e_pathing.y), width=2)
+        self.frame_count = column(lambda e: e.e_pathing.frame_count, np.int64)
+        self.game_tics = column(lambda e: e.e_pathing.game_tics, np.int64)
+        self.rand_mod = column(lambda e: e.rand_mod, np.int64)
+        self.frame_seed = column(lambda e: e.frame_seed, np.int64)
+        # TimerWheel driven roaming, the flags are mirrored from the enemies' timers by wake
+        self.timed = n > 0 and enemies[0].timers is not None
+        self.roaming = column(lambda e: e.roaming, bool)
+        self.goal_due = column(lambda e: e.goal_due, bool)
+        self.state = np.zeros(n, dtype=np.int8)
+        # per frame velocity of the last decision and how far it may still carry, see update's think
+        self.planned = np.zeros((n, 2), dtype=np.float64)
+        self.glide_left = np.zeros(n, dtype=np.float64)
+        # navigation routes in hit box space and the waypoint each enemy is heading to
+        self.routes = [list(e.route) for e in enemies]
+        self.heads = self.targets.copy()
+        for i, route in enumerate(self.routes):
+            if route:
+                self.heads[i] = route[0]
+        # walking animations are advanced here, the frame sequences are built the first time an enemy walks
+        self.ani_frame = column(lambda e: e.walking_ani.frame_count, np.int64)
+        self.ani_duration = column(lambda e: e.walking_ani.duration, np.int64)
+        self.ani_sequences = [None] * n
+        self.walking = np.zeros(n, dtype=bool)
+        for e in enemies:
+            e.batched = True
+
+    def unpack(self):
+        '''copy the array state that is not written every frame back to the sprites\n'''
+        for i, e in enumerate(self.enemies):
+            e.stable_ground = tuple(self.stable[i].tolist())
+            e.e_pathing.x, e.e_pathing.y = self.targets[i].tolist()
+            e.e_pathing.frame_count = int(self.frame_count[i])
+            e.goal_due = bool(self.goal_due[i])
+            e.route = self.routes[i]
+            e.route_goal = (e.e_pathing.x, e.e_pathing.y)
+            e.walking_ani.frame_count = int(self.ani_frame[i])
+
+    def release(self):
+        '''hand movement back to the per enemy update\n'''
+        self.unpack()
+        for e in self.enemies:
+            e.batched = False
+        self.enemies = []
+        self.index = {}
+
+    def sync(self):
+        '''repack when enemies were added or removed, the list compare is one C loop over identities\n'''
+        if self.enemies != self.group.sprites():
+            self.unpack()
+            for e in self.enemies:
+                e.batched = False
+            self.pack()
+
+    def centers(self) -> np.ndarray:
+        # rect positions are rounded like pygame.Rect does with float coordinates
+        return np.round(self.pos) + self.size // 2
+
+    def hit_boxes(self, left_top: np.ndarray) -> np.ndarray:
+        '''(N, 4) x, y, w, h hit boxes placed like hit_box.update for rects at left_top\n'''
+        x = left_top[:, 0] + self.size[:, 0] // 2 - self.hb_size[:, 0] // 2
+        y = left_top[:, 1] + self.size[:, 1] - self.hb_size[:, 1]
+        return np.stack([x, y, self.hb_size[:, 0], self.hb_size[:, 1]], axis=1).astype(np.int64)
+
+    def apply_route(self, enemy, goal: tuple, route: list):
+        '''PathJobs callback, dropped if the enemy left the group or picked another goal meanwhile\n'''
+        i = self.index.get(enemy)
+        if i is None or tuple(self.targets[i].tolist()) != goal:
+            return
+        self.set_route(i, route)
+
+    def set_route(self, i: int, route: list):
+        if route is None:
+            # unreachable, pick a new goal next frame
+            route = []
+            self.replan(i)
+        self.routes[i] = route
+        self.heads[i] = route[0] if route else self.targets[i]
+
+    def replan(self, i):
+        '''pick new roam goals on the next roaming step, i is an index, index array or bool mask\n'''
+        self.goal_due[i] = True
+
+    def wake(self, enemy, kind: str):
+        '''mirror a timer the enemy's wake just handled, see Enemy.wake\n'''
+        i = self.index.get(enemy)
+        if i is None:
+            return
+        self.roaming[i] = enemy.roaming
+        if kind == 'goal':
+            self.goal_due[i] = True
+
+    def update(self, targets, walk_grid=None, distance_field=None, nav=None, flow=None, jobs=None,
+               tiers=None, steps=None, think=None):
+        """
+        Move every enemy one frame.
+        Args:
+            targets: position of the player, or a list of positions the enemies aggro on (players, decoys, allies),
+            each enemy goes for the nearest one in its aggro range.
+            walk_grid (WalkGrid, optional): moves are swept through it and slide along walls. Defaults to None.
+            distance_field (DistanceField, optional): steer away from walls and skip roam targets in walls. Defaults to None.
+            nav (NavGrid, optional): roam goals are reachable points and enemies follow A* routes to them. Defaults to None.
+            flow (FlowField, optional): chasing enemies follow it toward the target. Defaults to None.
+            jobs (PathJobs, optional): routes are searched on worker threads, enemies head straight for
+            their goal until the route arrives. Defaults to None.
+            tiers (np.ndarray, optional): scheduling.SimulationLod tier of each enemy, dormant enemies only roam
+            and don't steer around walls. Defaults to None.
+            steps (np.ndarray, optional): frames each enemy advances this frame, 0 skips it. Defaults to None, every
+            enemy advances one frame.
+            think (np.ndarray, optional): bool, enemies that decide this frame, the others glide along their last
+            decision, see scheduling.AiScheduler. Defaults to None, every enemy decides.
+        """
+        self.sync()
+        n = len(self.enemies)
+        if n == 0:
+            return
+        if steps is None or len(steps) != n:
+            # no lod or the group changed since the tiers were picked
+            steps, tiers = np.ones(n, dtype=np.int64), None
+        active = steps > 0
+        colliding = np.fromiter((e.collisionSprite.colliding for e in self.enemies), dtype=bool, count=n)
+        left_top = np.round(self.pos)
+        world = self.world_rect
+        in_world = ((left_top[:, 0] >= world.left) & (left_top[:, 1] >= world.top) &
+                    (left_top[:, 0] + self.size[:, 0] <= world.right) & (left_top[:, 1] + self.size[:, 1] <= world.bottom))
+        ok = ~colliding & in_world
+        # enemies on bad ground go back to stable ground and get a new roam target,
+        # enemies skipped this frame are left as they are until their next tick
+        bad = ~ok & active
+        left_top = np.where(bad[:, None], np.round(self.stable), left_top)
+        self.pos[bad] = self.stable[bad]
+        self.replan(bad)
+        ok &= active
+        self.stable[ok] = self.pos[ok]
+        decide = ok if think is None else ok & think
+        glide = ok & ~decide
+        center = self.centers()
+        hb_center = self.hit_boxes(left_top)[:, :2] + self.hb_size // 2
+
+        # the deciding part is timed on its own, it is what grows with the number of decisions
+        think_start = time.perf_counter()
+        # nearest target in each decider's aggro range, one tree query for all of them
+        targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+        deciders = np.flatnonzero(decide)
+        nearest = np.full(n, -1, dtype=np.int64)
+        dist = np.full(n, np.inf)
+        nearest[deciders], dist[deciders] = KDTree(targets).nearest_within(center[deciders], self.agro_range[deciders])
+        in_range = nearest >= 0
+        to_player = np.zeros((n, 2), dtype=np.float64)
+        to_player[in_range] = targets[nearest[in_range]] - center[in_range]
+        chase = decide & in_range & (dist > self.min_dist)
+        state = np.where(in_range, np.where(dist > self.min_dist, self.CHASE, self.REACHED), self.IDLE)
+        self.state = np.where(decide, state, np.where(glide, self.state, self.IDLE)).astype(np.int8)
+
+        # roaming, same schedule as EnemyPath or started and stopped by the enemies' timers
+        if self.timed:
+            roam = decide & ~in_range & self.roaming
+            renew = roam & self.goal_due
+        else:
+            roam = decide & ~in_range & (self.frame_count % self.rand_mod > self.frame_seed)
+            renew = roam & (self.goal_due | (self.frame_count // self.game_tics >= self.game_tics))
+        if nav is not None:
+            # only enemies that need a new goal or reached a waypoint touch Python
+            for i in np.flatnonzero(renew).tolist():
+                start = tuple(hb_center[i].tolist())
+                self.targets[i] = goal = nav.random_goal(start)
+                self.frame_count[i] = 0
+                if jobs is not None:
+                    self.set_route(i, [])
+                    jobs.submit(start, goal, functools.partial(self.apply_route, self.enemies[i], goal),
+                                owner=self.enemies[i])
+                else:
+                    self.set_route(i, nav.find_path(start, goal))
+            reached = roam & (np.hypot(*(self.heads - hb_center).T) < 4)
+            for i in np.flatnonzero(reached).tolist():
+                route = self.routes[i]
+                if len(route) > 1:
+                    route.pop(0)
+                    self.heads[i] = route[0]
+        elif renew.any():
+            k = int(renew.sum())
+            self.targets[renew] = np.stack([np.random.randint(0, world.width + 1, k),
+                                            np.random.randint(0, world.height + 1, k)], axis=1)
+            self.frame_count[renew] = 0
+        self.goal_due[renew] = False
+        if self.timed:
+            for i in np.flatnonzero(renew).tolist():
+                self.enemies[i].scheduleGoal()
+        if distance_field is not None and roam.any():
+            in_wall = roam & (distance_field.distances(self.targets) < 0)
+            self.replan(in_wall)
+        # routes are planned for the hit box, without one the rect center heads straight to the target
+        to_target = self.heads - hb_center if nav is not None else self.targets - center
+        t_dist = np.hypot(to_target[:, 0], to_target[:, 1])
+        roam_move = roam & (t_dist >= 2)
+
+        velocity = np.zeros((n, 2), dtype=np.float64)
+        # speed for every frame the step covers, roaming moves stop on their target instead of overshooting it
+        reach = self.speed * steps
+        heading, h_dist = to_player[chase], dist[chase]
+        if flow is not None and len(heading):
+            # chasers of the field's goal follow the shared flow field, on the goal's cell they head straight at it,
+            # chasers of other targets head straight at theirs
+            flow_steps = flow.next_points(hb_center[chase]) - hb_center[chase]
+            s_dist = np.hypot(flow_steps[:, 0], flow_steps[:, 1])
+            follow = (s_dist >= 1) & flow.leads_to(targets[nearest[chase]])
+            heading = np.where(follow[:, None], flow_steps, heading)
+            h_dist = np.where(follow, s_dist, h_dist)
+        velocity[chase] = heading / h_dist[:, None] * reach[chase, None]
+        r_dist = t_dist[roam_move, None]
+        velocity[roam_move] = to_target[roam_move] / r_dist * np.minimum(reach[roam_move, None], r_dist)
+        moving = chase | roam_move
+        if distance_field is not None and roam_move.any():
+            # same as Enemy.avoidWalls, only for roaming moves
+            wall_dist = distance_field.distances(hb_center)
+            near = roam_move & (wall_dist < self.wall_margin)
+            if tiers is not None:
+                near &= tiers != SimulationLod.DORMANT
+            push = reach[near] * (1 - np.maximum(wall_dist[near], 0) / self.wall_margin[near])
+            velocity[near] += distance_field.gradients(hb_center[near]) * push[:, None]
+        if think is not None:
+            # deciders keep their per frame velocity, the others glide along theirs,
+            # roaming moves for at most the distance to their target
+            self.planned[decide] = velocity[decide] / steps[decide, None]
+            self.glide_left[decide] = np.where(roam_move, t_dist, np.where(chase, np.inf, 0))[decide]
+        self.think_seconds = time.perf_counter() - think_start
+        if think is not None:
+            glide &= self.glide_left > 0
+            g_velocity = self.planned[glide] * steps[glide, None]
+            g_len = np.hypot(g_velocity[:, 0], g_velocity[:, 1])
+            scale = np.minimum(g_len, self.glide_left[glide]) / np.maximum(g_len, 1e-9)
+            velocity[glide] = g_velocity * scale[:, None]
+            glide[glide] = g_len > 0
+            moving |= glide
+            moved = decide | glide
+            self.glide_left[moved] -= np.hypot(velocity[moved, 0], velocity[moved, 1])
+        if walk_grid is not None and moving.any():
+            # sweep the hit boxes and slide them along the walls they hit, same as WalkGrid.move per enemy
+            index = np.flatnonzero(moving)
+            velocity[index] = walk_grid.move_many(self.hit_boxes(np.round(self.pos))[index], velocity[index])
+            moving &= (velocity != 0).any(axis=1)
+        self.pos += velocity
+        self.frame_count += steps
+        self.write_back(velocity, moving, moving | bad)
+
+    def write_back(self, velocity: np.ndarray, moving: np.ndarray, changed: np.ndarray):
+        """
+        Write positions, facing and animation frames to the sprites, only enemies that moved or stopped are touched.
+        Args:
+            velocity (np.ndarray): (N, 2) moves of this frame.
+            moving (np.ndarray): bool, enemies that walked this frame.
+            changed (np.ndarray): bool, enemies whose position changed.
+        """
+        enemies = self.enemies
+        visible = np.fromiter((e.visible for e in enemies), dtype=bool, count=len(enemies))
+        # same as Enemy.handleAnimationState, walkers in view play the next frame, the ones that stopped go idle
+        # and enemies out of view keep the frame they have
+        animate = visible & moving
+        stopped = visible & ~moving & self.walking
+        self.walking[visible] = moving[visible]
+        frame = self.ani_frame.copy()
+        self.ani_frame[animate] = (frame[animate] + 1) % self.ani_duration[animate]
+        index = np.flatnonzero(changed | stopped)
+        facing = np.where(velocity[index, 0] > 0, 'right', np.where(velocity[index, 0] < 0, 'left', 'idle'))
+        for i, (x, y), move, face, play, stop, f in zip(index.tolist(), self.pos[index].tolist(), moving[index].tolist(),
+                                                        facing.tolist(), animate[index].tolist(), stopped[index].tolist(),
+                                                        frame[index].tolist()):
+            e = enemies[i]
+            e.x, e.y = x, y
+            e.rect.topleft = x, y
+            if move:
+                e.flipped = face
+            if play:
+                if self.ani_sequences[i] is None:
+                    self.ani_sequences[i] = e.walking_ani.animation_sequence
+                e.showFrame(self.ani_sequences[i][f])
+            elif stop:
+                e.showFrame(e.idle_sprite)
+
+    def __len__(self):
+        return len(self.enemies)
+
+    def __repr__(self):
+        return f'EnemyBatch({len(self.enemies)})'
+
+
 class EnemyGroup(pygame.sprite.Group):
-    def __init__(self, screen, cords: tuple = (0, 0), size: int = 10):
+    def __init__(self, screen, cords: tuple = (0, 0), size: int = 10, world_rect: pygame.Rect = None):
         super().__init__()
         self.screen = screen
         self.screen_rect = screen.get_rect()
+        self.world_rect = world_rect
         pathDir = pathlib.WindowsPath('imgs\enemy')
         
         fNames = ['head.png', 'body.png', 'leg_l.png', 'leg_r.png', 'arm_l.png', 'arm_r.png',
@@ -966,7 +1610,7 @@ class EnemyGroup(pygame.sprite.Group):
                         [self.moveArmsWithEquip(10), 1],
                         [self.moveArmsWithEquip(10), 2],
                         ]
-        self.enemies = [Enemy(screen, self.rig_ani_test.copy(), self.im, cords) for _ in range(size)]
+        self.enemies = [Enemy(screen, self.rig_ani_test.copy(), self.im, cords, world_rect) for _ in range(size)]
         self.add(self.enemies)
         self.show_debug = False
         # get all the hit boxes for the enemies
@@ -974,10 +1618,197 @@ class EnemyGroup(pygame.sprite.Group):
         self.ehb.add([enemy.collisionSprite for enemy in self.enemies])
         self.e_agro = agro_group()
         self.e_agro.add([enemy.agro_circle for enemy in self.enemies])
+        self.walk_grid = None
+        self.distance_field = None
+        # EnemyBatch while the structure of arrays mode is on
+        self.batch = None
+        self.nav = None
+        self.flow = None
+        self.path_jobs = None
+        # scheduling.SimulationLod and the per enemy tier state it works on, in sprites() order
+        self.lod = None
+        self.lod_frame = 0
+        self.lod_enemies = None
+        self.lod_tiers = None
+        self.lod_steps = None
+        # scheduling.AiScheduler, when set enemy decisions share a time budget per frame
+        self.scheduler = None
+        # scheduling.TimerWheel, when set only enemies whose roaming timers fire are touched for it
+        self.timers = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        # a removed enemy's route searches are dropped, the routes would never be walked
+        if self.path_jobs is not None:
+            self.path_jobs.cancel(sprite)
+
+    def set_timers(self, timers):
+        '''start and stop roaming with a scheduling.TimerWheel, None goes back to checking frame counts\n'''
+        batched = self.batch is not None
+        # the batch keeps its own copy of the timer flags, repack it
+        self.set_batched(False)
+        self.timers = timers
+        for enemy in self.enemies:
+            enemy.setTimers(timers)
+        self.set_batched(batched)
+
+    def timer_update(self):
+        '''advance the timer wheel one tick and wake the enemies whose timers fired, call once per frame\n'''
+        if self.timers is None:
+            return
+        for enemy, kind in self.timers.advance():
+            # enemies removed from the group drop their timers here
+            if not self.has(enemy):
+                continue
+            enemy.wake(kind)
+            if self.batch is not None:
+                self.batch.wake(enemy, kind)
+
+    def set_scheduler(self, scheduler):
+        '''round robin enemy decisions within a scheduling.AiScheduler budget, None decides for everyone every frame\n'''
+        self.scheduler = scheduler
+        for enemy in self.enemies:
+            enemy.scheduled = scheduler is not None
+
+    def think(self, enemy_events):
+        '''this frame's per enemy decisions, call after lod_update and before the enemies' update\n
+        in batch mode the decisions are made by batch_update instead.'''
+        if self.scheduler is None or self.batch is not None:
+            return
+        start = time.perf_counter()
+        picked = self.scheduler.plan(self.sprites(), lambda e: e.lod_step > 0)
+        for enemy, events in zip(picked, self.perceive(picked, enemy_events)):
+            enemy.think(events)
+        self.scheduler.spent(len(picked), time.perf_counter() - start)
+
+    def perceive(self, enemies: list, targets: list) -> list:
+        '''each enemy's nearest target in its aggro range as a one item enemy_events list, empty if there is none\n
+        one spatial.KDTree query answers every enemy, O(n log m) for n enemies and m targets.'''
+        if not enemies:
+            return []
+        centers = [e.agro_circle.rect.center for e in enemies]
+        nearest, _ = KDTree(targets).nearest_within(centers, [e.agro_range for e in enemies])
+        return [[targets[i]] if i >= 0 else [] for i in nearest.tolist()]
+
+    def set_lod(self, lod):
+        '''simulate enemies far from the player at a lower tick rate with a scheduling.SimulationLod, None updates all\n'''
+        self.lod = lod
+        self.lod_enemies = self.lod_tiers = self.lod_steps = None
+        if lod is None:
+            for enemy in self.enemies:
+                enemy.lod_step = 1
+                enemy.visible = True
+
+    def lod_update(self, focus: tuple, view: pygame.Rect):
+        '''pick every enemy's detail tier for this frame, call before batch_update and the enemies' own update\n
+        focus is the player or camera center, enemies overlapping the view rect are full detail and the only ones animated.'''
+        if self.lod is None:
+            return
+        enemies = self.sprites()
+        if self.batch is not None:
+            # the batch already has every position in one array
+            self.batch.sync()
+            boxes = RectArray(np.concatenate([np.round(self.batch.pos), self.batch.size], axis=1))
+        else:
+            boxes = RectArray([e.rect for e in enemies])
+        if self.lod_enemies != enemies:
+            # members changed, everyone starts over at full detail
+            n = len(enemies)
+            self.lod_enemies = enemies
+            self.lod_tiers = np.zeros(n, dtype=np.int8)
+            self.lod_last = np.full(n, self.lod_frame, dtype=np.int64)
+            self.lod_phase = np.arange(n, dtype=np.int64)
+            self.lod_visible = np.ones(n, dtype=bool)
+            for e in enemies:
+                e.visible = True
+        self.lod_frame += 1
+        visible = boxes.intersects_rect(view)
+        dist = np.hypot(*(boxes.centers - np.asarray(focus)).T)
+        self.lod_tiers, self.lod_steps = self.lod.update(self.lod_frame, dist, visible, self.lod_tiers,
+                                                         self.lod_last, self.lod_phase)
+        # only enemies entering or leaving the view are touched
+        for i in np.flatnonzero(visible != self.lod_visible).tolist():
+            enemies[i].visible = bool(visible[i])
+        self.lod_visible = visible
+        if self.batch is None:
+            for e, step in zip(enemies, self.lod_steps.tolist()):
+                e.lod_step = step
+
+    def set_path_jobs(self, path_jobs):
+        '''search roam routes on a navigation.PathJobs queue instead of on the main thread\n'''
+        self.path_jobs = path_jobs
+        for enemy in self.enemies:
+            enemy.path_jobs = path_jobs
+
+    def set_flow_field(self, flow):
+        '''chase the player along a shared navigation.FlowField, None chases in a straight line\n'''
+        self.flow = flow
+        for enemy in self.enemies:
+            enemy.flow = flow
+
+    def set_navigation(self, nav):
+        '''route every enemy's roaming with a navigation.NavGrid, None goes back to straight line roaming\n'''
+        self.nav = nav
+        for enemy in self.enemies:
+            enemy.setNavigation(nav)
+        if self.batch is not None:
+            # routes live in the batch arrays, repack them
+            self.set_batched(False)
+            self.set_batched(True)
+
+    def set_batched(self, enabled: bool):
+        '''move every enemy with one EnemyBatch kernel per frame instead of per enemy updates\n'''
+        if enabled and self.batch is None:
+            world_rect = self.world_rect if self.world_rect is not None else self.screen_rect
+            self.batch = EnemyBatch(self, world_rect)
+        elif not enabled and self.batch is not None:
+            self.batch.release()
+            self.batch = None
+
+    def batch_update(self, targets):
+        '''run the batch kernel, call before the enemies' own update so they animate with the new state\n'''
+        if self.batch is None:
+            return
+        if self.scheduler is None:
+            self.batch.update(targets, self.walk_grid, self.distance_field, self.nav, self.flow, self.path_jobs,
+                              self.lod_tiers, self.lod_steps)
+            return
+        batch = self.batch
+        batch.sync()
+        start = time.perf_counter()
+        steps = self.lod_steps if self.lod_steps is not None and len(self.lod_steps) == len(batch) else None
+        eligible = None if steps is None else lambda e: steps[batch.index[e]] > 0
+        picked = self.scheduler.plan(batch.enemies, eligible)
+        think = np.zeros(len(batch), dtype=bool)
+        think[[batch.index[e] for e in picked]] = True
+        planned = time.perf_counter() - start
+        batch.update(targets, self.walk_grid, self.distance_field, self.nav, self.flow, self.path_jobs,
+                     self.lod_tiers, self.lod_steps, think)
+        # only planning and the deciding part of the kernel are charged, the moves cost the same however many
+        # enemies decide and would make a decision look pricier the bigger the crowd gets
+        self.scheduler.spent(len(picked), planned + batch.think_seconds)
         
-        
+    def set_distance_field(self, distance_field):
+        '''steer every enemy away from walls with a collision.DistanceField, None turns it off\n'''
+        self.distance_field = distance_field
+        for enemy in self.enemies:
+            enemy.distance_field = distance_field
+
+    def set_walk_grid(self, walk_grid):
+        '''sweep every enemy's moves against a collision.WalkGrid, None goes back to snapping after overlap\n'''
+        self.walk_grid = walk_grid
+        for enemy in self.enemies:
+            enemy.walk_grid = walk_grid
+
     def spawnEnemy(self, cords: tuple = (0, 0)):
-        self.enemies.append(Enemy(self.screen, self.rig_ani_test, self.im, cords))
+        self.enemies.append(Enemy(self.screen, self.rig_ani_test, self.im, cords, self.world_rect))
+        self.enemies[-1].walk_grid = self.walk_grid
+        self.enemies[-1].distance_field = self.distance_field
+        self.enemies[-1].setNavigation(self.nav)
+        self.enemies[-1].flow = self.flow
+        self.enemies[-1].path_jobs = self.path_jobs
+        self.enemies[-1].scheduled = self.scheduler is not None
+        self.enemies[-1].setTimers(self.timers)
         self.add(self.enemies[-1])
         self.ehb.add(self.enemies[-1].collisionSprite)
         self.e_agro.add(self.enemies[-1].agro_circle)
@@ -0,0 +1,325 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# scrolling camera and cached world chunks for tile maps larger than the screen.
+#   * Camera is a view rect in world coordinates that follows a target and converts between world and screen space.
+#   * WorldChunks splits the Background tile map into fixed size chunks, bakes the static tile layer of each
+#     chunk into a cached surface and only composites the chunks that intersect the camera view.
+#   * baked chunks are kept in least recently used order and evicted once they pass a memory budget.
+#   * chunks missing from the cache can be rebaked in parallel on a Compositor thread pool.
+#   * ZoomCamera zooms out in steps of 1/2, 1/4 and 1/8 and draws from a mip pyramid of pre downscaled
+#     chunks and sprite frames, built lazily and cached, so nothing is rescaled every frame.
+
+from collections import OrderedDict
+import math
+import pygame
+
+
+class Camera:
+    def __init__(self, view_size: tuple, world_size: tuple):
+        """
+        Create a camera looking at a part of the world.
+        Args:
+            view_size (tuple): size of the surface the camera draws to.
+            world_size (tuple): size of the whole world in pixels, the view is kept inside it.
+        """
+        self.rect = pygame.Rect((0, 0), view_size)
+        self.world_rect = pygame.Rect((0, 0), world_size)
+
+    @property
+    def offset(self) -> tuple:
+        """world position of the top left corner of the screen\n"""
+        return self.rect.topleft
+
+    def follow(self, target: pygame.Rect):
+        """center the view on the target rect, stopping at the world edges\n"""
+        self.rect.center = target.center
+        # clamp centers the view when the world is smaller than the screen
+        self.rect.clamp_ip(self.world_rect)
+
+    def to_screen(self, pos: tuple) -> tuple:
+        return pos[0] - self.rect.x, pos[1] - self.rect.y
+
+    def to_world(self, pos: tuple) -> tuple:
+        return pos[0] + self.rect.x, pos[1] + self.rect.y
+
+    def draw_group(self, surface: pygame.Surface, group: pygame.sprite.AbstractGroup):
+        """draw the sprites of a group that are in view, offset by the camera position\n
+        groups with a sort method (YSortGroup) have their draw order repaired first.
+        """
+        sort = getattr(group, 'sort', None)
+        if sort is not None:
+            sort()
+        view = self.rect
+        x, y = -view.x, -view.y
+        surface.blits([(spr.image, spr.rect.move(x, y))
+                       for spr in group.sprites() if view.colliderect(spr.rect)], False)
+
+    def __repr__(self):
+        return f'Camera({self.rect})'
+
+
+def half_size(surface: pygame.Surface) -> pygame.Surface:
+    """return a copy of the surface at half its size, the next level of a mip pyramid\n"""
+    size = max(surface.get_width() // 2, 1), max(surface.get_height() // 2, 1)
+    try:
+        return pygame.transform.smoothscale(surface, size)
+    except ValueError:
+        # smoothscale only supports 24 and 32 bit surfaces
+        return pygame.transform.scale(surface, size)
+
+
+class MipCache:
+    def __init__(self, max_entries: int = 4096):
+        """
+        Lazily built mip levels of sprite frames, level n is 1/2**n of the original size.
+        Args:
+            max_entries (int, optional): scaled frames to keep before the oldest are dropped. Defaults to 4096.
+        """
+        self.max_entries = max_entries
+        # (id(surface), level) -> (surface, scaled surface), the source is kept so its id can not be reused
+        self.cache = OrderedDict()
+
+    def get(self, surface: pygame.Surface, level: int) -> pygame.Surface:
+        if level == 0:
+            return surface
+        key = (id(surface), level)
+        entry = self.cache.get(key)
+        if entry is not None and entry[0] is surface:
+            self.cache.move_to_end(key)
+            return entry[1]
+        # build from the level above so each level is a single halving
+        scaled = half_size(self.get(surface, level - 1))
+        self.cache[key] = surface, scaled
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return scaled
+
+    def discard(self, surface: pygame.Surface):
+        '''drop the mip levels of a surface that was drawn on, they are rebuilt on the next get\n'''
+        for key in [k for k, entry in self.cache.items() if entry[0] is surface]:
+            del self.cache[key]
+
+    def __len__(self):
+        return len(self.cache)
+
+
+class ZoomCamera(Camera):
+    # scale of each mip level
+    levels = (1, 1/2, 1/4, 1/8)
+
+    def __init__(self, view_size: tuple, world_size: tuple, mips: MipCache = None):
+        """
+        Camera that can zoom out, the view covers more of the world at higher levels.
+        Args:
+            view_size (tuple): size of the surface the camera draws to.
+            world_size (tuple): size of the whole world in pixels.
+            mips (MipCache, optional): cache of scaled sprite frames. Defaults to a new cache.
+        """
+        super().__init__(view_size, world_size)
+        self.view_size = view_size
+        self.level = 0
+        self.mips = mips if mips is not None else MipCache()
+
+    @property
+    def scale(self) -> float:
+        return self.levels[self.level]
+
+    def set_level(self, level: int):
+        """change the zoom level keeping the view centered on the same point\n"""
+        self.level = min(max(level, 0), len(self.levels) - 1)
+        center = self.rect.center
+        self.rect.size = (round(self.view_size[0] / self.scale), round(self.view_size[1] / self.scale))
+        self.rect.center = center
+        self.rect.clamp_ip(self.world_rect)
+
+    def zoom_in(self):
+        self.set_level(self.level - 1)
+
+    def zoom_out(self):
+        self.set_level(self.level + 1)
+
+    def to_screen(self, pos: tuple) -> tuple:
+        scale = self.scale
+        return int((pos[0] - self.rect.x) * scale), int((pos[1] - self.rect.y) * scale)
+
+    def to_world(self, pos: tuple) -> tuple:
+        scale = self.scale
+        return int(pos[0] / scale) + self.rect.x, int(pos[1] / scale) + self.rect.y
+
+    def draw_group(self, surface: pygame.Surface, group: pygame.sprite.AbstractGroup):
+        """draw the sprites in view from the mip level of the current zoom\n"""
+        if self.level == 0:
+            return super().draw_group(surface, group)
+        sort = getattr(group, 'sort', None)
+        if sort is not None:
+            sort()
+        view, scale, level, mip = self.rect, self.scale, self.level, self.mips.get
+        surface.blits([(mip(spr.image, level), (int((spr.rect.x - view.x) * scale), int((spr.rect.y - view.y) * scale)))
+                       for spr in group.sprites() if view.colliderect(spr.rect)], False)
+
+    def __repr__(self):
+        return f'ZoomCamera({self.rect}, scale={self.scale})'
+
+
+class WorldChunks:
+    def __init__(self, background, chunk_size: tuple = (512, 512), memory_budget: int = 64 * 1024 * 1024,
+                 compositor=None):
+        """
+        Cache of baked background chunks.
+        Args:
+            background (Background): the tile map the chunks are baked from.
+            chunk_size (tuple, optional): size of a chunk in pixels. Defaults to (512, 512).
+            memory_budget (int, optional): bytes of baked chunks to keep before evicting. Defaults to 64MB.
+            compositor (Compositor, optional): thread pool used to bake missing chunks in parallel. Defaults to None.
+        """
+        self.background = background
+        self.compositor = compositor
+        self.chunk_size = chunk_size
+        self.memory_budget = memory_budget
+        world_w, world_h = background.world_size
+        self.columns = math.ceil(world_w / chunk_size[0])
+        self.rows = math.ceil(world_h / chunk_size[1])
+        # (column, row, mip level) -> baked surface, oldest first
+        self.cache = OrderedDict()
+        self.memory_used = 0
+        # background version the cache was last synced with
+        self.version = background.version
+
+    def chunk_rect(self, column: int, row: int) -> pygame.Rect:
+        w, h = self.chunk_size
+        return pygame.Rect(column * w, row * h, w, h)
+
+    def visible_chunks(self, view: pygame.Rect) -> list:
+        """return (column, row) of every chunk that intersects the view rect\n"""
+        w, h = self.chunk_size
+        c0 = max(view.left // w, 0)
+        c1 = min((view.right - 1) // w, self.columns - 1)
+        r0 = max(view.top // h, 0)
+        r1 = min((view.bottom - 1) // h, self.rows - 1)
+        return [(c, r) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)]
+
+    def tiles_in(self, rect: pygame.Rect):
+        """yield the (image, rect, tType) tiles of the background that intersect a world rect\n"""
+        tile_w, tile_h = self.background.tile_size
+        rows, columns = self.background.grid.shape
+        c0, c1 = max(rect.left // tile_w, 0), min((rect.right - 1) // tile_w, columns - 1)
+        r0, r1 = max(rect.top // tile_h, 0), min((rect.bottom - 1) // tile_h, rows - 1)
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                yield self.background.get_tile(r, c)
+
+    def bake(self, column: int, row: int, target: pygame.Surface = None, tiles: list = None) -> pygame.Surface:
+        """draw the static tile layer of one chunk onto its own surface\n
+        tiles are the (image, rect) pairs to draw, by default the background tiles in the chunk."""
+        area = self.chunk_rect(column, row)
+        if target is None:
+            target = pygame.Surface(area.size)
+        if tiles is None:
+            tiles = [(img, rect) for img, rect, _ in self.tiles_in(area)]
+        target.fill((0, 0, 0))
+        x, y = -area.x, -area.y
+        target.blits([(img, rect.move(x, y)) for img, rect in tiles], False)
+        return target
+
+    def job_tiles(self, column: int, row: int) -> list:
+        """the chunk's (image, rect) tiles for a worker thread, made on the main thread\n
+        tiles reaching into a neighbouring chunk are copied so two jobs never blit from the same surface."""
+        area = self.chunk_rect(column, row)
+        return [(img if area.contains(rect) else img.copy(), rect) for img, rect, _ in self.tiles_in(area)]
+
+    def get(self, column: int, row: int, level: int = 0) -> pygame.Surface:
+        """return the baked chunk at a mip level, baking it if it is not cached\n"""
+        key = (column, row, level)
+        chunk = self.cache.get(key)
+        if chunk is not None:
+            self.cache.move_to_end(key)
+            return chunk
+        chunk = self.build(column, row, level)
+        self.store(key, chunk)
+        return chunk
+
+    def build(self, column: int, row: int, level: int = 0, tiles: list = None) -> pygame.Surface:
+        """bake a chunk at a mip level onto a new surface without touching the cache\n
+        safe to run on a worker thread when tiles come from job_tiles."""
+        if level == 0:
+            return self.bake(column, row, tiles=tiles)
+        # build from the full size chunk, it is only cached if it was already in view
+        chunk = self.cache.get((column, row, 0))
+        if chunk is None:
+            chunk = self.bake(column, row, tiles=tiles)
+        for _ in range(level):
+            chunk = half_size(chunk)
+        return chunk
+
+    def prebake(self, keys: list, level: int = 0, compositor=None):
+        """bake the chunks that are not cached across the compositor's threads and wait for them\n
+        other jobs already submitted to the compositor are joined too.
+        """
+        compositor = compositor if compositor is not None else self.compositor
+        missing = [key for key in keys if (*key, level) not in self.cache]
+        if compositor is None or len(missing) < 2:
+            return
+        # every job writes to its own new surface and reads its own tiles
+        for column, row in missing:
+            compositor.submit(self.build, column, row, level, self.job_tiles(column, row))
+        results = compositor.join()
+        for (column, row), chunk in zip(missing, results[-len(missing):]):
+            self.store((column, row, level), chunk)
+
+    def store(self, key: tuple, chunk: pygame.Surface):
+        self.cache[key] = chunk
+        self.memory_used += self.surface_bytes(chunk)
+
+    def evict(self, keep: int = 0):
+        """drop the least recently used chunks until the cache fits the memory budget\n
+        the newest 'keep' chunks are never evicted, they are the ones in view this frame.
+        """
+        while self.memory_used > self.memory_budget and len(self.cache) > keep:
+            _, chunk = self.cache.popitem(last=False)
+            self.memory_used -= self.surface_bytes(chunk)
+
+    def invalidate(self, rect: pygame.Rect = None):
+        """drop the cached chunks that overlap a world rect, None drops everything\n"""
+        if rect is None:
+            keys = list(self.cache)
+        else:
+            keys = [key for key in self.cache if self.chunk_rect(*key[:2]).colliderect(rect)]
+        for key in keys:
+            self.memory_used -= self.surface_bytes(self.cache.pop(key))
+
+    def sync(self):
+        """invalidate the chunks holding tiles that changed since the last sync\n"""
+        if self.background.version == self.version:
+            return
+        tile_w, tile_h = self.background.tile_size
+        rows, columns = self.background.changed_cells(self.version)
+        for r, c in zip(rows, columns):
+            self.invalidate(pygame.Rect(c * tile_w, r * tile_h, tile_w, tile_h))
+        self.version = self.background.version
+
+    def draw(self, surface: pygame.Surface, camera: Camera):
+        """composite the chunks in view onto the surface, from the mip level of a ZoomCamera\n"""
+        self.sync()
+        view = camera.rect
+        level = getattr(camera, 'level', 0)
+        keys = self.visible_chunks(view)
+        if self.compositor is not None:
+            self.prebake(keys, level)
+        if level == 0:
+            blits = [(self.get(*key), self.chunk_rect(*key).move(-view.x, -view.y)) for key in keys]
+        else:
+            # round the view offset once so neighbouring chunks never leave a gap between them
+            scale = camera.scale
+            x, y = round(-view.x * scale), round(-view.y * scale)
+            w, h = self.chunk_size[0] * scale, self.chunk_size[1] * scale
+            blits = [(self.get(c, r, level), (x + int(c * w), y + int(r * h))) for c, r in keys]
+        surface.blits(blits, False)
+        self.evict(keep=len(keys))
+
+    @staticmethod
+    def surface_bytes(surface: pygame.Surface) -> int:
+        return surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+    def __repr__(self):
+        return f'WorldChunks({self.columns}x{self.rows}, cached={len(self.cache)}, bytes={self.memory_used})'
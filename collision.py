@@ -0,0 +1,484 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# grid based collision against the Background tile map.
+#   * WalkGrid compiles the walkable tiles into a boolean NumPy grid, one cell per tile.
+#   * hit box vs walkable queries for every entity run as one vectorized lookup: the hit box corners are
+#     floor divided by the tile size, looked up in the grid and reduced to a colliding mask,
+#     the cost is O(entities) no matter how many tiles the map has.
+#   * WalkGrid.sweep and WalkGrid.move cast a hit box along its velocity with DDA cell stepping, returning the
+#     time of impact and the slide along the wall, so fast or dt scaled movement can not tunnel through thin walls.
+#     sweep_many and move_many do the same for every hit box of a batch at once.
+#   * DistanceField is a signed distance to the nearest wall built once per level with a vectorized distance
+#     transform, distance and direction away from walls are O(1) lookups so steering can avoid walls ahead of time.
+#   * MaskCache and collide_precise give opt in pixel perfect contact, masks are built once per
+#     (surface, frame, orientation) and Mask.overlap only runs for pairs that pass a rect test first.
+
+from collections import OrderedDict
+import math
+import numpy as np
+import pygame
+
+from rect_array import RectArray
+
+
+def rects_to_array(rects) -> np.ndarray:
+    """(N, 4) int array of x, y, w, h from pygame.Rect's or rect like tuples\n"""
+    if len(rects) == 0:
+        return np.empty((0, 4), dtype=np.int64)
+    return np.array([tuple(r) for r in rects], dtype=np.int64)
+
+
+class WalkGrid:
+    # tolerance in cells for float positions resting on a cell border
+    eps = 1e-6
+
+    def __init__(self, background, walkable: tuple = ('light',)):
+        """
+        Compile the walkable tiles of a Background.
+        Args:
+            background (Background): the tile map.
+            walkable (tuple, optional): tile types entities are allowed to stand on. Defaults to ('light',).
+        """
+        self.background = background
+        self.walkable_types = walkable
+        self.tile_size = np.asarray(background.tile_size, dtype=np.int64)
+        self.version = -1
+        self.build()
+
+    def build(self):
+        """compile the (rows, columns) walkable grid from the Background's tile types\n
+        tile_types holds the same tiles as entityDict, but entityDict keeps the old rect when a tile is replaced.
+        """
+        codes = [self.background.tile_codes[t] for t in self.walkable_types if t in self.background.tile_codes]
+        self.grid = np.isin(self.background.tile_types, codes)
+        # summed area table of the unwalkable cells, any box of cells is tested with four lookups
+        self.blocked_sum = np.pad((~self.grid).astype(np.int64).cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+        self.version = self.background.version
+
+    def sync(self):
+        """rebuild the grid if tiles changed since it was built\n"""
+        if self.background.version != self.version:
+            self.build()
+
+    @property
+    def shape(self) -> tuple:
+        return self.grid.shape
+
+    def cell_of(self, pos: tuple) -> tuple:
+        """(row, column) of the tile under a world position\n"""
+        return int(pos[1] // self.tile_size[1]), int(pos[0] // self.tile_size[0])
+
+    def walkable_at(self, points: np.ndarray) -> np.ndarray:
+        """bool mask, True where the (N, 2) x, y world points are on a walkable tile, outside the map is not walkable\n"""
+        points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        rows, columns = self.grid.shape
+        c = points[:, 0] // self.tile_size[0]
+        r = points[:, 1] // self.tile_size[1]
+        inside = (c >= 0) & (c < columns) & (r >= 0) & (r < rows)
+        result = np.zeros(len(points), dtype=bool)
+        result[inside] = self.grid[r[inside], c[inside]]
+        return result
+
+    def colliding(self, rects, require: str = 'any') -> np.ndarray:
+        """
+        Colliding mask for many hit boxes at once.
+        Args:
+            rects: pygame.Rect's, a RectArray or an (N, 4) x, y, w, h array.
+            require (str, optional): 'any' a box is valid if any corner is on a walkable tile (same as
+            groupcollide against the walkable tiles for boxes smaller than a tile), 'all' every corner must be. Defaults to 'any'.
+        Returns:
+            np.ndarray: bool mask, True where the hit box is not on walkable ground.
+        """
+        self.sync()
+        if isinstance(rects, RectArray):
+            boxes = rects.array.astype(np.int64)
+        else:
+            boxes = rects if isinstance(rects, np.ndarray) else rects_to_array(rects)
+        x0, y0 = boxes[:, 0], boxes[:, 1]
+        x1, y1 = x0 + boxes[:, 2] - 1, y0 + boxes[:, 3] - 1
+        # (N, 4, 2) corners -> (N, 4) walkable
+        corners = np.stack([np.stack([x0, y0], 1), np.stack([x1, y0], 1),
+                            np.stack([x0, y1], 1), np.stack([x1, y1], 1)], 1)
+        walkable = self.walkable_at(corners.reshape(-1, 2)).reshape(-1, 4)
+        valid = walkable.any(1) if require == 'any' else walkable.all(1)
+        return ~valid
+
+    def _blocked(self, c0: int, c1: int, r0: int, r1: int) -> bool:
+        """True if any cell in the inclusive column and row range is not walkable or outside the map\n"""
+        rows, columns = self.grid.shape
+        if c0 < 0 or r0 < 0 or c1 >= columns or r1 >= rows:
+            return True
+        return not self.grid[r0:r1 + 1, c0:c1 + 1].all()
+
+    def sweep(self, rect: pygame.Rect, velocity: tuple) -> tuple:
+        """
+        Cast a hit box along its velocity through the grid with DDA cell stepping.
+        only cells the box enters are tested, cells it already overlaps never stop it so a box that starts
+        on bad ground can still walk off. costs O(cells crossed).
+        Args:
+            rect: the hit box at the start of the move, a pygame.Rect or float x, y, w, h.
+            velocity (tuple): x, y movement this frame.
+        Returns:
+            tuple: (time of impact in [0, 1], (nx, ny) normal of the blocking cell face), 1 and (0, 0) when nothing is hit.
+        """
+        self.sync()
+        vx, vy = velocity
+        if vx == 0 and vy == 0:
+            return 1.0, (0, 0)
+        tw, th = self.tile_size.tolist()
+        x0, y0, w, h = rect
+        x1, y1 = x0 + w, y0 + h
+        # edges resting on a cell border count as outside the next cell, eps absorbs float error
+        eps = self.eps
+        step_x = (vx > 0) - (vx < 0)
+        step_y = (vy > 0) - (vy < 0)
+        # column and row the leading edges will enter next, and the time they reach its border
+        if step_x > 0:
+            next_c = math.ceil(x1 / tw - eps)
+            t_x = (next_c * tw - x1) / vx
+        elif step_x < 0:
+            next_c = math.floor(x0 / tw + eps) - 1
+            t_x = ((next_c + 1) * tw - x0) / vx
+        else:
+            next_c, t_x = 0, math.inf
+        if step_y > 0:
+            next_r = math.ceil(y1 / th - eps)
+            t_y = (next_r * th - y1) / vy
+        elif step_y < 0:
+            next_r = math.floor(y0 / th + eps) - 1
+            t_y = ((next_r + 1) * th - y0) / vy
+        else:
+            next_r, t_y = 0, math.inf
+        dt_x = tw / abs(vx) if vx else math.inf
+        dt_y = th / abs(vy) if vy else math.inf
+        while min(t_x, t_y) < 1:
+            if t_x <= t_y:
+                t = t_x
+                # rows the box covers when its leading x edge reaches the new column
+                r0 = math.floor((y0 + vy * t) / th + eps)
+                r1 = math.ceil((y1 + vy * t) / th - eps) - 1
+                if self._blocked(next_c, next_c, r0, r1):
+                    return t, (-step_x, 0)
+                next_c += step_x
+                t_x += dt_x
+            else:
+                t = t_y
+                c0 = math.floor((x0 + vx * t) / tw + eps)
+                c1 = math.ceil((x1 + vx * t) / tw - eps) - 1
+                if self._blocked(c0, c1, next_r, next_r):
+                    return t, (0, -step_y)
+                next_r += step_y
+                t_y += dt_y
+        return 1.0, (0, 0)
+
+    def move(self, rect: pygame.Rect, velocity: tuple, slides: int = 2) -> tuple:
+        """
+        Move a hit box as far as it can go and slide the rest of the move along the walls it hits.
+        Args:
+            rect: the hit box at the start of the move, a pygame.Rect or float x, y, w, h.
+            velocity (tuple): x, y movement this frame.
+            slides (int, optional): walls the move may slide along before it stops. Defaults to 2.
+        Returns:
+            tuple: ((dx, dy) offset to apply, time of impact of the first cast, (sx, sy) slide vector after the first hit).
+        """
+        x, y, w, h = rect
+        dx = dy = 0.0
+        vx, vy = velocity
+        first_toi, first_slide = None, (0.0, 0.0)
+        for _ in range(slides + 1):
+            toi, (nx, ny) = self.sweep((x + dx, y + dy, w, h), (vx, vy))
+            dx += vx * toi
+            dy += vy * toi
+            # the part of the move after the hit with the blocked axis removed
+            vx = 0.0 if nx else vx * (1 - toi)
+            vy = 0.0 if ny else vy * (1 - toi)
+            if first_toi is None:
+                first_toi, first_slide = toi, (vx, vy)
+            if toi >= 1 or (vx == 0 and vy == 0):
+                break
+        return (dx, dy), first_toi, first_slide
+
+    def blocked_many(self, c0: np.ndarray, c1: np.ndarray, r0: np.ndarray, r1: np.ndarray) -> np.ndarray:
+        """_blocked for many inclusive cell ranges at once\n"""
+        rows, columns = self.grid.shape
+        outside = (c0 < 0) | (r0 < 0) | (c1 >= columns) | (r1 >= rows)
+        empty = (c1 < c0) | (r1 < r0)
+        c0, c1 = np.clip(c0, 0, columns - 1), np.clip(c1, 0, columns - 1)
+        r0, r1 = np.clip(r0, 0, rows - 1), np.clip(r1, 0, rows - 1)
+        table = self.blocked_sum
+        count = table[r1 + 1, c1 + 1] - table[r0, c1 + 1] - table[r1 + 1, c0] + table[r0, c0]
+        return outside | (~empty & (count > 0))
+
+    def sweep_many(self, rects: np.ndarray, velocities: np.ndarray) -> tuple:
+        """
+        sweep for many hit boxes at once, every loop step moves each box still in flight into its next cell.
+        Args:
+            rects (np.ndarray): (N, 4) float x, y, w, h hit boxes.
+            velocities (np.ndarray): (N, 2) x, y movement this frame.
+        Returns:
+            tuple: ((N,) time of impact, (N, 2) normal of the blocking cell face), 1 and (0, 0) where nothing is hit.
+        """
+        self.sync()
+        rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        velocities = np.asarray(velocities, dtype=np.float64).reshape(-1, 2)
+        n = len(rects)
+        toi = np.ones(n)
+        normal = np.zeros((n, 2), dtype=np.int64)
+        tw, th = self.tile_size.tolist()
+        eps = self.eps
+        x0, y0 = rects[:, 0], rects[:, 1]
+        x1, y1 = x0 + rects[:, 2], y0 + rects[:, 3]
+        vx, vy = velocities[:, 0], velocities[:, 1]
+        step_x = np.sign(vx).astype(np.int64)
+        step_y = np.sign(vy).astype(np.int64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # same next cells and border times as sweep, inf on axes the box does not move along
+            next_c = np.where(step_x > 0, np.ceil(x1 / tw - eps), np.floor(x0 / tw + eps) - 1).astype(np.int64)
+            next_r = np.where(step_y > 0, np.ceil(y1 / th - eps), np.floor(y0 / th + eps) - 1).astype(np.int64)
+            t_x = np.where(step_x > 0, (next_c * tw - x1) / vx, ((next_c + 1) * tw - x0) / vx)
+            t_y = np.where(step_y > 0, (next_r * th - y1) / vy, ((next_r + 1) * th - y0) / vy)
+            t_x[step_x == 0] = np.inf
+            t_y[step_y == 0] = np.inf
+            dt_x = np.where(step_x != 0, tw / np.abs(vx), np.inf)
+            dt_y = np.where(step_y != 0, th / np.abs(vy), np.inf)
+        live = np.flatnonzero(np.minimum(t_x, t_y) < 1)
+        while len(live):
+            on_x = t_x[live] <= t_y[live]
+            i = live[on_x]
+            t = t_x[i]
+            r0 = np.floor((y0[i] + vy[i] * t) / th + eps).astype(np.int64)
+            r1 = np.ceil((y1[i] + vy[i] * t) / th - eps).astype(np.int64) - 1
+            hit = self.blocked_many(next_c[i], next_c[i], r0, r1)
+            toi[i[hit]] = t[hit]
+            normal[i[hit], 0] = -step_x[i[hit]]
+            go = i[~hit]
+            next_c[go] += step_x[go]
+            t_x[go] += dt_x[go]
+            j = live[~on_x]
+            t = t_y[j]
+            c0 = np.floor((x0[j] + vx[j] * t) / tw + eps).astype(np.int64)
+            c1 = np.ceil((x1[j] + vx[j] * t) / tw - eps).astype(np.int64) - 1
+            hit_y = self.blocked_many(c0, c1, next_r[j], next_r[j])
+            toi[j[hit_y]] = t[hit_y]
+            normal[j[hit_y], 1] = -step_y[j[hit_y]]
+            go_y = j[~hit_y]
+            next_r[go_y] += step_y[go_y]
+            t_y[go_y] += dt_y[go_y]
+            live = np.concatenate([go, go_y])
+            live = live[np.minimum(t_x[live], t_y[live]) < 1]
+        return toi, normal
+
+    def move_many(self, rects: np.ndarray, velocities: np.ndarray, slides: int = 2) -> np.ndarray:
+        """
+        move for many hit boxes at once, so batched movement slides along walls the same way.
+        Args:
+            rects (np.ndarray): (N, 4) x, y, w, h hit boxes at the start of the move.
+            velocities (np.ndarray): (N, 2) x, y movement this frame.
+            slides (int, optional): walls a move may slide along before it stops. Defaults to 2.
+        Returns:
+            np.ndarray: (N, 2) offsets to apply.
+        """
+        rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        velocity = np.array(velocities, dtype=np.float64).reshape(-1, 2)
+        offset = np.zeros_like(velocity)
+        live = np.flatnonzero((velocity != 0).any(1))
+        for _ in range(slides + 1):
+            if not len(live):
+                break
+            boxes = rects[live].copy()
+            boxes[:, :2] += offset[live]
+            toi, normal = self.sweep_many(boxes, velocity[live])
+            offset[live] += velocity[live] * toi[:, None]
+            # the part of the move after the hit with the blocked axis removed
+            velocity[live] = np.where(normal != 0, 0.0, velocity[live] * (1 - toi)[:, None])
+            live = live[(toi < 1) & (velocity[live] != 0).any(1)]
+        return offset
+
+    def __repr__(self):
+        return f'WalkGrid({self.grid.shape}, walkable={int(self.grid.sum())})'
+
+
+def lower_envelope(f: np.ndarray) -> np.ndarray:
+    """
+    Squared distance transform of every row, d[r, x] = min over q of (x - q)**2 + f[r, q], rows of inf stay inf.
+    Felzenszwalb-Huttenlocher lower envelope of parabolas, linear in the row length. the loops go over the
+    columns and each step handles every row at once.
+    """
+    rows, columns = f.shape
+    q2 = f + np.arange(columns, dtype=np.float64) ** 2
+    # per row stack of the parabolas on the envelope and where each starts
+    v = np.zeros((rows, columns), dtype=np.int64)
+    z = np.full((rows, columns + 1), np.inf)
+    k = np.full(rows, -1, dtype=np.int64)
+    finite = np.isfinite(f)
+    for q in range(columns):
+        rs = np.flatnonzero(finite[:, q])
+        if not len(rs):
+            continue
+        # pop the parabolas the new one hides, z[0] is -inf so a row never pops its last one
+        live = rs
+        while len(live):
+            live = live[k[live] >= 0]
+            vk = v[live, k[live]]
+            s = (q2[live, q] - q2[live, vk]) / (2 * (q - vk))
+            live = live[s <= z[live, k[live]]]
+            k[live] -= 1
+        s = np.full(len(rs), -np.inf)
+        kr = k[rs]
+        has = kr >= 0
+        vk = v[rs[has], kr[has]]
+        s[has] = (q2[rs[has], q] - q2[rs[has], vk]) / (2 * (q - vk))
+        k[rs] = kr + 1
+        v[rs, kr + 1] = q
+        z[rs, kr + 1] = s
+        z[rs, kr + 2] = np.inf
+    d = np.full(f.shape, np.inf)
+    rs = np.flatnonzero(k >= 0)
+    j = np.zeros(len(rs), dtype=np.int64)
+    for x in range(columns):
+        # walk each row to the parabola covering x
+        ahead = np.flatnonzero(z[rs, j + 1] < x)
+        while len(ahead):
+            j[ahead] += 1
+            ahead = ahead[z[rs[ahead], j[ahead] + 1] < x]
+        vj = v[rs, j]
+        d[rs, x] = (x - vj) ** 2 + f[rs, vj]
+    return d
+
+
+def distance_to(mask: np.ndarray) -> np.ndarray:
+    """
+    Euclidean distance in cells from every cell to the nearest True cell, inf if the mask has none.
+    separable transform: a vectorized nearest-in-column pass then the lower envelope transform over each row,
+    both linear in the number of cells.
+    """
+    rows = mask.shape[0]
+    idx = np.arange(rows, dtype=np.float64)[:, None]
+    above = np.maximum.accumulate(np.where(mask, idx, -np.inf), axis=0)
+    below = np.minimum.accumulate(np.where(mask, idx, np.inf)[::-1], axis=0)[::-1]
+    g2 = np.minimum(idx - above, below - idx) ** 2
+    return np.sqrt(lower_envelope(g2))
+
+
+class DistanceField:
+    def __init__(self, walk_grid: WalkGrid, cell: int = 8):
+        """
+        Signed distance to the nearest wall over the walkable area, built once per level from a WalkGrid.
+        positive on walkable ground, negative inside walls, outside the map counts as wall.
+        Args:
+            walk_grid (WalkGrid): the walkability the field is built from.
+            cell (int, optional): world pixels per field cell. Defaults to 8.
+        """
+        self.walk_grid = walk_grid
+        self.cell = cell
+        self.version = -1
+        self.build()
+
+    def build(self):
+        tile_w, tile_h = self.walk_grid.tile_size.tolist()
+        rows, columns = self.walk_grid.shape
+        c = self.cell
+        h, w = -(-rows * tile_h // c), -(-columns * tile_w // c)
+        # walkability sampled at the field cell centers, with a one cell wall ring around the map
+        ys, xs = (np.indices((h, w)) + 0.5) * c
+        walkable = np.zeros((h + 2, w + 2), dtype=bool)
+        walkable[1:-1, 1:-1] = self.walk_grid.walkable_at(np.stack([xs.ravel(), ys.ravel()], 1)).reshape(h, w)
+        # center to center distances, half a cell puts the zero crossing on the wall border
+        inside = distance_to(~walkable) - 0.5
+        outside = distance_to(walkable) - 0.5
+        self.field = np.where(walkable, inside, -outside) * c
+        # gradient points away from the nearest wall, per pixel
+        grad_y, grad_x = np.gradient(self.field, c)
+        self.gradient = np.stack([grad_x, grad_y], axis=-1)
+        self.version = self.walk_grid.version
+
+    def sync(self):
+        """rebuild the field if the walk grid changed\n"""
+        self.walk_grid.sync()
+        if self.walk_grid.version != self.version:
+            self.build()
+
+    def _cells(self, points: np.ndarray) -> tuple:
+        # field index of world points, the wall ring shifts everything by one cell
+        h, w = self.field.shape
+        c = np.clip((points[:, 0] // self.cell).astype(np.int64) + 1, 0, w - 1)
+        r = np.clip((points[:, 1] // self.cell).astype(np.int64) + 1, 0, h - 1)
+        return r, c
+
+    def distances(self, points) -> np.ndarray:
+        """signed distance to the nearest wall of (N, 2) world points\n"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return self.field[self._cells(points)]
+
+    def gradients(self, points) -> np.ndarray:
+        """(N, 2) direction away from the nearest wall at world points, about unit length near walls\n"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return self.gradient[self._cells(points)]
+
+    def distance(self, pos: tuple) -> float:
+        return float(self.distances([pos])[0])
+
+    def direction(self, pos: tuple) -> tuple:
+        gx, gy = self.gradients([pos])[0].tolist()
+        return gx, gy
+
+    def __repr__(self):
+        return f'DistanceField({self.field.shape}, cell={self.cell})'
+
+
+class MaskCache:
+    def __init__(self, max_entries: int = 2048):
+        """
+        Cache of collision masks.
+        Args:
+            max_entries (int, optional): masks to keep before the oldest are dropped. Defaults to 2048.
+        """
+        self.max_entries = max_entries
+        # (id(surface), frame, orientation) -> (surface, mask), the surface is kept so its id can not be reused
+        self.cache = OrderedDict()
+
+    def get(self, surface: pygame.Surface, frame=None, orientation=None) -> pygame.mask.Mask:
+        """return the mask of a surface, building it the first time the surface is seen\n"""
+        key = (id(surface), frame, orientation)
+        entry = self.cache.get(key)
+        if entry is not None and entry[0] is surface:
+            self.cache.move_to_end(key)
+            return entry[1]
+        mask = pygame.mask.from_surface(surface)
+        self.cache[key] = surface, mask
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return mask
+
+    def sprite_mask(self, sprite: pygame.sprite.Sprite) -> pygame.mask.Mask:
+        """mask of a sprite's current image, sprites may set frame and flipped to tell their frames apart\n"""
+        return self.get(sprite.image, getattr(sprite, 'frame', None), getattr(sprite, 'flipped', None))
+
+    def __len__(self):
+        return len(self.cache)
+
+
+def collide_precise(sprite: pygame.sprite.Sprite, others, masks: MaskCache) -> list:
+    """
+    Pixel perfect collision of a sprite against other sprites.
+    Args:
+        sprite (pygame.sprite.Sprite): the moving sprite.
+        others: candidate sprites, usually from a SpatialHash query.
+        masks (MaskCache): cache the masks are taken from.
+    Returns:
+        list: the sprites whose opaque pixels overlap the sprite's.
+    """
+    rect = sprite.rect
+    hits = []
+    mask = None
+    for other in others:
+        # cheap rect test first, masks are only touched for overlapping pairs
+        if other is sprite or not rect.colliderect(other.rect):
+            continue
+        if mask is None:
+            mask = masks.sprite_mask(sprite)
+        offset = (other.rect.x - rect.x, other.rect.y - rect.y)
+        if mask.overlap(masks.sprite_mask(other), offset):
+            hits.append(other)
+    return hits
@@ -0,0 +1,159 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# offline collision extraction from background or mask images, replaces drawing collision by hand
+# with the mouse recorder in MyGame.record_mouse_positions.
+#   * the image is read with pygame.surfarray and walkable pixels are picked by color distance or alpha with NumPy.
+#   * the pixel mask is reduced to a walkability grid, one cell per cell x cell block of pixels.
+#   * the borders between walkable and blocked cells are traced into closed contours and simplified
+#     into CollisionGeometry segments.
+# usage: python collision_extract.py castle_night.png castle --color 200 170 110 --tolerance 40 --cell 8
+# writes castle_geometry.json (CollisionGeometry.load) and castle_walk.npz (load_walk_grid).
+
+import argparse
+from collections import defaultdict
+import numpy as np
+import pygame
+
+from collision_geometry import CollisionGeometry
+
+
+def load_pixels(fname: str) -> tuple:
+    """(w, h, 3) rgb and (w, h) alpha arrays of an image, in surfarray (x, y) order\n"""
+    surface = pygame.image.load(fname)
+    return pygame.surfarray.array3d(surface), pygame.surfarray.array_alpha(surface)
+
+
+def walkable_mask(rgb: np.ndarray, alpha: np.ndarray = None, color: tuple = None,
+                  tolerance: float = 40, alpha_threshold: int = None) -> np.ndarray:
+    """
+    Threshold the walkable pixels of an image.
+    Args:
+        rgb (np.ndarray): (w, h, 3) pixels from pygame.surfarray.
+        alpha (np.ndarray, optional): (w, h) alpha from pygame.surfarray. Defaults to None.
+        color (tuple, optional): rgb of the walkable ground. Defaults to None.
+        tolerance (float, optional): max rgb distance from color that still counts as walkable. Defaults to 40.
+        alpha_threshold (int, optional): pixels with at least this alpha are walkable, used instead of color. Defaults to None.
+    Returns:
+        np.ndarray: (rows, columns) bool mask, True where walkable.
+    """
+    if alpha_threshold is not None:
+        if alpha is None:
+            raise ValueError('alpha_threshold needs the alpha channel')
+        mask = alpha >= alpha_threshold
+    elif color is not None:
+        # squared distance in int32, uint8 math would wrap
+        diff = rgb.astype(np.int32) - np.asarray(color, dtype=np.int32)
+        mask = (diff * diff).sum(axis=2) <= tolerance * tolerance
+    else:
+        raise ValueError('a walkable color or alpha_threshold is needed')
+    # surfarray is (x, y), grids are (row, column)
+    return np.ascontiguousarray(mask.T)
+
+
+def downsample(mask: np.ndarray, cell: int, coverage: float = 0.5) -> np.ndarray:
+    """reduce a pixel mask to one cell per cell x cell block, a cell is walkable if at least coverage of it is\n"""
+    if cell <= 1:
+        return mask.copy()
+    rows, columns = mask.shape[0] // cell, mask.shape[1] // cell
+    blocks = mask[:rows * cell, :columns * cell].reshape(rows, cell, columns, cell)
+    return blocks.mean(axis=(1, 3)) >= coverage
+
+
+def boundary_edges(grid: np.ndarray) -> np.ndarray:
+    """(M, 4) unit edges between walkable and blocked cells in cell units, outside the grid is blocked\n"""
+    grid = np.asarray(grid, dtype=bool)
+    # vertical edges, a change between horizontally neighbouring cells
+    padded = np.pad(grid, ((0, 0), (1, 1)))
+    r, c = np.nonzero(padded[:, 1:] != padded[:, :-1])
+    vertical = np.stack([c, r, c, r + 1], axis=1)
+    # horizontal edges, a change between vertically neighbouring cells
+    padded = np.pad(grid, ((1, 1), (0, 0)))
+    r, c = np.nonzero(padded[1:] != padded[:-1])
+    horizontal = np.stack([c, r, c + 1, r], axis=1)
+    return np.concatenate([vertical, horizontal]).astype(np.int64)
+
+
+def trace_contours(edges: np.ndarray) -> list:
+    """chain unit edges into contours, returns a list of (N, 2) point arrays, closed contours repeat their first point\n"""
+    # corner -> indexes of the edges that touch it
+    touching = defaultdict(list)
+    ends = [((x0, y0), (x1, y1)) for x0, y0, x1, y1 in edges.tolist()]
+    for i, (a, b) in enumerate(ends):
+        touching[a].append(i)
+        touching[b].append(i)
+    used = bytearray(len(ends))
+    contours = []
+    for first in range(len(ends)):
+        if used[first]:
+            continue
+        used[first] = 1
+        start, point = ends[first]
+        line = [start, point]
+        while point != start:
+            for i in touching[point]:
+                if not used[i]:
+                    break
+            else:
+                # open chain, only happens with corners shared by more than two edges
+                break
+            used[i] = 1
+            a, b = ends[i]
+            point = b if a == point else a
+            line.append(point)
+        contours.append(np.asarray(line, dtype=np.float64))
+    return contours
+
+
+def extract(mask: np.ndarray, cell: int = 8, scale: tuple = (1, 1), tolerance: float = 1.0,
+            coverage: float = 0.5) -> tuple:
+    """
+    Build the walkability grid and collision geometry of a pixel mask.
+    Args:
+        mask (np.ndarray): (rows, columns) walkable pixel mask from walkable_mask.
+        cell (int, optional): image pixels per grid cell. Defaults to 8.
+        scale (tuple, optional): world pixels per image pixel on x and y. Defaults to (1, 1).
+        tolerance (float, optional): simplification tolerance in cells. Defaults to 1.0.
+        coverage (float, optional): walkable share of a cell's pixels needed for the cell to be walkable. Defaults to 0.5.
+    Returns:
+        tuple: (grid, cell_size, geometry), cell_size is the world size of one grid cell.
+    """
+    grid = downsample(mask, cell, coverage)
+    contours = trace_contours(boundary_edges(grid))
+    cell_size = np.array([cell * scale[0], cell * scale[1]], dtype=np.float64)
+    # the tolerance is given in cells so it does not depend on the world scale
+    geometry = CollisionGeometry.from_polylines([c * cell_size for c in contours], tolerance * cell_size.min())
+    return grid, tuple(cell_size.tolist()), geometry
+
+
+def save_walk_grid(fname: str, grid: np.ndarray, cell_size: tuple):
+    np.savez_compressed(fname, grid=grid, cell_size=np.asarray(cell_size, dtype=np.float64))
+
+
+def load_walk_grid(fname: str) -> tuple:
+    """(grid, cell_size) written by save_walk_grid\n"""
+    with np.load(fname) as data:
+        return data['grid'], tuple(data['cell_size'].tolist())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='extract a walkability grid and collision segments from an image')
+    parser.add_argument('image', type=str, help='background or mask image, e.g. castle_night.png')
+    parser.add_argument('output', type=str, help='output prefix, writes <output>_geometry.json and <output>_walk.npz')
+    parser.add_argument('--color', type=int, nargs=3, default=None, help='rgb of the walkable ground')
+    parser.add_argument('--tolerance', type=float, default=40, help='max rgb distance from --color that is walkable')
+    parser.add_argument('--alpha', type=int, default=None, help='pixels with at least this alpha are walkable')
+    parser.add_argument('--cell', type=int, default=8, help='image pixels per walkability cell')
+    parser.add_argument('--coverage', type=float, default=0.5, help='walkable share of a cell needed to walk on it')
+    parser.add_argument('--simplify', type=float, default=1.0, help='simplification tolerance in cells')
+    parser.add_argument('--world_size', type=int, nargs=2, default=None,
+                        help='size the image is drawn at in the game, defaults to the image size')
+    args = parser.parse_args()
+    rgb, alpha = load_pixels(args.image)
+    scale = (1, 1) if args.world_size is None else (args.world_size[0] / rgb.shape[0], args.world_size[1] / rgb.shape[1])
+    mask = walkable_mask(rgb, alpha, args.color, args.tolerance, args.alpha)
+    grid, cell_size, geometry = extract(mask, args.cell, scale, args.simplify, args.coverage)
+    geometry.save(f'{args.output}_geometry.json')
+    save_walk_grid(f'{args.output}_walk.npz', grid, cell_size)
+    print(f'{int(mask.sum())} of {mask.size} pixels walkable -> grid {grid.shape} of {cell_size} cells, '
+          f'{len(geometry)} segments, saved to {args.output}_geometry.json and {args.output}_walk.npz')
@@ -0,0 +1,223 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# compiler for recorded collision point clouds like castle_collision.json and mouse_positions_m.json.
+# the recordings are thousands of raw [x, y] mouse samples, this module turns them into compact geometry:
+#   * samples are split into ordered strokes wherever the recording jumps.
+#   * each stroke is simplified with Ramer-Douglas-Peucker to a tolerance and stored as line segments.
+#   * the segments are stored in a bounding volume hierarchy so rect and movement queries only test
+#     the few segments near them.
+# usage: python collision_geometry.py castle_collision.json castle_collision_c.json --tolerance 2
+
+import argparse
+import json
+import numpy as np
+import pygame
+
+
+def split_strokes(points, max_gap: float = 8) -> list:
+    """split recorded samples into strokes wherever consecutive samples are more than max_gap apart\n"""
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(pts) == 0:
+        return []
+    # drop repeated samples, the mouse often reports the same position twice
+    keep = np.concatenate(([True], np.any(np.diff(pts, axis=0) != 0, axis=1)))
+    pts = pts[keep]
+    gaps = np.hypot(*np.diff(pts, axis=0).T)
+    return np.split(pts, np.nonzero(gaps > max_gap)[0] + 1)
+
+
+def simplify(polyline: np.ndarray, tolerance: float) -> np.ndarray:
+    """Ramer-Douglas-Peucker simplification, keeps the points further than tolerance from the simplified line\n"""
+    n = len(polyline)
+    if n < 3:
+        return polyline
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = polyline[first], polyline[last]
+        inner = polyline[first + 1:last]
+        d = end - start
+        length = np.hypot(*d)
+        if length == 0:
+            dist = np.hypot(*(inner - start).T)
+        else:
+            # perpendicular distance of every inner point to the start-end line
+            dist = np.abs(d[0] * (inner[:, 1] - start[1]) - d[1] * (inner[:, 0] - start[0])) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = first + 1 + i
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return polyline[keep]
+
+
+class CollisionGeometry:
+    def __init__(self, segments, leaf_size: int = 4):
+        """
+        Line segment collision geometry stored in a bounding volume hierarchy.
+        Args:
+            segments: (M, 4) x0, y0, x1, y1 segments.
+            leaf_size (int, optional): segments per leaf of the hierarchy. Defaults to 4.
+        """
+        self.leaf_size = leaf_size
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        # node rows: min_x, min_y, max_x, max_y, left, right, start, count (leaves have left == -1)
+        self.nodes = []
+        order = np.arange(len(segments))
+        self._leaf_order = []
+        if len(segments):
+            self.build(segments, order)
+        self.segments = segments[np.asarray(self._leaf_order, dtype=np.int64)] if len(segments) else segments
+        self.nodes = np.asarray(self.nodes, dtype=np.float64).reshape(-1, 8)
+        del self._leaf_order
+        # plain lists are much faster than NumPy rows for the per node tests of a query
+        self._node_list = self.nodes.tolist()
+        self._segment_list = self.segments.tolist()
+
+    @classmethod
+    def from_points(cls, points, tolerance: float = 2.0, max_gap: float = 8, leaf_size: int = 4):
+        """compile recorded [x, y] samples into simplified segments\n"""
+        return cls.from_polylines(split_strokes(points, max_gap), tolerance, leaf_size)
+
+    @classmethod
+    def from_polylines(cls, polylines, tolerance: float = 2.0, leaf_size: int = 4):
+        """simplify ordered (N, 2) point lists and store them as segments\n"""
+        segments = []
+        for stroke in polylines:
+            line = simplify(np.asarray(stroke, dtype=np.float64).reshape(-1, 2), tolerance)
+            if len(line) == 1:
+                # a lone sample still blocks movement as a zero length segment
+                line = np.vstack([line, line])
+            segments.append(np.hstack([line[:-1], line[1:]]))
+        return cls(np.vstack(segments) if segments else np.empty((0, 4)), leaf_size)
+
+    def build(self, segments: np.ndarray, order: np.ndarray) -> int:
+        """recursively split the segments on the longest axis at the median, returns the node index\n"""
+        subset = segments[order]
+        min_x = min(subset[:, 0].min(), subset[:, 2].min())
+        min_y = min(subset[:, 1].min(), subset[:, 3].min())
+        max_x = max(subset[:, 0].max(), subset[:, 2].max())
+        max_y = max(subset[:, 1].max(), subset[:, 3].max())
+        index = len(self.nodes)
+        self.nodes.append([min_x, min_y, max_x, max_y, -1, -1, len(self._leaf_order), len(order)])
+        if len(order) <= self.leaf_size:
+            self._leaf_order.extend(order.tolist())
+            return index
+        # split on the segment centers along the longest side of the box
+        axis = 0 if max_x - min_x >= max_y - min_y else 1
+        centers = (subset[:, axis] + subset[:, axis + 2]) / 2
+        sort = np.argsort(centers, kind='stable')
+        half = len(order) // 2
+        left = self.build(segments, order[sort[:half]])
+        right = self.build(segments, order[sort[half:]])
+        self.nodes[index][4:6] = [left, right]
+        return index
+
+    def query_box(self, min_x: float, min_y: float, max_x: float, max_y: float) -> list:
+        """indexes into self.segments of the leaves whose bounds overlap the box, not yet tested exactly\n"""
+        if len(self.nodes) == 0:
+            return []
+        found = []
+        nodes = self._node_list
+        stack = [0]
+        while stack:
+            n = nodes[stack.pop()]
+            if n[0] > max_x or n[2] < min_x or n[1] > max_y or n[3] < min_y:
+                continue
+            if n[4] < 0:
+                start = int(n[6])
+                found.extend(range(start, start + int(n[7])))
+            else:
+                stack.append(int(n[4]))
+                stack.append(int(n[5]))
+        return found
+
+    def query_rect(self, rect: pygame.Rect) -> list:
+        """indexes of the segments that touch the rect\n"""
+        rect = pygame.Rect(rect)
+        hits = []
+        segments = self._segment_list
+        for i in self.query_box(rect.left, rect.top, rect.right - 1, rect.bottom - 1):
+            if rect.clipline(*segments[i]):
+                hits.append(i)
+        return hits
+
+    def rect_hits(self, rect: pygame.Rect) -> bool:
+        """True if any segment touches the rect\n"""
+        rect = pygame.Rect(rect)
+        segments = self._segment_list
+        for i in self.query_box(rect.left, rect.top, rect.right - 1, rect.bottom - 1):
+            if rect.clipline(*segments[i]):
+                return True
+        return False
+
+    def segment_hits(self, p0: tuple, p1: tuple) -> list:
+        """indexes of the segments crossed by the movement from p0 to p1\n"""
+        (ax, ay), (bx, by) = p0, p1
+        hits = []
+        segments = self._segment_list
+        for i in self.query_box(min(ax, bx), min(ay, by), max(ax, bx), max(ay, by)):
+            cx, cy, dx, dy = segments[i]
+            if segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+                hits.append(i)
+        return hits
+
+    def to_json(self) -> dict:
+        return {'segments': self.segments.tolist(), 'leaf_size': self.leaf_size}
+
+    @classmethod
+    def from_json(cls, data: dict):
+        return cls(data['segments'], data.get('leaf_size', 4))
+
+    def save(self, fname: str):
+        with open(fname, 'w') as f:
+            json.dump(self.to_json(), f)
+
+    @classmethod
+    def load(cls, fname: str):
+        with open(fname) as f:
+            return cls.from_json(json.load(f))
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __repr__(self):
+        return f'CollisionGeometry(segments={len(self.segments)}, nodes={len(self.nodes)})'
+
+
+def segments_intersect(ax, ay, bx, by, cx, cy, dx, dy) -> bool:
+    """True if segment ab touches segment cd\n"""
+    def orient(px, py, qx, qy, rx, ry):
+        v = (qx - px) * (ry - py) - (qy - py) * (rx - px)
+        return (v > 0) - (v < 0)
+
+    def on_segment(px, py, qx, qy, rx, ry):
+        return min(px, qx) <= rx <= max(px, qx) and min(py, qy) <= ry <= max(py, qy)
+
+    o1, o2 = orient(ax, ay, bx, by, cx, cy), orient(ax, ay, bx, by, dx, dy)
+    o3, o4 = orient(cx, cy, dx, dy, ax, ay), orient(cx, cy, dx, dy, bx, by)
+    if o1 != o2 and o3 != o4:
+        return True
+    # collinear cases
+    return ((o1 == 0 and on_segment(ax, ay, bx, by, cx, cy)) or (o2 == 0 and on_segment(ax, ay, bx, by, dx, dy)) or
+            (o3 == 0 and on_segment(cx, cy, dx, dy, ax, ay)) or (o4 == 0 and on_segment(cx, cy, dx, dy, bx, by)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='compile a recorded collision point cloud into simplified segments')
+    parser.add_argument('source', type=str, help='json list of [x, y] samples, e.g. castle_collision.json')
+    parser.add_argument('output', type=str, help='json file the compiled segments are written to')
+    parser.add_argument('--tolerance', type=float, default=2.0, help='max distance in pixels a simplified line may move')
+    parser.add_argument('--max_gap', type=float, default=8.0, help='distance between samples that starts a new stroke')
+    args = parser.parse_args()
+    with open(args.source) as f:
+        points = json.load(f)
+    geometry = CollisionGeometry.from_points(points, args.tolerance, args.max_gap)
+    geometry.save(args.output)
+    print(f'{len(points)} samples -> {len(geometry)} segments, saved to {args.output}')
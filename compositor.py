@@ -0,0 +1,49 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# thread pool for rebake jobs like background chunks, background bands and the debug overlay layer.
+# pygame releases the GIL while it blits and transforms, so independent jobs that each write into
+# their own target surface run on all cores. Jobs must never share a target surface, and must not blit
+# from the same source surface either, a source two jobs need is copied on the main thread before submit.
+# results are collected with join before the frame is presented.
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Compositor:
+    def __init__(self, workers: int = None):
+        """
+        Create a thread pool for rebake jobs.
+        Args:
+            workers (int, optional): number of worker threads. Defaults to the cpu count.
+        """
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='compositor')
+        self.pending = []
+
+    def submit(self, job, *args, **kwargs):
+        """start a job on the pool, returns its future\n"""
+        future = self.pool.submit(job, *args, **kwargs)
+        self.pending.append(future)
+        return future
+
+    def join(self) -> list:
+        """wait for every submitted job, returns their results in submit order\n
+        exceptions raised by a job are raised here on the main thread.
+        """
+        pending, self.pending = self.pending, []
+        return [future.result() for future in pending]
+
+    def run(self, jobs: list) -> list:
+        """run a list of (job, *args) tuples across the pool and wait for all of them\n"""
+        for job, *args in jobs:
+            self.submit(job, *args)
+        return self.join()
+
+    def shutdown(self):
+        self.join()
+        self.pool.shutdown()
+
+    def __repr__(self):
+        return f'Compositor(workers={self.workers}, pending={len(self.pending)})'
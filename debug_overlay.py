@@ -0,0 +1,121 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# debug overlay for recorded collision points and debug vectors. This class is responsible for:
+#   * baking the static recorded points into one cached transparent layer. points recorded later are drawn
+#     straight onto it, it only grows, with room to spare, when a point lands past its edge.
+#   * collecting the dynamic debug lines (enemy paths, agro lines) during the frame.
+#   * drawing the lines in batches, lines that share an end point (every enemy tracking the player)
+#     are drawn as one pygame.draw.lines call instead of one draw call per enemy.
+
+import pygame
+
+
+class DebugOverlay:
+    def __init__(self, points: list = [], dot_size: tuple = (4, 4), dot_color: tuple = (255, 0, 0),
+                 line_color: tuple = (0, 255, 0), line_width: int = 2):
+        """
+        Create a debug overlay.
+        Args:
+            points (list, optional): recorded [x, y] world positions drawn as dots. Defaults to [].
+            dot_size (tuple, optional): size of each recorded dot. Defaults to (4, 4).
+            dot_color (tuple, optional): color of the recorded dots. Defaults to red.
+            line_color (tuple, optional): color of the debug lines. Defaults to green.
+            line_width (int, optional): width of the debug lines. Defaults to 2.
+        """
+        self.points = [tuple(p) for p in points]
+        self.dot_size = dot_size
+        self.dot_color = dot_color
+        self.line_color = line_color
+        self.line_width = line_width
+        # baked layer only covers the bounding box of the points
+        self.layer = None
+        self.layer_rect = pygame.Rect(0, 0, 0, 0)
+        self.dirty = True
+        # the layer was drawn on since its mip levels were made
+        self.mip_stale = False
+        # end point -> start points of the lines queued this frame
+        self.lines = {}
+
+    def set_points(self, points: list):
+        self.points = [tuple(p) for p in points]
+        self.dirty = True
+
+    def add_point(self, pos: tuple):
+        """record a new point and draw its dot onto the baked layer, only a full rebake draws every point\n"""
+        pos = tuple(pos)
+        self.points.append(pos)
+        if self.dirty or self.layer is None:
+            self.dirty = True
+            return
+        dot = pygame.Rect(pos, self.dot_size)
+        if not self.layer_rect.contains(dot):
+            self.grow(dot)
+        self.layer.fill(self.dot_color, dot.move(-self.layer_rect.x, -self.layer_rect.y))
+        self.mip_stale = True
+
+    def grow(self, dot: pygame.Rect):
+        """copy the layer onto a larger one that holds the dot, padded on the sides it grew on\n
+        a stroke heading outward then reallocates a few times instead of every frame."""
+        old = self.layer_rect
+        pad_w, pad_h = max(old.w // 2, dot.w), max(old.h // 2, dot.h)
+        left = min(old.left, dot.left - pad_w) if dot.left < old.left else old.left
+        top = min(old.top, dot.top - pad_h) if dot.top < old.top else old.top
+        right = max(old.right, dot.right + pad_w) if dot.right > old.right else old.right
+        bottom = max(old.bottom, dot.bottom + pad_h) if dot.bottom > old.bottom else old.bottom
+        self.layer_rect = pygame.Rect(left, top, right - left, bottom - top)
+        layer = pygame.Surface(self.layer_rect.size, pygame.SRCALPHA)
+        layer.blit(self.layer, (old.x - left, old.y - top))
+        self.layer = layer
+
+    def bake(self):
+        """draw every recorded point onto a new transparent layer\n"""
+        self.dirty = False
+        self.mip_stale = False
+        if not self.points:
+            self.layer = None
+            return
+        xs = [p[0] for p in self.points]
+        ys = [p[1] for p in self.points]
+        w, h = self.dot_size
+        self.layer_rect = pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + w, max(ys) - min(ys) + h)
+        self.layer = pygame.Surface(self.layer_rect.size, pygame.SRCALPHA)
+        x0, y0 = self.layer_rect.topleft
+        fill, color = self.layer.fill, self.dot_color
+        for x, y in self.points:
+            fill(color, (x - x0, y - y0, w, h))
+
+    def queue_line(self, start: tuple, end: tuple):
+        """queue a world space line to be drawn with the next draw call\n"""
+        self.lines.setdefault(tuple(end), []).append(start)
+
+    def draw(self, surface: pygame.Surface, camera):
+        """draw the baked layer and the queued lines relative to the camera, then clear the lines\n"""
+        if self.dirty:
+            self.bake()
+        level = getattr(camera, 'level', 0)
+        if self.layer is not None and camera.rect.colliderect(self.layer_rect):
+            if level and self.mip_stale:
+                camera.mips.discard(self.layer)
+                self.mip_stale = False
+            layer = self.layer if level == 0 else camera.mips.get(self.layer, level)
+            surface.blit(layer, camera.to_screen(self.layer_rect.topleft))
+        self.draw_lines(surface, camera)
+
+    def draw_lines(self, surface: pygame.Surface, camera):
+        to_screen, color, width = camera.to_screen, self.line_color, self.line_width
+        for end, starts in self.lines.items():
+            hub = to_screen(end)
+            if len(starts) == 1:
+                pygame.draw.line(surface, color, to_screen(starts[0]), hub, width)
+                continue
+            # go out and back to the shared end point so the lines form a single polyline
+            points = [hub]
+            for start in starts:
+                points.append(to_screen(start))
+                points.append(hub)
+            pygame.draw.lines(surface, color, False, points, width)
+        self.lines = {}
+
+    def __repr__(self):
+        return f'DebugOverlay(points={len(self.points)}, lines={sum(map(len, self.lines.values()))})'
@@ -0,0 +1,114 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# in game frame capture for sharing perf regressions and gameplay bugs without an external recorder.
+#   * the presented frame is copied into the next free buffer of a preallocated ring, one blit per frame.
+#   * a background writer thread saves the buffers as a png sequence or raw frame files.
+#   * when the writer falls behind and every buffer is in use the frame is dropped instead of stalling the game.
+#   * numbering continues after the frames already in the folder, so a new session never overwrites an old one.
+# works without a window, e.g. SDL_VIDEODRIVER=dummy runs.
+
+import os
+import queue
+import threading
+import pygame
+
+
+class FrameCapture:
+    formats = ('png', 'raw')
+
+    def __init__(self, size: tuple, out_dir: str = 'captures', buffers: int = 8, fmt: str = 'png'):
+        """
+        Create a frame capture ring.
+        Args:
+            size (tuple): size of the frames that will be captured.
+            out_dir (str, optional): folder the frames are written to. Defaults to 'captures'.
+            buffers (int, optional): number of preallocated frame buffers. Defaults to 8.
+            fmt (str, optional): 'png' for a png sequence, 'raw' for raw RGB frame files. Defaults to 'png'.
+        """
+        if fmt not in self.formats:
+            raise ValueError(f"capture format must be one of {self.formats} not '{fmt}'")
+        self.size = tuple(size)
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.ring = [pygame.Surface(self.size, depth=24) for _ in range(buffers)]
+        # indexes of buffers the writer is done with
+        self.free = queue.Queue()
+        for i in range(buffers):
+            self.free.put(i)
+        # (buffer index, frame number) waiting to be written, None stops the writer
+        self.written = queue.Queue()
+        self.active = False
+        self.frame = 0
+        self.dropped = 0
+        self.writer = None
+
+    def start(self):
+        if self.active:
+            return
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.frame = max(self.frame, self.next_frame())
+        self.dropped = 0
+        self.writer = threading.Thread(target=self.write_frames, name='frame_capture', daemon=True)
+        self.writer.start()
+        self.active = True
+
+    def next_frame(self) -> int:
+        '''number after the highest frame already saved in out_dir, 0 for an empty folder\n'''
+        last = -1
+        for name in os.listdir(self.out_dir):
+            stem, _, ext = name.partition('.')
+            if stem.startswith('frame_') and stem[6:].isdigit() and ext in self.formats:
+                last = max(last, int(stem[6:]))
+        return last + 1
+
+    def stop(self):
+        """stop capturing, waits for the writer to finish the frames already captured\n"""
+        if not self.active:
+            return
+        self.active = False
+        self.written.put(None)
+        self.writer.join()
+        self.writer = None
+
+    def toggle(self) -> bool:
+        if self.active:
+            self.stop()
+        else:
+            self.start()
+        return self.active
+
+    def capture(self, surface: pygame.Surface):
+        """copy the frame into a free buffer and hand it to the writer, call after the frame is drawn\n"""
+        if not self.active:
+            return
+        try:
+            i = self.free.get_nowait()
+        except queue.Empty:
+            # the writer is behind, never block the main loop
+            self.dropped += 1
+            return
+        # the single copy made on the main thread
+        self.ring[i].blit(surface, (0, 0))
+        self.written.put((i, self.frame))
+        self.frame += 1
+
+    def write_frames(self):
+        while True:
+            item = self.written.get()
+            if item is None:
+                return
+            i, frame = item
+            self.save(self.ring[i], frame)
+            self.free.put(i)
+
+    def save(self, buffer: pygame.Surface, frame: int):
+        path = os.path.join(self.out_dir, f'frame_{frame:06d}.{self.fmt}')
+        if self.fmt == 'png':
+            pygame.image.save(buffer, path)
+        else:
+            with open(path, 'wb') as f:
+                f.write(pygame.image.tobytes(buffer, 'RGB'))
+
+    def __repr__(self):
+        return f'FrameCapture({self.size}, active={self.active}, frames={self.frame}, dropped={self.dropped})'
@@ -17,17 +17,49 @@ from pygame.locals import *
 import pygame.font as font
 # import UI_elements as UI
 from UI_elements_temp import *
-from GameObjects import Player, Enemy, EnemyGroup, txtSprite
+from GameObjects import Player, Enemy, EnemyGroup, txtSprite, YSortGroup
 # import gameGUI.Base_Element as BE
 from gameGUI import base_Element as BE
 from sceneObj import Background
 from dev_tools import MousePositions as MP
+from render_target import RenderTarget
+from camera import ZoomCamera, WorldChunks
+from lighting import LightMap
+from debug_overlay import DebugOverlay
+from compositor import Compositor
+from frame_capture import FrameCapture
+from minimap import Minimap
+from collision import WalkGrid, DistanceField, MaskCache, collide_precise
+from spatial import SpatialHash
+from rect_array import RectArray
+from navigation import NavGrid, FlowField, PathJobs
+from scheduling import SimulationLod, AiScheduler, TimerWheel
+from collision_geometry import CollisionGeometry
 
 
 class MyGame:
-    def __init__(self):
+    def __init__(self, render_size=(1280, 720), integer_scale=False, grid_shape=None):
+        """
+        Args:
+            render_size (tuple, optional): internal resolution the game draws at before it is upscaled to the display,
+            None draws at the display resolution. Defaults to (1280, 720).
+            integer_scale (bool, optional): upscale by whole numbers only for crisp pixel art. Defaults to False.
+            grid_shape (tuple, optional): (rows, columns) of the tile map, maps larger than the screen scroll with
+            the player. Defaults to None, one screen of tiles.
+        """
         # create a global variable for show_collision
         self.show_debug = False
+        # pixel perfect collision against scene elements, toggled with the 'p_mask' debug command
+        self.precise_collision = False
+        # player and enemy moves are swept against the walk grid, toggled with the 'sweep' debug command.
+        # off by default, swept moves never enter non walkable tiles so the player is kept on the light tiles
+        self.swept_movement = False
+        # enemies move with one vectorized kernel per frame, toggled with the 'e_soa' debug command
+        self.batched_enemies = True
+        # enemies far from the player tick less often, toggled with the 'lod' debug command
+        self.enemy_lod = True
+        # night darkens the scene with the light map, toggled with 'l'
+        self.night = False
         self.record_collision = False
         # Initialise PyGame.
         pygame.init()
@@ -37,9 +69,14 @@ class MyGame:
         # setup a default font for pygame
         self.myFont = font.SysFont('Comic Sans MS', 12)
         # Set up the window.
-        self.screen = pygame.display.set_mode((0,0),display=1)
+        self.display = pygame.display.set_mode((0,0),display=1)
+        # everything draws to the fixed size render surface, it is upscaled to the display once per frame
+        self.render_target = RenderTarget(self.display, render_size, integer_scale)
+        self.screen = self.render_target.surface
         self.width, self.height = self.screen.get_rect().size
         self.screen_rect = self.screen.get_rect()
+        # worker threads for background and overlay rebakes
+        self.compositor = Compositor()
         # scene setup
         pathDir = pathlib.WindowsPath('imgs/scene/')
         fNames = ['dark_tile.png', 'light_tile.png','house_t.png']
@@ -47,53 +84,85 @@ class MyGame:
         self.background = Background(self.screen,
                                 imgPaths=imgPaths,
                                 surfSize=self.screen.get_rect().size,
-                                offSet=[[0, 0], [0, 0], [0, 0]])
+                                offSet=[[0, 0], [0, 0], [0, 0]],
+                                grid_shape=grid_shape)
         tileRange = [0, 1, 10, 11, 21,31,32,33,43,53,54,64,65,66,67,68] 
         np.vectorize(self.background.add_tile)(self.background.light_tile, tileRange, tType='light')
         self.background.draw_element_at(self.background.house_t, 0, 0)
-        self.background.draw_scene()
+        # scene elements are drawn in the world layer so they are depth sorted with the entities.
+        # the camera scrolls over the world, the tiles are baked into the chunks in view and only those are drawn
+        self.world_rect = pygame.Rect((0, 0), self.background.world_size)
+        self.camera = ZoomCamera(self.screen_rect.size, self.background.world_size)
+        self.world_chunks = WorldChunks(self.background, compositor=self.compositor)
+        # light and npc vision pass, applied over the world layer
+        self.lighting = LightMap(self.screen_rect.size)
+        # overview map in the top right corner, toggled with 'n'
+        self.minimap = Minimap(self.background)
+        self.show_minimap = True
+        # records the rendered frames to disk, toggled with F9 or the 'cap' debug command
+        self.frame_capture = FrameCapture(self.screen_rect.size)
         
-        # get rect for only the light tiles
-        light_tile = self.background.entityDict['light']
-        # make a group to check for tile collisions
-        self.light_group = pygame.sprite.Group()
-        for rect in light_tile:
-            self.light_group.add(pygame.sprite.Sprite())
-            self.light_group.sprites()[-1].rect = rect
+        # light tiles compiled into a boolean grid to check for tile collisions
+        self.walk_grid = WalkGrid(self.background, walkable=('light',))
+        # distance to the nearest wall, enemies steer away from walls before they touch them
+        self.distance_field = DistanceField(self.walk_grid)
+        # A* routes over the walkable tiles, enemies only roam to goals they can reach
+        self.nav = NavGrid(self.walk_grid)
+        # roam routes are searched on worker threads, a spawn wave or tile change never stalls the frame
+        self.path_jobs = PathJobs(self.nav)
+        # one shared field toward the player for every chasing enemy
+        self.flow_field = FlowField(self.nav)
         # make the player
         self.player = Player(self.screen)
         # setup test enemies for the player to interact with
         self.enemy_group = EnemyGroup(self.screen, 
                                       self.background.get_tile(0, 0)[1].center,
-                                      50)
+                                      50,
+                                      world_rect=self.world_rect)
+        self.set_swept_movement(self.swept_movement)
+        self.enemy_group.set_distance_field(self.distance_field)
+        self.enemy_group.set_navigation(self.nav)
+        self.enemy_group.set_path_jobs(self.path_jobs)
+        self.enemy_group.set_flow_field(self.flow_field)
+        self.enemy_group.set_batched(self.batched_enemies)
+        # full detail near the player and in view, reduced and dormant tiers further out
+        self.simulation_lod = SimulationLod()
+        self.enemy_group.set_lod(self.simulation_lod if self.enemy_lod else None)
+        # enemy decisions share a 2ms budget per frame, the rest keep moving on their last decision
+        self.ai_scheduler = AiScheduler(budget_ms=2.0)
+        self.enemy_group.set_scheduler(self.ai_scheduler)
+        # roaming stretches and new roam goals are timers, waiting enemies cost nothing per frame
+        self.timer_wheel = TimerWheel()
+        self.enemy_group.set_timers(self.timer_wheel)
         
         self.start_menu = Txt_confirm(
             prompt_subject='-enter player name-',
             add_cursor_box=True)
         self.debug_menu = DebugMenu()
-        menu_result = self.start_menu.main(self.screen)
+        # the start menu runs its own loop and flips the display, so it draws to the display directly
+        menu_result = self.start_menu.main(self.display)
         self.player_name = self.myFont.render(
             menu_result, False, (255, 255, 255))
         # test collision has an x and y coordinate for each segment of test_collision
-        # make a sprite group for the test collision so we can use pygame's collision detection
+        # the points never move, they are baked into one layer of the debug overlay
         f = open('mouse_positions_m.json')
-        self.test_collision = json.load(f)
+        # old recordings were made at the display resolution and are scaled, new ones are saved with their resolution
+        self.test_collision = self.render_target.load_points(json.load(f))
         f.close()
         self.m_record = MP(self.test_collision)
-        self.test_collision_group = pygame.sprite.Group()
-        for dot in self.test_collision:
-            self.test_collision_group.add(self.make_temp_sprite(
-                (255, 0, 0), dot, (4, 4)))
+        self.debug_overlay = DebugOverlay(self.test_collision)
+        # the same recording compiled into simplified wall segments for player and enemy collision
+        self.collision_geometry = CollisionGeometry.from_points(self.test_collision)
         # 
         self.dt = 1/self.fps  # dt is the time since last frame.
         self.debug_group = pygame.sprite.Group()
         
-        # gamestate is the group that will be drawn to the screen and updated
-        self.gamestate = pygame.sprite.Group()
+        # gamestate is the world layer that will be drawn to the screen and updated,
+        # sorted by rect.bottom so entities and scene elements overlap in the right order
+        self.gamestate = YSortGroup()
         self.gamestate.add([self.player, 
                             self.enemy_group,
-                            self.enemy_group.ehb,
-                            self.enemy_group.e_agro])
+                            self.background.scene_elements])
         # ---------------------------------------------------------------------- #
         self.debug_m_targets = {
             True: self.debug_UI_handler, False: self.empty_event}
@@ -101,11 +170,18 @@ class MyGame:
         self.found_obj_info = '----'
         self.ids = map(lambda x: hash(x), self.enemy_group.sprites())
         self.e_lookup = dict(zip(list(self.ids), self.enemy_group.sprites()))
+        # broadphase for picking and interaction checks, cells are about one tile
+        self.spatial_hash = SpatialHash(self.background.tile_size)
+        for sprite in [self.player, self.player.collisionSprite, *self.enemy_group.sprites(), *self.enemy_group.ehb.sprites()]:
+            self.spatial_hash.insert(sprite)
+        for sprite in self.background.scene_elements.sprites():
+            self.spatial_hash.insert(sprite, static=True)
+        self.masks = MaskCache()
         
         # make a text sprite for fps
         self.fps_txt = txtSprite((0, 0), 'fps: 0', self.myFont, (255, 255, 255))
-        # add the fps text to the main gamestate
-        self.gamestate.add(self.fps_txt)
+        # hud is drawn on top of the world layer, it is not depth sorted
+        self.hud_group = pygame.sprite.Group(self.fps_txt)
         
     def debug_UI_handler(self, screen, events):
         # NOTE: shows the line of enemy paths
@@ -135,7 +211,8 @@ class MyGame:
 
         and this will scale your velocity based on time. Extend as necessary."""
         # Go through events that are passed to the script by the window.
-        events = pygame.event.get()
+        # mouse positions are remapped to the render surface so picking and the UI line up
+        events = [self.render_target.remap_event(e) for e in pygame.event.get()]
             
         for event in events:
             esc_con = (event.type == KEYDOWN and event.key == K_ESCAPE)
@@ -143,17 +220,21 @@ class MyGame:
             x_out_con = (event.type == QUIT)
             click_in_debug_con = (event.type == MOUSEBUTTONDOWN and self.show_debug)
             if x_out_con or esc_con:
+                self.compositor.shutdown()
+                self.frame_capture.stop()
+                self.path_jobs.shutdown()
                 pygame.quit()  # Opposite of pygame.init
                 sys.exit()
             
             if click_in_debug_con:
-                # get the mouse position
-                mouse_pos = pygame.mouse.get_pos()
-                # make mouse position a sprite
-                mouse_sprite = self.make_temp_sprite((255, 0, 0), mouse_pos)
-                # check if the mouse is in enemy sprite, not the hit box
-                obj_found = pygame.sprite.spritecollideany(mouse_sprite, self.enemy_group)
-                # take the first enemy found always
+                # get the mouse position in the world
+                mouse_pos = self.camera.to_world(event.pos)
+                # check if the mouse is in enemy sprite, not the hit box, only enemies near the mouse are tested
+                found = self.spatial_hash.query_rect(pygame.Rect(mouse_pos, (4, 4)), group=self.enemy_group)
+                # the hash returns a set order, sort it into draw order and pick the top most rect under the mouse
+                found.sort(key=lambda e: e.rect.bottom)
+                hit = RectArray([e.rect for e in found]).pick(mouse_pos)
+                obj_found = found[hit] if hit >= 0 else None
                 if obj_found:
                     print(f"(ID, '{hash(obj_found)}')")
                     self.found_obj_info += f"\n(ID, '{hash(obj_found)}'), (type, '{type(obj_found).__name__}')\nlocated at x,y{obj_found.rect.center}"
@@ -177,14 +258,24 @@ class MyGame:
             case pygame.K_o:
                 print('saving mouse positions: mouse_positions_m.json')
                 with open('mouse_positions.json', 'w') as f:
-                    json.dump(self.m_record.positions, f)
+                    json.dump(self.render_target.dump_points(self.m_record.positions), f)
             case pygame.K_m:
                 self.show_debug = not self.show_debug
                 if self.show_debug:
                     self.add_debug_groups()
                 else:
                     self.debug_group.empty()
-                    self.screen.blit(self.background.image, (0, 0))
+            case pygame.K_MINUS:
+                # zoomed out views draw from pre scaled mip levels
+                self.camera.zoom_out()
+            case pygame.K_EQUALS:
+                self.camera.zoom_in()
+            case pygame.K_l:
+                self.night = not self.night
+            case pygame.K_n:
+                self.show_minimap = not self.show_minimap
+            case pygame.K_F9:
+                self.toggle_capture()
             case pygame.K_r:
                 self.record_collision = not self.record_collision
                 print(f'record collision enabled: {self.record_collision}')
@@ -221,6 +312,8 @@ class MyGame:
                 else:
                     self.enemy_group.remove(target_e)
                     self.enemy_group.ehb.remove(target_e.collisionSprite)
+                    self.spatial_hash.remove(target_e)
+                    self.spatial_hash.remove(target_e.collisionSprite)
                     self.e_lookup.pop(int(hash_str))
                 
             case "p_nc":
@@ -228,6 +321,39 @@ class MyGame:
                 self.player.colliding = False
                 self.found_obj_info += f'\nno clip: {self.player.no_clip}'
                 
+            case "cap":
+                self.toggle_capture()
+
+            case "e_soa":
+                self.batched_enemies = not self.batched_enemies
+                self.enemy_group.set_batched(self.batched_enemies)
+                self.found_obj_info += f'\nbatched enemies: {self.batched_enemies}'
+
+            case "lod":
+                self.enemy_lod = not self.enemy_lod
+                self.enemy_group.set_lod(self.simulation_lod if self.enemy_lod else None)
+                self.found_obj_info += f'\nenemy lod: {self.enemy_lod}'
+
+            case "ai":
+                # 'ai' shows the scheduler stats, 'ai <ms>' also sets the per frame budget
+                if len(parts) > 1:
+                    try:
+                        self.ai_scheduler.budget = float(parts[1]) / 1000
+                    except ValueError:
+                        print("Error: 'ai' budget must be a number of milliseconds.")
+                stats = self.ai_scheduler.stats()
+                print(f'ai scheduler: {stats}')
+                self.found_obj_info += (f"\nai: {stats['thought']} decisions in {stats['ms']:.2f}ms"
+                                        f" | staleness mean {stats['mean_staleness']:.1f} max {stats['max_staleness']}")
+
+            case "sweep":
+                self.set_swept_movement(not self.swept_movement)
+                self.found_obj_info += f'\nswept movement: {self.swept_movement}'
+
+            case "p_mask":
+                self.precise_collision = not self.precise_collision
+                self.found_obj_info += f'\nprecise collision: {self.precise_collision}'
+
             case "count_e":
                 print(f'enemy count: {len(self.enemy_group)}')
                 self.found_obj_info += f'\nenemy count: {len(self.enemy_group)}'
@@ -235,56 +361,130 @@ class MyGame:
             case _:
                 print(f"Error: '{cmd}' is not a valid command.")
 
+    def toggle_capture(self):
+        capturing = self.frame_capture.toggle()
+        print(f'frame capture enabled: {capturing}')
+        self.found_obj_info += f'\ncapture: {capturing} {self.frame_capture}'
+
+    def set_swept_movement(self, enabled: bool):
+        self.swept_movement = enabled
+        walk_grid = self.walk_grid if enabled else None
+        self.player.walk_grid = walk_grid
+        self.enemy_group.set_walk_grid(walk_grid)
+
     def spawn_enemy(self):
-        new_e = self.enemy_group.spawnEnemy(pygame.mouse.get_pos())
+        new_e = self.enemy_group.spawnEnemy(self.camera.to_world(self.render_target.mouse_pos()))
         self.e_lookup[hash(new_e)] = new_e
         # add the new enemy to the hit box group
         self.enemy_group.ehb.add(new_e.collisionSprite)
         self.enemy_group.e_agro.add(new_e.agro_circle)
         self.gamestate.add(self.enemy_group)
+        self.spatial_hash.insert(new_e)
+        self.spatial_hash.insert(new_e.collisionSprite)
         
 
     def add_debug_groups(self):
-        self.debug_group.add(self.enemy_group.e_agro.sprites())
+        # agro circles are drawn by the lighting pass, see draw_lighting
         # self.debug_group.add(self.enemy_group.ehb.sprites())
         # self.debug_group.add(self.player.collisionSprite)
         self.debug_group.add(self.player.dot)
         # [n.drawPathing(*n.path_line) for n in self.enemy_group.sprites()]
         
     def group_updates(self):
-        # check enemy pos vs scene valid tiles
-        check = pygame.sprite.groupcollide(
-            self.enemy_group.ehb, self.light_group, False, False)
-        # update group collision status
-        # # if there is a collision, we ar in a valid tile and can move isColliding(False)
+        # check enemy pos vs scene valid tiles, one grid lookup for every hit box
+        # # if a hit box is on a light tile, we are in a valid tile and can move isColliding(False)
         self.player.collisionSprite.update()
-        self.enemy_group.ehb.valid_tile_update(check)
+        self.enemy_group.ehb.walkable_update(self.walk_grid)
+        # only rebuilds after tiles change
+        self.distance_field.sync()
+        self.wall_collision()
+        if self.precise_collision:
+            self.scene_element_collision()
         # observe the player for enemy AI
-        self.gamestate.update(enemy_events=[self.player.rect.center], 
-                              debug=False,
-                              text=f'fps: {int(self.fpsClock.get_fps())}')
+        # finished routes from the path workers, a few per frame
+        self.path_jobs.apply()
+        # only rebuilds when the player changes cell
+        self.flow_field.update(self.player.collisionSprite.rect.center)
+        # the camera view is last frame's, it follows the player at the end of the update
+        self.enemy_group.lod_update(self.player.rect.center, self.camera.rect)
+        self.enemy_group.timer_update()
+        # every enemy picks the nearest of the targets in its aggro range
+        targets = self.aggro_targets()
+        self.enemy_group.think(targets)
+        self.enemy_group.batch_update(targets)
+        self.gamestate.update(enemy_events=targets, 
+                              debug=False)
+        # hit boxes and agro circles follow their parent rects after the world has moved
+        self.enemy_group.ehb.update()
+        self.enemy_group.e_agro.update()
+        # moving entities are only looked up for debug picking, the hash is synced while it is on.
+        # only entities that crossed a cell boundary are moved in it
+        if self.show_debug:
+            self.spatial_hash.update_all()
+        self.hud_group.update(text=f'fps: {int(self.fpsClock.get_fps())}')
+        self.camera.follow(self.player.rect)
+
+    def aggro_targets(self) -> list:
+        """positions the enemies can aggro on, more players, decoys or allied npcs go here\n"""
+        return [self.player.rect.center]
+
+    def wall_collision(self):
+        """flag hit boxes touching the compiled recorded walls\n"""
+        if len(self.collision_geometry) == 0:
+            return
+        for box in [self.player.collisionSprite, *self.enemy_group.ehb.sprites()]:
+            if not box.colliding and self.collision_geometry.rect_hits(box.rect):
+                box.colliding = True
+
+    def scene_element_collision(self):
+        """pixel perfect hit box contact with irregular scene elements like the house\n"""
+        elements = self.background.scene_elements
+        for box in [self.player.collisionSprite, *self.enemy_group.ehb.sprites()]:
+            if box.colliding:
+                continue
+            # the spatial hash keeps the rect test to elements near the hit box
+            if collide_precise(box, self.spatial_hash.query_rect(box.rect, group=elements), self.masks):
+                box.colliding = True
 
     def draw(self):
         """
         Draw things to the window. Called once per frame.
         """
-        self.gamestate.remove([self.enemy_group.ehb, self.enemy_group.e_agro])
-        self.debug_group.clear(self.screen, self.background.image)
-        self.test_collision_group.clear(self.screen, self.background.image)       
-        self.gamestate.clear(self.screen, self.background.image)
+        # the chunks in view replace clearing the screen, the world is redrawn relative to the camera
+        self.world_chunks.draw(self.screen, self.camera)
         # draw gamestate
-        self.debug_group.draw(self.screen)
+        self.camera.draw_group(self.screen, self.debug_group)
         if self.show_debug:
-            
-            [n.drawPathing(*n.path_line) for n in self.enemy_group.sprites()]
-        self.test_collision_group.draw(self.screen)
-        self.gamestate.draw(self.screen)
-        
-        # add back gamestate groups
-        self.gamestate.add([self.enemy_group.ehb, self.enemy_group.e_agro])
+            # enemy paths and agro lines are batched by the overlay
+            for n in self.enemy_group.sprites():
+                t_x, t_y, e_x, e_y = n.path_line[:4]
+                self.debug_overlay.queue_line((e_x, e_y), (t_x, t_y))
+        self.debug_overlay.draw(self.screen, self.camera)
+        # world layer is drawn back to front, the hud goes on top of it
+        self.camera.draw_group(self.screen, self.gamestate)
+        self.draw_lighting()
+        self.hud_group.draw(self.screen)
+        if self.show_minimap:
+            self.minimap.update([e.rect.center for e in self.enemy_group.sprites()], self.player.rect.center)
+            self.screen.blit(self.minimap.surface, self.minimap.surface.get_rect(topright=self.screen_rect.topright))
         # update the display using rects in pygame.display.update
         
         
+    def draw_lighting(self):
+        """light the scene at night and show enemy agro ranges in debug mode with one light map pass\n"""
+        if not (self.night or self.show_debug):
+            return
+        lighting, camera, scale = self.lighting, self.camera, self.camera.scale
+        lighting.clear()
+        # daylight only dims the scene enough for the agro ranges to stand out
+        lighting.ambient = 40 if self.night else 190
+        if self.night:
+            lighting.add_light(camera.to_screen(self.player.rect.center), 250 * scale)
+        if self.show_debug:
+            for e in self.enemy_group.e_agro.sprites():
+                lighting.add_vision(camera.to_screen(e.rect.center), e.radius * scale)
+        lighting.apply(self.screen)
+
     def make_temp_sprite(self, color, pos=(0, 0), size=(4, 4)):
         temp_sprite = pygame.sprite.Sprite()
         temp_sprite.rect = pygame.Rect(pos, size)
@@ -293,35 +493,43 @@ class MyGame:
         return temp_sprite
 
     def record_mouse_positions(self, event):
-        # self.m_record, self.test_collision_group
+        # self.m_record, self.debug_overlay
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             self.m_record.is_dragging = True
-            print(pygame.mouse.get_pos())
+            print(self.render_target.mouse_pos())
                 
         elif event.type == pygame.MOUSEBUTTONUP:
             self.m_record.is_dragging = False
+            # the stroke is finished, recompile the walls with it
+            self.collision_geometry = CollisionGeometry.from_points(self.m_record.positions)
             
         if self.m_record.is_dragging:
-            self.m_record.positions.append(pygame.mouse.get_pos())
+            mouse_pos = self.camera.to_world(self.render_target.mouse_pos())
+            self.m_record.positions.append(mouse_pos)
             # print(mouse_positions)
-            # add new collision rects to the collision group
-            dot = self.make_temp_sprite((255, 0, 0), pygame.mouse.get_pos())
-            self.test_collision_group.add(dot)
+            # add the new point to the overlay, only its dot is drawn onto the baked layer
+            self.debug_overlay.add_point(mouse_pos)
             
 
     def main(self):
-        self.screen.blit(self.background.image, (0, 0))
+        self.camera.follow(self.player.rect)
+        # bake the overlay layer and the chunks in view together on the compositor before the first frame
+        self.compositor.submit(self.debug_overlay.bake)
+        self.world_chunks.prebake(self.world_chunks.visible_chunks(self.camera.rect))
+        self.compositor.join()
+        self.world_chunks.draw(self.screen, self.camera)
+        self.render_target.present()
         pygame.display.update()
         while True:
             events = self.update(self.dt)
             self.group_updates()
-            if self.show_debug:
-                # clear the background
-                self.screen.blit(self.background.image, (0, 0))
             self.draw()
+            self.frame_capture.capture(self.screen)
             # self.debug_m_targets[self.show_debug](self.screen, events)
             self.dt = self.fpsClock.get_time()/1000
             self.fpsClock.tick(self.fps)
+            # single upscale pass from the render surface to the display
+            self.render_target.present()
             pygame.display.update() 
 
 if __name__ == '__main__':
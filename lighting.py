@@ -0,0 +1,119 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# light map pass for night scenes like castle_night and for showing npc vision in debug mode.
+# Every light source and vision radius is written into a low resolution buffer with vectorized
+# NumPy operations, the buffer is pushed with pygame.surfarray, upscaled and applied to the frame
+# with a single multiply blit. Each light only touches the buffer pixels inside its own bounding box,
+# so the cost is the area the lights cover, not lights times the whole buffer.
+
+import math
+import numpy as np
+import pygame
+
+
+class LightMap:
+    def __init__(self, view_size: tuple, cell: int = 8, ambient: int = 40, max_elements: int = 4_000_000):
+        """
+        Create a light map for a view.
+        Args:
+            view_size (tuple): size of the surface the light map is applied to.
+            cell (int, optional): screen pixels per light buffer pixel. Defaults to 8.
+            ambient (int, optional): light level (0-255) where no light reaches. Defaults to 40.
+            max_elements (int, optional): limit on light box pixels computed at once, bounds memory use. Defaults to 4M.
+        """
+        self.view_size = view_size
+        self.cell = cell
+        self.ambient = ambient
+        self.max_elements = max_elements
+        buffer_w, buffer_h = math.ceil(view_size[0] / cell), math.ceil(view_size[1] / cell)
+        self.buffer = pygame.Surface((buffer_w, buffer_h), depth=24)
+        self.scaled = pygame.Surface(view_size, depth=24)
+        # screen position of each buffer pixel center, in surfarray (x, y) order
+        self.xs = ((np.arange(buffer_w) + 0.5) * cell).astype(np.float32)
+        self.ys = ((np.arange(buffer_h) + 0.5) * cell).astype(np.float32)
+        self.sources = []
+
+    def clear(self):
+        self.sources = []
+
+    def add_light(self, pos: tuple, radius: float, color: tuple = (255, 230, 190), sharpness: float = 1.0):
+        """
+        Add a light for the next apply.
+        Args:
+            pos (tuple): screen position of the light.
+            radius (float): distance where the light reaches zero.
+            color (tuple, optional): rgb light added at the center. Defaults to a warm white.
+            sharpness (float, optional): 1 fades evenly to the edge, larger values give a harder edge. Defaults to 1.
+        """
+        self.sources.append((pos[0], pos[1], radius, sharpness, *color))
+
+    def add_vision(self, pos: tuple, radius: float, color: tuple = (60, 60, 60)):
+        """add an npc vision radius, a flat disk with a hard edge like the old agro circle\n"""
+        self.add_light(pos, radius, color, sharpness=16.0)
+
+    def compute(self) -> np.ndarray:
+        """return the (w, h, 3) uint8 light buffer for the current sources\n"""
+        w, h = len(self.xs), len(self.ys)
+        light = np.full((w, h, 3), self.ambient, dtype=np.float32)
+        if self.sources:
+            light += self.accumulate(np.asarray(self.sources, dtype=np.float32))
+        return np.clip(light, 0, 255).astype(np.uint8)
+
+    def bounds(self, center: np.ndarray, radius: np.ndarray, size: int) -> tuple:
+        '''first and one past the last buffer index whose pixel center is within radius of center, along one axis\n'''
+        start = np.ceil((center - radius) / self.cell - 0.5)
+        stop = np.floor((center + radius) / self.cell - 0.5) + 1
+        return np.clip(start, 0, size).astype(np.int64), np.clip(stop, 0, size).astype(np.int64)
+
+    def accumulate(self, sources: np.ndarray) -> np.ndarray:
+        """
+        (w, h, 3) light added by the sources, each one splatted into its own bounding box.
+        lights are sorted by box size and done in batches padded to the batch's largest box, so small lights
+        never pay for a big one and a batch stays under max_elements.
+        """
+        w, h = len(self.xs), len(self.ys)
+        x, y, sharpness = sources[:, 0], sources[:, 1], sources[:, 3]
+        colors = sources[:, 4:7]
+        reach = np.sqrt(np.maximum(sources[:, 2].astype(np.float64) ** 2, 1))
+        r2 = (reach * reach).astype(np.float32)
+        x0, x1 = self.bounds(x.astype(np.float64), reach, w)
+        y0, y1 = self.bounds(y.astype(np.float64), reach, h)
+        side = np.maximum(x1 - x0, y1 - y0)
+        # lights off the buffer have empty boxes and are skipped
+        order = np.flatnonzero((x1 > x0) & (y1 > y0))
+        order = order[np.argsort(side[order], kind='stable')]
+        side = side[order]
+        total = np.zeros((3, w * h), dtype=np.float32)
+        start = 0
+        while start < len(order):
+            # the most lights whose padded boxes fit in max_elements, side only grows along order
+            stop = np.arange(start + 1, len(order) + 1)
+            fits = (stop - start) * side[stop - 1] ** 2 <= self.max_elements
+            stop = int(stop[fits][-1]) if fits.any() else start + 1
+            b = order[start:stop]
+            start = stop
+            ix = x0[b, None] + np.arange((x1[b] - x0[b]).max())
+            iy = y0[b, None] + np.arange((y1[b] - y0[b]).max())
+            in_x, in_y = ix < x1[b, None], iy < y1[b, None]
+            ix, iy = np.minimum(ix, w - 1), np.minimum(iy, h - 1)
+            dx2 = (self.xs[ix] - x[b, None]) ** 2
+            dy2 = (self.ys[iy] - y[b, None]) ** 2
+            # (lights, box w, box h) falloff, padding outside a light's own box adds nothing
+            d2 = dx2[:, :, None] + dy2[:, None, :]
+            falloff = np.clip((1 - d2 / r2[b, None, None]) * sharpness[b, None, None], 0, 1)
+            falloff *= in_x[:, :, None] & in_y[:, None, :]
+            flat = (ix[:, :, None] * h + iy[:, None, :]).ravel()
+            for channel in range(3):
+                weights = (falloff * colors[b, channel, None, None]).ravel()
+                total[channel] += np.bincount(flat, weights, minlength=w * h).astype(np.float32)
+        return total.T.reshape(w, h, 3)
+
+    def apply(self, surface: pygame.Surface):
+        """darken the surface by the light map with a single multiply blit\n"""
+        pygame.surfarray.blit_array(self.buffer, self.compute())
+        pygame.transform.smoothscale(self.buffer, self.view_size, self.scaled)
+        surface.blit(self.scaled, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+
+    def __repr__(self):
+        return f'LightMap({self.buffer.get_size()}, sources={len(self.sources)})'
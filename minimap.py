@@ -0,0 +1,100 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# live minimap built from the Background tile type grid and entity positions.
+# the map is a small NumPy pixel array (cell x cell pixels per tile) pushed to a surface with pygame.surfarray.
+# only the cells whose tile or occupancy changed are rewritten, so a frame where nothing moved costs nothing
+# and a normal frame costs O(entities) no matter how large the map is.
+
+import numpy as np
+import pygame
+
+
+class Minimap:
+    # occupancy values, the player is drawn over enemies in the same cell
+    EMPTY, ENEMY, PLAYER = 0, 1, 2
+
+    def __init__(self, background, cell: int = 3, palette: dict = None,
+                 enemy_color: tuple = (220, 40, 40), player_color: tuple = (40, 220, 40)):
+        """
+        Create a minimap for a Background.
+        Args:
+            background (Background): the tile map shown by the minimap.
+            cell (int, optional): minimap pixels per tile. Defaults to 3.
+            palette (dict, optional): tType -> rgb color. Defaults to colors for 'dark' and 'light' tiles.
+            enemy_color (tuple, optional): color of cells with an enemy. Defaults to red.
+            player_color (tuple, optional): color of the player's cell. Defaults to green.
+        """
+        self.background = background
+        self.cell = cell
+        self.palette = palette if palette is not None else {'dark': (45, 45, 60), 'light': (200, 170, 110)}
+        self.unknown_color = (128, 128, 128)
+        rows, columns = background.grid.shape
+        self.surface = pygame.Surface((columns * cell, rows * cell), depth=24)
+        # occupancy of each tile in surfarray (x, y) order
+        self.occupancy = np.zeros((columns, rows), dtype=np.int8)
+        # flat indexes of the occupied cells drawn last frame
+        self.occupied = np.empty(0, dtype=np.int64)
+        # -1 forces the first update to draw every tile
+        self.version = -1
+        self.occupancy_colors = np.array([(0, 0, 0), enemy_color, player_color], dtype=np.uint8)
+
+    def tile_colors(self) -> np.ndarray:
+        """lookup table of tile code -> rgb color\n"""
+        codes = self.background.tile_codes
+        table = np.empty((max(len(codes), 1), 3), dtype=np.uint8)
+        table[:] = self.unknown_color
+        for tType, code in codes.items():
+            table[code] = self.palette.get(tType, self.unknown_color)
+        return table
+
+    def cells_of(self, positions) -> np.ndarray:
+        """flat (x, y) cell indexes of world positions, positions outside the map are dropped\n"""
+        columns, rows = self.occupancy.shape
+        if len(positions) == 0:
+            return np.empty(0, dtype=np.int64)
+        cells = np.asarray(positions, dtype=np.int64) // np.asarray(self.background.tile_size)
+        inside = (cells[:, 0] >= 0) & (cells[:, 0] < columns) & (cells[:, 1] >= 0) & (cells[:, 1] < rows)
+        cells = cells[inside]
+        return np.ravel_multi_index((cells[:, 0], cells[:, 1]), (columns, rows))
+
+    def update(self, enemy_positions: list, player_pos: tuple = None):
+        """move the entity markers and redraw the cells that changed\n"""
+        changed = [self.occupied]
+        # tiles that changed since the last update
+        if self.background.version != self.version:
+            if self.version < 0:
+                rows, columns = np.indices(self.background.grid.shape).reshape(2, -1)
+            else:
+                rows, columns = self.background.changed_cells(self.version)
+            changed.append(np.ravel_multi_index((columns, rows), self.occupancy.shape))
+            self.version = self.background.version
+        # clear last frame's markers and place this frame's
+        flat = self.occupancy.reshape(-1)
+        flat[self.occupied] = self.EMPTY
+        enemies = self.cells_of(enemy_positions)
+        flat[enemies] = self.ENEMY
+        player = self.cells_of([player_pos]) if player_pos is not None else np.empty(0, dtype=np.int64)
+        flat[player] = self.PLAYER
+        self.occupied = np.concatenate((enemies, player))
+        changed.append(self.occupied)
+        self.draw_cells(np.unique(np.concatenate(changed)))
+
+    def draw_cells(self, cells: np.ndarray):
+        if len(cells) == 0:
+            return
+        xs, ys = np.unravel_index(cells, self.occupancy.shape)
+        occupancy = self.occupancy[xs, ys]
+        colors = self.tile_colors()[self.background.tile_types[ys, xs]]
+        marked = occupancy != self.EMPTY
+        colors[marked] = self.occupancy_colors[occupancy[marked]]
+        c = self.cell
+        pixels = pygame.surfarray.pixels3d(self.surface)
+        for dx in range(c):
+            for dy in range(c):
+                pixels[xs * c + dx, ys * c + dy] = colors
+        # release the surface lock
+        del pixels
+
+    def __repr__(self):
+        return f'Minimap({self.surface.get_size()}, occupied={len(self.occupied)})'
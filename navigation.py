@@ -0,0 +1,461 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# grid navigation over the walkable tiles of a Background.
+#   * NavGrid builds an 8 connected grid graph from a collision.WalkGrid and answers A* path queries.
+#   * paths are cached by (start cell, goal cell) with LRU eviction, crowded spawns ask for the same routes
+#     over and over and get them from the cache. the cache is dropped when tiles change.
+#   * connected regions are labeled once per tile change so roam goals are only picked from cells the
+#     enemy can actually reach.
+#   * PathJobs runs A* requests on worker threads over a read only NavSnapshot, the main loop applies a
+#     limited number of finished routes per frame and never waits for a search.
+#   * FlowField runs one heap Dijkstra from the player's cell when the player changes cell, every chasing
+#     enemy then reads its next step in O(1), chase cost does not grow with the number of chasers.
+
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import heapq
+import math
+import random
+import numpy as np
+
+
+class NavGrid:
+    # (d_row, d_column, cost) of the 8 neighbours
+    steps = ((-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
+             (-1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (1, 1, math.sqrt(2)))
+
+    def __init__(self, walk_grid, cache_size: int = 1024):
+        """
+        Create a navigation grid.
+        Args:
+            walk_grid (WalkGrid): walkability the graph is built from, one node per tile.
+            cache_size (int, optional): paths kept before the least recently used are dropped. Defaults to 1024.
+        """
+        self.walk_grid = walk_grid
+        self.cache_size = cache_size
+        # (start cell, goal cell) -> tuple of cells, None when the goal can not be reached
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.version = -1
+        self.sync()
+
+    def sync(self) -> bool:
+        """rebuild the regions and drop cached paths if tiles changed, returns True if it rebuilt\n"""
+        self.walk_grid.sync()
+        if self.walk_grid.version == self.version:
+            return False
+        grid = self.walk_grid.grid.copy()
+        self.snapshot = NavSnapshot(grid, self.label_regions(grid), self.walk_grid.tile_size, self.walk_grid.version)
+        self.grid = self.snapshot.grid
+        self.walk_rows = self.snapshot.walk_rows
+        self.labels = self.snapshot.labels
+        # label -> flat indexes of its cells, filled on demand
+        self.region_cells = {}
+        self.cache.clear()
+        self.version = self.walk_grid.version
+        return True
+
+    @staticmethod
+    def label_regions(grid: np.ndarray) -> np.ndarray:
+        """label walkable regions, -1 for walls\n
+        diagonal steps can not cut corners, so regions are 4 connected.
+        one pass: horizontal runs of walkable cells are numbered at once, runs touching the run below
+        are joined with a union find, and every cell takes the smallest run number of its region.
+        """
+        rows, columns = grid.shape
+        grid = np.asarray(grid, dtype=bool)
+        starts = grid.copy()
+        starts[:, 1:] &= ~grid[:, :-1]
+        runs = np.cumsum(starts.ravel()).reshape(rows, columns) - 1
+        parent = list(range(int(starts.sum())))
+
+        def root(run):
+            while parent[run] != run:
+                parent[run] = parent[parent[run]]
+                run = parent[run]
+            return run
+
+        below = grid[:-1] & grid[1:]
+        pairs = np.unique(np.stack([runs[:-1][below], runs[1:][below]], axis=1), axis=0)
+        for upper, lower in pairs.tolist():
+            a, b = root(upper), root(lower)
+            if a != b:
+                # the smaller run number stays the root
+                parent[max(a, b)] = min(a, b)
+        roots = np.array([root(run) for run in range(len(parent))], dtype=np.int64)
+        return np.where(grid, roots[np.where(grid, runs, 0)] if len(roots) else -1, -1)
+
+    def cell_of(self, pos: tuple) -> tuple:
+        return self.walk_grid.cell_of(pos)
+
+    def cell_center(self, cell: tuple) -> tuple:
+        return self.snapshot.cell_center(cell)
+
+    def walkable(self, cell: tuple) -> bool:
+        return self.snapshot.walkable(cell)
+
+    def reachable(self, start: tuple, goal: tuple) -> bool:
+        return self.snapshot.reachable(start, goal)
+
+    def astar(self, start: tuple, goal: tuple) -> tuple:
+        return self.snapshot.astar(start, goal)
+
+    def cell_path(self, start: tuple, goal: tuple) -> tuple:
+        """cached A* between two cells\n"""
+        key = (start, goal)
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        self.misses += 1
+        cells = self.astar(start, goal)
+        self.store(key, cells)
+        return cells
+
+    def store(self, key: tuple, cells: tuple):
+        self.cache[key] = cells
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def find_path(self, start_pos: tuple, goal_pos: tuple) -> list:
+        """
+        World space route between two positions.
+        Args:
+            start_pos (tuple): x, y where the walker is, usually its hit box center.
+            goal_pos (tuple): x, y it wants to go to.
+        Returns:
+            list: waypoints, the centers of the cells in between and goal_pos last. None if the goal can not be reached.
+        """
+        self.sync()
+        cells = self.cell_path(self.cell_of(start_pos), self.cell_of(goal_pos))
+        return self.snapshot.route(cells, goal_pos)
+
+    def random_goal(self, pos: tuple, rng=random) -> tuple:
+        """a random point in a cell reachable from pos, any walkable cell if pos is not on walkable ground\n"""
+        self.sync()
+        start = self.cell_of(pos)
+        label = int(self.labels[start]) if self.walkable(start) else None
+        cells = self.region_cells.get(label)
+        if cells is None:
+            cells = np.flatnonzero(self.labels >= 0 if label is None else self.labels == label)
+            self.region_cells[label] = cells
+        if len(cells) == 0:
+            return tuple(pos)
+        r, c = divmod(int(cells[rng.randrange(len(cells))]), self.grid.shape[1])
+        tile_w, tile_h = self.walk_grid.tile_size.tolist()
+        # stay off the cell border so the walker's hit box does not clip the next tile
+        return (c + rng.uniform(0.25, 0.75)) * tile_w, (r + rng.uniform(0.25, 0.75)) * tile_h
+
+    def __repr__(self):
+        return f'NavGrid({self.grid.shape}, cached={len(self.cache)}, hits={self.hits}, misses={self.misses})'
+
+
+class NavSnapshot:
+    def __init__(self, grid: np.ndarray, labels: np.ndarray, tile_size, version: int):
+        """read only copy of the nav grid at one tile version, worker threads search it while the main
+        thread keeps running and the tiles may change under the live NavGrid.
+        """
+        grid.setflags(write=False)
+        labels.setflags(write=False)
+        self.grid = grid
+        self.labels = labels
+        # nested lists index much faster than NumPy in the A* inner loop
+        self.walk_rows = grid.tolist()
+        self.tile_size = tuple(int(t) for t in tile_size)
+        self.version = version
+        self.steps = NavGrid.steps
+
+    def cell_of(self, pos: tuple) -> tuple:
+        return int(pos[1] // self.tile_size[1]), int(pos[0] // self.tile_size[0])
+
+    def cell_center(self, cell: tuple) -> tuple:
+        tile_w, tile_h = self.tile_size
+        return (cell[1] + 0.5) * tile_w, (cell[0] + 0.5) * tile_h
+
+    def walkable(self, cell: tuple) -> bool:
+        r, c = cell
+        rows, columns = self.grid.shape
+        return 0 <= r < rows and 0 <= c < columns and self.walk_rows[r][c]
+
+    def reachable(self, start: tuple, goal: tuple) -> bool:
+        """True if both cells are walkable and in the same region\n"""
+        return self.walkable(start) and self.walkable(goal) and self.labels[start] == self.labels[goal]
+
+    def astar(self, start: tuple, goal: tuple) -> tuple:
+        """A* over the cells, returns the cells after start up to goal, None if there is no path\n
+        diagonal steps may not cut the corner of a wall, the heuristic is the octile distance.
+        """
+        if not self.reachable(start, goal):
+            return None
+        if start == goal:
+            return ()
+        grid = self.walk_rows
+        rows, columns = self.grid.shape
+        g_r, g_c = goal
+        def octile(r, c):
+            d_r, d_c = abs(r - g_r), abs(c - g_c)
+            return max(d_r, d_c) + (math.sqrt(2) - 1) * min(d_r, d_c)
+        came_from = {start: None}
+        cost = {start: 0.0}
+        open_heap = [(octile(*start), 0.0, start)]
+        while open_heap:
+            _, g, cell = heapq.heappop(open_heap)
+            if cell == goal:
+                break
+            if g > cost[cell]:
+                continue
+            r, c = cell
+            for d_r, d_c, step in self.steps:
+                n_r, n_c = r + d_r, c + d_c
+                if not (0 <= n_r < rows and 0 <= n_c < columns) or not grid[n_r][n_c]:
+                    continue
+                if d_r and d_c and not (grid[r][n_c] and grid[n_r][c]):
+                    continue
+                n_g = g + step
+                if n_g < cost.get((n_r, n_c), math.inf):
+                    cost[(n_r, n_c)] = n_g
+                    came_from[(n_r, n_c)] = cell
+                    heapq.heappush(open_heap, (n_g + octile(n_r, n_c), n_g, (n_r, n_c)))
+        if goal not in came_from:
+            return None
+        cells = []
+        cell = goal
+        while cell != start:
+            cells.append(cell)
+            cell = came_from[cell]
+        return tuple(reversed(cells))
+
+    def route(self, cells: tuple, goal_pos: tuple) -> list:
+        """world waypoints of a cell path, the cell centers in between and goal_pos last\n"""
+        if cells is None:
+            return None
+        return [self.cell_center(cell) for cell in cells[:-1]] + [tuple(goal_pos)]
+
+    def __repr__(self):
+        return f'NavSnapshot({self.grid.shape}, version={self.version})'
+
+
+class FlowField:
+    def __init__(self, nav: NavGrid):
+        """
+        Directions toward one target shared by every walker chasing it.
+        one Dijkstra pass from the target's cell runs whenever the target changes cell or tiles change,
+        after that each walker's next step is an O(1) lookup no matter how many are chasing.
+        Args:
+            nav (NavGrid): the grid graph the field is built over.
+        """
+        self.nav = nav
+        self.goal = None
+        self.version = -1
+        self.builds = 0
+
+    def step_masks(self) -> list:
+        """per neighbour step, bool (rows, columns) True where the step from a cell to that neighbour is allowed\n"""
+        grid = self.nav.grid
+        rows, columns = grid.shape
+        padded = np.pad(grid, 1)
+        def shifted(d_r, d_c):
+            return padded[1 + d_r:1 + d_r + rows, 1 + d_c:1 + d_c + columns]
+        masks = []
+        for d_r, d_c, _ in NavGrid.steps:
+            ok = grid & shifted(d_r, d_c)
+            if d_r and d_c:
+                # no cutting the corner of a wall
+                ok &= shifted(d_r, 0) & shifted(0, d_c)
+            masks.append(ok)
+        return masks
+
+    def adjacency(self, masks: list) -> list:
+        """per flat cell index, the (neighbour index, step cost) pairs the Dijkstra relaxes, built once per tile change\n"""
+        rows, columns = self.nav.grid.shape
+        neighbours = [[] for _ in range(rows * columns)]
+        for (d_r, d_c, step), ok in zip(NavGrid.steps, masks):
+            for cell in np.flatnonzero(ok).tolist():
+                neighbours[cell].append((cell + d_r * columns + d_c, step))
+        return neighbours
+
+    def build(self, goal: tuple):
+        """cost to the goal for every cell and the neighbour each cell steps to\n
+        one heap Dijkstra from the goal, every cell is settled once. steps are symmetric, corner cutting
+        included, so the cost from the goal to a cell is the cost from the cell to the goal.
+        """
+        grid = self.nav.grid
+        rows, columns = grid.shape
+        if self.version != self.nav.version:
+            self.masks = self.step_masks()
+            self.neighbours = self.adjacency(self.masks)
+        masks, neighbours = self.masks, self.neighbours
+        dist = [math.inf] * (rows * columns)
+        if self.nav.walkable(goal):
+            start = goal[0] * columns + goal[1]
+            dist[start] = 0.0
+            open_heap = [(0.0, start)]
+            pop, push = heapq.heappop, heapq.heappush
+            while open_heap:
+                d, cell = pop(open_heap)
+                if d > dist[cell]:
+                    continue
+                for n, step in neighbours[cell]:
+                    n_d = d + step
+                    if n_d < dist[n]:
+                        dist[n] = n_d
+                        push(open_heap, (n_d, n))
+        cost = np.array(dist, dtype=np.float64).reshape(rows, columns)
+        # the neighbour with the lowest cost is the next step
+        padded = np.pad(cost, 1, constant_values=np.inf)
+        options = np.stack([np.where(ok, padded[1 + d_r:1 + d_r + rows, 1 + d_c:1 + d_c + columns] + step, np.inf)
+                            for (d_r, d_c, step), ok in zip(NavGrid.steps, masks)])
+        best_step = options.argmin(axis=0)
+        offsets = np.array([(d_r, d_c) for d_r, d_c, _ in NavGrid.steps])
+        r, c = np.indices(grid.shape)
+        self.next_r = r + offsets[best_step, 0]
+        self.next_c = c + offsets[best_step, 1]
+        # cells that can follow the field, the goal cell and unreachable cells head straight for the target
+        self.flows = np.isfinite(cost) & (cost > 0)
+        self.cost = cost
+        self.goal = goal
+        self.version = self.nav.version
+        self.builds += 1
+
+    def update(self, target_pos: tuple) -> bool:
+        """rebuild if the target changed cell or tiles changed, returns True if it rebuilt\n"""
+        self.nav.sync()
+        goal = self.nav.cell_of(target_pos)
+        if goal == self.goal and self.version == self.nav.version:
+            return False
+        self.build(goal)
+        return True
+
+    def leads_to(self, points) -> np.ndarray:
+        """bool mask, True where the (N, 2) world points are on the field's goal cell, the only targets it can be followed to\n"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if self.goal is None:
+            return np.zeros(len(points), dtype=bool)
+        tile_w, tile_h = self.nav.walk_grid.tile_size.tolist()
+        r, c = self.goal
+        return (np.floor(points[:, 0] / tile_w) == c) & (np.floor(points[:, 1] / tile_h) == r)
+
+    def next_points(self, points) -> np.ndarray:
+        """(N, 2) center of the next cell toward the target for world points, NaN where the walker should head straight\n"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        result = np.full(points.shape, np.nan)
+        if self.goal is None:
+            return result
+        tile_w, tile_h = self.nav.walk_grid.tile_size.tolist()
+        rows, columns = self.cost.shape
+        c = np.floor(points[:, 0] / tile_w).astype(np.int64)
+        r = np.floor(points[:, 1] / tile_h).astype(np.int64)
+        inside = (c >= 0) & (c < columns) & (r >= 0) & (r < rows)
+        follow = np.zeros(len(points), dtype=bool)
+        follow[inside] = self.flows[r[inside], c[inside]]
+        r, c = r[follow], c[follow]
+        result[follow, 0] = (self.next_c[r, c] + 0.5) * tile_w
+        result[follow, 1] = (self.next_r[r, c] + 0.5) * tile_h
+        return result
+
+    def next_point(self, pos: tuple) -> tuple:
+        """center of the next cell toward the target, None where the walker should head straight\n"""
+        x, y = self.next_points([pos])[0].tolist()
+        return None if math.isnan(x) else (x, y)
+
+    def __repr__(self):
+        return f'FlowField(goal={self.goal}, builds={self.builds})'
+
+
+class PathJobs:
+    def __init__(self, nav: NavGrid, workers: int = 2, max_apply: int = 16):
+        """
+        Path request queue answered on worker threads.
+        requesters keep their current behaviour until their callback is called from apply on the main thread.
+        Args:
+            nav (NavGrid): the live nav grid, only its snapshots are handed to the workers.
+            workers (int, optional): worker threads. Defaults to 2.
+            max_apply (int, optional): finished routes handed out per apply call. Defaults to 16.
+        """
+        self.nav = nav
+        self.max_apply = max_apply
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pathfinding')
+        # (future, key, goal_pos, callback, snapshot version, owner) in submit order
+        self.pending = deque()
+        self.applied = 0
+        self.resubmitted = 0
+
+    def submit(self, start_pos: tuple, goal_pos: tuple, callback, owner=None) -> Future:
+        """
+        Ask for a route, never blocks.
+        Args:
+            start_pos (tuple): x, y where the walker is.
+            goal_pos (tuple): x, y it wants to go to.
+            callback: called as callback(route) by apply, route is a waypoint list or None if unreachable.
+            owner (optional): the walker asking, cancel(owner) drops its jobs when it is removed. Defaults to None.
+        Returns:
+            Future: resolves to the cell path.
+        """
+        self.nav.sync()
+        snapshot = self.nav.snapshot
+        key = (snapshot.cell_of(start_pos), snapshot.cell_of(goal_pos))
+        if key in self.nav.cache:
+            # cached routes still wait for apply so callbacks always run at the same point of the frame
+            self.nav.hits += 1
+            self.nav.cache.move_to_end(key)
+            future = Future()
+            future.set_result(self.nav.cache[key])
+        else:
+            self.nav.misses += 1
+            future = self.pool.submit(snapshot.astar, *key)
+        self.pending.append((future, key, tuple(goal_pos), callback, snapshot.version, owner))
+        return future
+
+    def cancel(self, owner) -> int:
+        '''drop the pending jobs of a removed walker, their callbacks never run and their results are not cached\n'''
+        kept = deque()
+        for job in self.pending:
+            if job[5] is owner:
+                job[0].cancel()
+            else:
+                kept.append(job)
+        canceled = len(self.pending) - len(kept)
+        self.pending = kept
+        return canceled
+
+    def apply(self) -> int:
+        """hand finished routes to their callbacks, at most max_apply, call once per frame on the main thread\n
+        routes searched on a snapshot older than the current tiles are searched again instead of applied.
+        returns the number of callbacks run.
+        """
+        self.nav.sync()
+        applied = 0
+        waiting = deque()
+        while self.pending and applied < self.max_apply:
+            job = self.pending.popleft()
+            future, key, goal_pos, callback, version, owner = job
+            if not future.done():
+                waiting.append(job)
+                continue
+            if version != self.nav.version:
+                self.resubmitted += 1
+                self.pending.append((self.pool.submit(self.nav.snapshot.astar, *key), key, goal_pos, callback,
+                                     self.nav.version, owner))
+                continue
+            # exceptions raised by the search are raised here on the main thread
+            cells = future.result()
+            # only the main thread touches the cache
+            self.nav.store(key, cells)
+            callback(self.nav.snapshot.route(cells, goal_pos))
+            applied += 1
+        waiting.extend(self.pending)
+        self.pending = waiting
+        self.applied += applied
+        return applied
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pending.clear()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def __repr__(self):
+        return f'PathJobs(pending={len(self.pending)}, applied={self.applied}, resubmitted={self.resubmitted})'
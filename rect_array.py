@@ -0,0 +1,142 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# RectArray stores N rects as one (N, 4) int32 x, y, w, h NumPy array so collision, picking and UI hit tests
+# run as array operations instead of Python loops over pygame.Rect's.
+# the tests follow pygame.Rect: right and bottom edges are exclusive and empty rects never collide.
+# used by EnemyGroup.lod_update for the view and distance tests and by the debug picking in game_idea_v2.
+
+import numpy as np
+import pygame
+
+
+class RectArray:
+    def __init__(self, rects=None):
+        """
+        Create a rect array.
+        Args:
+            rects (optional): pygame.Rect's, rect like tuples, an (N, 4) x, y, w, h array or another RectArray. Defaults to None.
+        """
+        if rects is None:
+            self.array = np.empty((0, 4), dtype=np.int32)
+        elif isinstance(rects, RectArray):
+            self.array = rects.array.copy()
+        elif isinstance(rects, np.ndarray):
+            self.array = rects.astype(np.int32).reshape(-1, 4)
+        else:
+            self.array = np.array([tuple(r) for r in rects], dtype=np.int32).reshape(-1, 4)
+
+    @classmethod
+    def from_rects(cls, rects):
+        return cls(rects)
+
+    def to_rects(self) -> list:
+        return [pygame.Rect(r) for r in self.array.tolist()]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.array[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.array[:, 1]
+
+    @property
+    def w(self) -> np.ndarray:
+        return self.array[:, 2]
+
+    @property
+    def h(self) -> np.ndarray:
+        return self.array[:, 3]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.array[:, 0] + self.array[:, 2]
+
+    @property
+    def bottom(self) -> np.ndarray:
+        return self.array[:, 1] + self.array[:, 3]
+
+    @property
+    def centers(self) -> np.ndarray:
+        """(N, 2) rect centers, floor divided like pygame.Rect.center\n"""
+        return self.array[:, :2] + self.array[:, 2:] // 2
+
+    def contains_point(self, pos: tuple) -> np.ndarray:
+        """bool mask of the rects containing the point, same as Rect.collidepoint\n"""
+        x, y = pos
+        a = self.array
+        return (a[:, 0] <= x) & (x < a[:, 0] + a[:, 2]) & (a[:, 1] <= y) & (y < a[:, 1] + a[:, 3])
+
+    def contains_points(self, points) -> np.ndarray:
+        """(N, M) bool, True where rect i contains point j\n"""
+        points = np.asarray(points).reshape(-1, 2)
+        px, py = points[None, :, 0], points[None, :, 1]
+        a = self.array
+        return ((a[:, 0, None] <= px) & (px < self.right[:, None]) &
+                (a[:, 1, None] <= py) & (py < self.bottom[:, None]))
+
+    def pick(self, pos: tuple) -> int:
+        """index of the last rect containing the point, the top most for rects drawn in order, -1 if none\n"""
+        hits = np.flatnonzero(self.contains_point(pos))
+        return int(hits[-1]) if len(hits) else -1
+
+    def intersects_rect(self, rect) -> np.ndarray:
+        """bool mask of the rects overlapping the rect, same as Rect.colliderect\n"""
+        x, y, w, h = pygame.Rect(rect)
+        a = self.array
+        return ((a[:, 0] < x + w) & (x < a[:, 0] + a[:, 2]) & (a[:, 1] < y + h) & (y < a[:, 1] + a[:, 3]) &
+                (a[:, 2] > 0) & (a[:, 3] > 0) & (w > 0) & (h > 0))
+
+    def overlaps(self, other) -> np.ndarray:
+        """(N, M) bool, True where rect i of self overlaps rect j of other\n"""
+        other = other if isinstance(other, RectArray) else RectArray(other)
+        a, b = self.array, other.array
+        return ((a[:, 0, None] < other.right[None]) & (b[None, :, 0] < self.right[:, None]) &
+                (a[:, 1, None] < other.bottom[None]) & (b[None, :, 1] < self.bottom[:, None]) &
+                ((a[:, 2] > 0) & (a[:, 3] > 0))[:, None] & ((b[:, 2] > 0) & (b[:, 3] > 0))[None])
+
+    def overlapping_pairs(self, other) -> tuple:
+        """(i, j) index arrays of every overlapping pair between self and other\n"""
+        return np.nonzero(self.overlaps(other))
+
+    def union(self, other) -> 'RectArray':
+        """element wise union with another RectArray or one rect, same as Rect.union\n"""
+        if isinstance(other, RectArray):
+            b = other.array
+        else:
+            b = np.asarray(tuple(pygame.Rect(other)), dtype=np.int32)[None]
+        left = np.minimum(self.array[:, 0], b[:, 0])
+        top = np.minimum(self.array[:, 1], b[:, 1])
+        right = np.maximum(self.right, b[:, 0] + b[:, 2])
+        bottom = np.maximum(self.bottom, b[:, 1] + b[:, 3])
+        return RectArray(np.stack([left, top, right - left, bottom - top], axis=1))
+
+    def bounds(self) -> pygame.Rect:
+        """one rect around every rect, same as Rect.unionall\n"""
+        if len(self.array) == 0:
+            return pygame.Rect(0, 0, 0, 0)
+        left, top = self.array[:, :2].min(axis=0).tolist()
+        right, bottom = int(self.right.max()), int(self.bottom.max())
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def move(self, dx: int, dy: int) -> 'RectArray':
+        moved = self.array.copy()
+        moved[:, 0] += dx
+        moved[:, 1] += dy
+        return RectArray(moved)
+
+    def __getitem__(self, index):
+        """a pygame.Rect for an int index, a RectArray for slices, index arrays and bool masks\n"""
+        if isinstance(index, (int, np.integer)):
+            return pygame.Rect(self.array[index].tolist())
+        return RectArray(self.array[index])
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.to_rects())
+
+    def __repr__(self):
+        return f'RectArray({len(self.array)})'
@@ -0,0 +1,124 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# fixed resolution render target for the game. The game draws everything into an internal surface
+# of a fixed size and the result is upscaled to the display once per frame. This class is responsible for:
+#   * owning the internal surface everything is drawn to.
+#   * fitting the internal surface to the display, optionally at an integer scale for crisp pixel art.
+#   * presenting the frame with a single scale pass straight into the display.
+#   * remapping mouse positions and mouse events from display to internal coordinates.
+#   * saving recorded points with their resolution and scaling old recordings made at the display resolution
+#     to internal coordinates.
+
+import math
+import pygame
+
+
+class RenderTarget:
+    # mouse events that carry a position that needs to be remapped
+    mouse_events = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION)
+
+    def __init__(self, display: pygame.Surface, size: tuple = (1280, 720), integer_scale: bool = False):
+        """
+        Create a render target that draws at a fixed internal resolution.
+        Args:
+            display (pygame.Surface): the display surface returned by pygame.display.set_mode.
+            size (tuple, optional): internal resolution, None renders at the display resolution. Defaults to (1280, 720).
+            integer_scale (bool, optional): only scale by whole numbers, borders are letterboxed. Defaults to False.
+        """
+        self.display = display
+        self.integer_scale = integer_scale
+        if size is None or tuple(size) == display.get_size():
+            # native mode, draw straight to the display and skip the scale pass
+            self.surface = display
+        else:
+            self.surface = pygame.Surface(size).convert(display)
+        self.size = self.surface.get_size()
+        self.resize()
+
+    @property
+    def native(self) -> bool:
+        return self.surface is self.display
+
+    def resize(self):
+        """recalculate the scale and destination rect, call after the display changes size\n"""
+        d_w, d_h = self.display.get_size()
+        w, h = self.size
+        scale = min(d_w / w, d_h / h)
+        if self.integer_scale:
+            # integer scaling never goes below 1, a smaller display crops the frame
+            scale = max(1, math.floor(scale))
+        self.scale = scale
+        dest_size = (round(w * scale), round(h * scale))
+        self.dest_rect = pygame.Rect((0, 0), dest_size)
+        self.dest_rect.center = self.display.get_rect().center
+        if self.native:
+            self._target = None
+            return
+        # clear the letterbox borders once, they are never drawn to again
+        self.display.fill((0, 0, 0))
+        # scale straight into the display so presenting is a single pass. the scaled frame always fits,
+        # only scale 1 can overhang a smaller display and that frame is blitted and cropped without a scale pass
+        self._target = None if scale == 1 else self.display.subsurface(self.dest_rect)
+
+    def present(self):
+        """scale the internal surface onto the display, call once per frame before display.update\n"""
+        if self.native:
+            return
+        if self.scale == 1:
+            self.display.blit(self.surface, self.dest_rect)
+            return
+        if self.integer_scale:
+            # nearest neighbour keeps pixel art crisp
+            pygame.transform.scale(self.surface, self.dest_rect.size, self._target)
+        else:
+            pygame.transform.smoothscale(self.surface, self.dest_rect.size, self._target)
+
+    def to_internal(self, pos: tuple) -> tuple:
+        """convert a display position to internal surface coordinates\n"""
+        if self.native:
+            return pos
+        x = (pos[0] - self.dest_rect.x) / self.scale
+        y = (pos[1] - self.dest_rect.y) / self.scale
+        # clamp so clicks on the letterbox land on the nearest edge
+        x = min(max(int(x), 0), self.size[0] - 1)
+        y = min(max(int(y), 0), self.size[1] - 1)
+        return x, y
+
+    def scale_points(self, points: list, source: tuple = None) -> list:
+        """scale [x, y] points recorded at the source resolution to internal coordinates, the display by default\n
+        the tiles are sized from the screen, so each axis is scaled by its own factor and the points stay on the same tiles."""
+        if source is None:
+            source = self.display.get_size()
+        if tuple(source) == self.size:
+            return points
+        s_x = self.size[0] / source[0]
+        s_y = self.size[1] / source[1]
+        return [[round(x * s_x), round(y * s_y)] for x, y in points]
+
+    def dump_points(self, points: list) -> dict:
+        """points recorded in internal coordinates, saved with the internal resolution so loading doesn't scale them twice\n"""
+        return {'size': list(self.size), 'points': [list(p) for p in points]}
+
+    def load_points(self, data) -> list:
+        """points saved by dump_points in internal coordinates, a plain list is an old recording at the display resolution\n"""
+        if isinstance(data, list):
+            return self.scale_points(data)
+        return self.scale_points([list(p) for p in data['points']], data['size'])
+
+    def mouse_pos(self) -> tuple:
+        """pygame.mouse.get_pos in internal surface coordinates\n"""
+        return self.to_internal(pygame.mouse.get_pos())
+
+    def remap_event(self, event: pygame.event.Event) -> pygame.event.Event:
+        """return the event with its mouse position in internal coordinates, other events are returned as is\n"""
+        if self.native or event.type not in self.mouse_events:
+            return event
+        attrs = event.dict.copy()
+        attrs['pos'] = self.to_internal(event.pos)
+        if 'rel' in attrs:
+            attrs['rel'] = (attrs['rel'][0] / self.scale, attrs['rel'][1] / self.scale)
+        return pygame.event.Event(event.type, attrs)
+
+    def __repr__(self):
+        return f'RenderTarget({self.size} -> {self.dest_rect.size}, integer_scale={self.integer_scale})'
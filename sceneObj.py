@@ -7,14 +7,20 @@
 #   * maintain rects used for collision detection.
 #   * rescaling all components to the screen resolution. 
 #   * drawing components in the correct order and location on screen.
+#   * tracking which tiles changed so cached layers (world chunks) can be rebuilt.
 
 import numpy as np
 import pygame
 from pygame.locals import *
-from GameObjects import AniRig
+from GameObjects import AniRig, YSortGroup
 
 class Background(AniRig):
-    def __init__(self, *args, **kwargs) -> None:
+    def __init__(self, *args, grid_shape: tuple = None, **kwargs) -> None:
+        """
+        Args:
+            grid_shape (tuple, optional): (rows, columns) of the tile grid, the world can be larger than the screen.
+            Defaults to None, one screen of tiles.
+        """
         super().__init__(*args, **kwargs)
         # get the screen size, used to calculate the size of all other components
         self.screen_size = self.screen_rect.size
@@ -23,8 +29,13 @@ class Background(AniRig):
         self.initialize_error_sprite()
         # calculate the tile size given the screen size (initial size is 100x100).
         self.tile_size = self.screen_size[0] // 10, self.screen_size[1] // 10
+        self.grid_shape = grid_shape
         self.create_grid(*self.tile_size)
-        self.scene_elements = pygame.sprite.Group()
+        # size of the whole tile map in pixels
+        rows, columns = self.grid.shape
+        self.world_size = columns * self.tile_size[0], rows * self.tile_size[1]
+        # scene elements are depth sorted with the entities when drawn in a world layer
+        self.scene_elements = YSortGroup()
         
     def initialize_error_sprite(self):
         self.errorSprite = pygame.Surface((100, 100))
@@ -35,10 +46,19 @@ class Background(AniRig):
         self.errorSprite.blit(text, (50, 50))
         
     def create_grid(self, tile_width, tile_height):
-        screen_width, screen_height = self.screen_size
-        num_columns = screen_width // tile_width
-        num_rows = screen_height // tile_height
+        if self.grid_shape is None:
+            screen_width, screen_height = self.screen_size
+            num_columns = screen_width // tile_width
+            num_rows = screen_height // tile_height
+        else:
+            num_rows, num_columns = self.grid_shape
         self.grid = np.empty((num_rows, num_columns), dtype=object)
+        # per tile change counter, cached layers compare it against the version they were built from
+        self.version = 0
+        self.tile_version = np.zeros((num_rows, num_columns), dtype=np.int64)
+        # tile type of every cell as a small int, tile_codes maps tType -> code in order of first use
+        self.tile_codes = {}
+        self.tile_types = np.zeros((num_rows, num_columns), dtype=np.int16)
         # add all dark tiles to the grid
         self.grid.fill(self.dark_tile)
         flat_grid = self.grid.flatten()
@@ -55,11 +75,11 @@ class Background(AniRig):
         # convert the row and column to pixel coordinates
         rect.x = column * self.tile_size[0]
         rect.y = row * self.tile_size[1]
-        # create a mask for the tile
-        mask = pygame.mask.from_surface(image)
-        # make the mask a property of the tile
-        tile.mask = mask
+        # masks for pixel perfect collision are made on demand by collision.MaskCache
         self.grid[row, column] = image.copy(), rect.copy(), tType
+        self.tile_types[row, column] = self.tile_codes.setdefault(tType, len(self.tile_codes))
+        self.version += 1
+        self.tile_version[row, column] = self.version
         # if the tType is not a key in the entityDict add it
         self.register_entity(tType, rect)
 
@@ -72,6 +92,10 @@ class Background(AniRig):
         
     def get_tile(self, row, column):
         return self.grid[row, column]
+
+    def changed_cells(self, since: int):
+        """return (rows, columns) index arrays of the tiles changed after version 'since'\n"""
+        return np.nonzero(self.tile_version > since)
     
     def draw_element_at(self, element, row, column):
         img, rect = self.get_tile(row, column)[:2]
@@ -82,18 +106,53 @@ class Background(AniRig):
         element.rect.topleft = (x, y)
         
         
+    def draw_band(self, first_row, last_row):
+        """draw a range of tile rows onto a new surface, safe to run on a worker thread\n"""
+        tile_h = self.tile_size[1]
+        top = first_row * tile_h
+        band = pygame.Surface((self.image.get_width(), (last_row - first_row) * tile_h), pygame.SRCALPHA)
+        band.blits([(img, rect.move(0, -top)) for row in self.grid[first_row:last_row] for img, rect, _ in row], False)
+        return band
+
+    def draw_bands(self, compositor):
+        # one band per worker, each band is its own surface so the jobs never share a target,
+        # every tile is in one band and add_tile gives each tile its own image so they never share a source
+        rows = self.grid.shape[0]
+        step = max(1, -(-rows // compositor.workers))
+        starts = range(0, rows, step)
+        for first_row in starts:
+            compositor.submit(self.draw_band, first_row, min(first_row + step, rows))
+        bands = compositor.join()
+        for first_row, band in zip(starts, bands[-len(starts):]):
+            self.image.blit(band, (0, first_row * self.tile_size[1]))
+
     def draw_tile(self, tile):
         # draw the tile at the correct location
         img, rect = tile[:2]
         x, y = rect.x, rect.y
         self.image.blit(img, (x, y))
         
-    def draw_scene(self):
-        # flatten the grid and draw each tile
-        flat_grid = self.grid.flatten()
-        np.vectorize(self.draw_tile)(flat_grid)
+    def draw_scene(self, include_elements=True, compositor=None):
+        """bake the tiles onto the background image\n
+        include_elements=False leaves the scene elements out so they can be drawn
+        in a YSortGroup world layer and overlap correctly with the player and enemies.
+        a Compositor bakes horizontal bands of tiles in parallel before they are joined onto the image.
+        grids larger than the screen grow the image to the world size instead of clipping the tiles,
+        games that scroll should draw camera.WorldChunks instead of baking the whole world.
+        """
+        size = tuple(max(a, b) for a, b in zip(self.image.get_size(), self.world_size))
+        if size != self.image.get_size():
+            self.image = pygame.Surface(size, pygame.SRCALPHA)
+            self.rect = self.image.get_rect(topleft=self.rect.topleft)
+        if compositor is not None:
+            self.draw_bands(compositor)
+        else:
+            # flatten the grid and draw each tile
+            flat_grid = self.grid.flatten()
+            np.vectorize(self.draw_tile)(flat_grid)
         # draw all scene elements
-        self.scene_elements.draw(self.image)
+        if include_elements:
+            self.scene_elements.draw(self.image)
         return self.image
                 
 if __name__ == "__main__":
@@ -0,0 +1,260 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# decides which entities are simulated on a frame so large worlds cost roughly what the visible area costs.
+#   * SimulationLod sorts entities into detail tiers by distance to the focus (the player or camera center).
+#     full tier entities update every frame, reduced tier entities every few frames with coarser moves and
+#     dormant entities rarely, with only their roaming simulated. entities in the camera view are always full.
+#   * ticks of the slower tiers are spread over frames by a per entity phase so they don't all land on one frame.
+#   * an entity ticking after a gap integrates the frames it skipped, so it covers the same ground it would
+#     have at full detail and changing tier does not change where it ends up.
+#   * AiScheduler gives entity decisions a time budget per frame and hands it out round robin, the entities
+#     that don't get a turn keep moving on their last decision. how stale each decision is can be queried.
+
+from collections import deque
+import time
+import numpy as np
+
+
+class SimulationLod:
+    # detail tiers
+    FULL, REDUCED, DORMANT = 0, 1, 2
+
+    def __init__(self, near: float = 600, far: float = 1500, reduced_every: int = 4, dormant_every: int = 16,
+                 hysteresis: float = 64):
+        """
+        Create the detail tiers.
+        Args:
+            near (float, optional): distance from the focus past which entities drop to the reduced tier. Defaults to 600.
+            far (float, optional): distance past which they go dormant. Defaults to 1500.
+            reduced_every (int, optional): frames between reduced tier ticks. Defaults to 4.
+            dormant_every (int, optional): frames between dormant tier ticks. Defaults to 16.
+            hysteresis (float, optional): entities are only promoted again once they are this far inside the
+            boundary, so entities walking along a boundary don't flip tiers every frame. Defaults to 64.
+        """
+        self.bounds = np.array([near, far], dtype=np.float64)
+        self.every = np.array([1, reduced_every, dormant_every], dtype=np.int64)
+        self.hysteresis = hysteresis
+
+    def tiers(self, dist: np.ndarray, visible: np.ndarray, tier: np.ndarray) -> np.ndarray:
+        """
+        Detail tier of every entity.
+        Args:
+            dist (np.ndarray): distance of each entity to the focus.
+            visible (np.ndarray): bool, entities in the camera view are always full detail.
+            tier (np.ndarray): the tiers from the previous frame.
+        Returns:
+            np.ndarray: int8 tiers.
+        """
+        new = np.searchsorted(self.bounds, dist, side='right')
+        inside = np.searchsorted(self.bounds - self.hysteresis, dist, side='right')
+        # demote as soon as a boundary is crossed, promote only once well inside it
+        new = np.where(new > tier, new, np.minimum(tier, inside))
+        new[visible] = self.FULL
+        return new.astype(np.int8)
+
+    def update(self, frame: int, dist: np.ndarray, visible: np.ndarray, tier: np.ndarray, last_tick: np.ndarray,
+               phase: np.ndarray) -> tuple:
+        """
+        Pick the entities simulated this frame.
+        Args:
+            frame (int): frame number, increases by one every call.
+            dist (np.ndarray): distance of each entity to the focus.
+            visible (np.ndarray): bool, entities in the camera view.
+            tier (np.ndarray): the tiers from the previous frame.
+            last_tick (np.ndarray): frame each entity was last simulated, updated in place.
+            phase (np.ndarray): per entity offset spreading the slower tiers over frames.
+        Returns:
+            tuple: (tier, steps), steps is the number of frames each entity should advance this frame, 0 to skip it.
+        """
+        new = self.tiers(dist, visible, tier)
+        # promoted entities tick right away so nothing pops into view stale
+        due = ((frame + phase) % self.every[new] == 0) | (new < tier)
+        steps = np.where(due, frame - last_tick, 0)
+        last_tick[due] = frame
+        return new, steps
+
+    def __repr__(self):
+        return f'SimulationLod(near={self.bounds[0]:g}, far={self.bounds[1]:g}, every={self.every.tolist()})'
+
+
+class AiScheduler:
+    def __init__(self, budget_ms: float = 2.0, min_think: int = 1, smoothing: float = 0.2):
+        """
+        Round robin decision scheduler with a per frame time budget.
+        the number of decisions a frame gets is the budget over the measured cost of one decision, so a crowd
+        aggroing at once spreads its thinking over the next frames instead of spiking one.
+        Args:
+            budget_ms (float, optional): milliseconds of thinking per frame. Defaults to 2.0.
+            min_think (int, optional): decisions made every frame however expensive they get. Defaults to 1.
+            smoothing (float, optional): weight of the newest cost measurement in the running average. Defaults to 0.2.
+        """
+        self.budget = budget_ms / 1000
+        self.min_think = min_think
+        self.smoothing = smoothing
+        # seconds per decision, 0 until the first frame is measured so everyone decides on the first frame
+        self.cost = 0.0
+        # round robin order, the front decides next
+        self.queue = deque()
+        self.members = []
+        # entity -> frame of its last decision
+        self.last_think = {}
+        self.frame = 0
+        # decisions and seconds spent last frame
+        self.thought = 0
+        self.elapsed = 0.0
+
+    def sync(self, entities: list):
+        '''match the queue to the entities, new ones go to the front so they decide on their first frame\n'''
+        if entities == self.members:
+            return
+        members = set(entities)
+        known = set(self.queue)
+        self.queue = deque(e for e in self.queue if e in members)
+        self.queue.extendleft(e for e in reversed(entities) if e not in known)
+        self.last_think = {e: f for e, f in self.last_think.items() if e in members}
+        self.members = list(entities)
+
+    def plan(self, entities: list, eligible=None) -> list:
+        """
+        Start a frame and pick the entities that decide in it.
+        Args:
+            entities (list): every entity being scheduled.
+            eligible (optional): callable, entities it returns False for are passed over and keep their place
+            in the queue, e.g. entities the SimulationLod skips this frame. Defaults to None.
+        Returns:
+            list: the entities to decide for, report the time it took with spent.
+        """
+        self.frame += 1
+        self.sync(entities)
+        n = len(self.queue)
+        count = n if self.cost <= 0 else int(self.budget / self.cost)
+        count = min(n, max(self.min_think, count))
+        picked, passed = [], []
+        for _ in range(n):
+            if len(picked) == count:
+                break
+            e = self.queue.popleft()
+            (picked if eligible is None or eligible(e) else passed).append(e)
+        self.queue.extendleft(reversed(passed))
+        self.queue.extend(picked)
+        for e in picked:
+            self.last_think[e] = self.frame
+        return picked
+
+    def spent(self, count: int, seconds: float):
+        '''report the time the planned decisions took, it sizes the next frames\n'''
+        self.thought, self.elapsed = count, seconds
+        if count == 0:
+            return
+        per = seconds / count
+        self.cost = per if self.cost <= 0 else self.cost + self.smoothing * (per - self.cost)
+
+    def run(self, entities: list, think, eligible=None) -> list:
+        '''plan, call think(entity) for every picked entity and time it, returns the picked entities\n'''
+        start = time.perf_counter()
+        picked = self.plan(entities, eligible)
+        for e in picked:
+            think(e)
+        self.spent(len(picked), time.perf_counter() - start)
+        return picked
+
+    def staleness(self, entity) -> int:
+        '''frames since the entity's last decision\n'''
+        return self.frame - self.last_think.get(entity, 0)
+
+    def stats(self) -> dict:
+        '''decisions and milliseconds last frame, estimated milliseconds per decision and decision staleness in frames\n'''
+        ages = np.array([self.frame - self.last_think.get(e, 0) for e in self.queue], dtype=np.int64)
+        return {'thought': self.thought,
+                'ms': self.elapsed * 1000,
+                'cost_ms': self.cost * 1000,
+                'mean_staleness': float(ages.mean()) if len(ages) else 0.0,
+                'max_staleness': int(ages.max()) if len(ages) else 0}
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __repr__(self):
+        return f'AiScheduler({len(self.queue)}, budget={self.budget * 1000:g}ms, thought={self.thought})'
+
+
+class TimerWheel:
+    def __init__(self, slots: int = 64, levels: int = 3):
+        """
+        Hierarchical timer wheel, payloads registered for a tick come back from advance on that tick.
+        level 0 has one slot per tick, each slot of level n covers slots**n ticks and is spread over the
+        lower levels when its turn comes, so scheduling, canceling and firing are O(1) per timer and
+        ticks without due timers only look at one empty slot.
+        Args:
+            slots (int, optional): slots per level. Defaults to 64.
+            levels (int, optional): number of levels, timers further out than slots**levels ticks wait in an
+            overflow list. Defaults to 3.
+        """
+        self.slots = slots
+        self.levels = levels
+        self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.overflow = []
+        self.now = 0
+        self.count = 0
+
+    def schedule(self, delay: int, payload) -> list:
+        '''fire payload delay ticks from now, at least one, returns the handle cancel takes\n'''
+        timer = [self.now + max(1, int(delay)), payload, True]
+        self.place(timer)
+        self.count += 1
+        return timer
+
+    def cancel(self, timer: list):
+        '''stop a timer from firing, canceled timers are dropped when their slot comes up\n'''
+        if timer is not None and timer[2]:
+            timer[2] = False
+            self.count -= 1
+
+    def place(self, timer: list):
+        due = timer[0]
+        delta = due - self.now
+        span = 1
+        for wheel in self.wheels:
+            if delta < span * self.slots:
+                wheel[(due // span) % self.slots].append(timer)
+                return
+            span *= self.slots
+        self.overflow.append(timer)
+
+    def advance(self, ticks: int = 1) -> list:
+        '''move time forward, returns the payloads of the timers that fired in firing order\n'''
+        fired = []
+        for _ in range(ticks):
+            self.now += 1
+            now = self.now
+            # spread the slots starting on this tick over the lower levels, highest level first
+            if now % self.slots ** self.levels == 0:
+                overflow, self.overflow = self.overflow, []
+                for timer in overflow:
+                    if timer[2]:
+                        self.place(timer)
+            for level in range(self.levels - 1, 0, -1):
+                span = self.slots ** level
+                if now % span:
+                    continue
+                wheel = self.wheels[level]
+                index = (now // span) % self.slots
+                bucket, wheel[index] = wheel[index], []
+                for timer in bucket:
+                    if timer[2]:
+                        self.place(timer)
+            index = now % self.slots
+            bucket, self.wheels[0][index] = self.wheels[0][index], []
+            for timer in bucket:
+                if timer[2]:
+                    timer[2] = False
+                    self.count -= 1
+                    fired.append(timer[1])
+        return fired
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f'TimerWheel({self.count} timers, now={self.now})'
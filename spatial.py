@@ -0,0 +1,212 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description:
+# spatial indexes for dynamic entities.
+#   * SpatialHash is a uniform grid broadphase, each sprite is stored in every cell its rect touches.
+#     sprites are only re-bucketed when their rect crosses a cell boundary, and point, rect and radius
+#     queries only look at the cells they cover, so they scale with local density instead of entity count.
+#   * KDTree is a 2d tree over a handful of points (players, decoys, allies) rebuilt every frame, it answers
+#     "nearest point within r_i" for every enemy in one vectorized descent, O(n log m) instead of n * m checks.
+
+from collections import defaultdict
+import math
+import numpy as np
+import pygame
+
+
+class SpatialHash:
+    def __init__(self, cell_size=(128, 72)):
+        """
+        Create a spatial hash.
+        Args:
+            cell_size (int or tuple, optional): width and height of a cell, about one tile. Defaults to (128, 72).
+        """
+        if isinstance(cell_size, (int, float)):
+            cell_size = (cell_size, cell_size)
+        self.cell_w, self.cell_h = cell_size
+        # (column, row) -> sprites touching the cell
+        self.cells = defaultdict(set)
+        # sprite -> (c0, r0, c1, r1) cell range it is stored in
+        self.entries = {}
+        # sprites inserted as static, update_all never looks at them
+        self.static = set()
+
+    def cell_range(self, rect: pygame.Rect) -> tuple:
+        w, h = self.cell_w, self.cell_h
+        return (int(rect.left // w), int(rect.top // h),
+                int((rect.right - 1) // w), int((rect.bottom - 1) // h))
+
+    def _cells(self, cell_range: tuple):
+        c0, r0, c1, r1 = cell_range
+        for c in range(c0, c1 + 1):
+            for r in range(r0, r1 + 1):
+                yield c, r
+
+    def insert(self, sprite: pygame.sprite.Sprite, static: bool = False):
+        '''add a sprite, static sprites like scene elements are left out of update_all\n'''
+        if static:
+            self.static.add(sprite)
+        if sprite in self.entries:
+            self.update(sprite)
+            return
+        cell_range = self.cell_range(sprite.rect)
+        self.entries[sprite] = cell_range
+        for key in self._cells(cell_range):
+            self.cells[key].add(sprite)
+
+    def remove(self, sprite: pygame.sprite.Sprite):
+        self.static.discard(sprite)
+        cell_range = self.entries.pop(sprite, None)
+        if cell_range is None:
+            return
+        for key in self._cells(cell_range):
+            cell = self.cells[key]
+            cell.discard(sprite)
+            if not cell:
+                del self.cells[key]
+
+    def update(self, sprite: pygame.sprite.Sprite) -> bool:
+        """move the sprite to the cells of its current rect, returns True if it changed cells\n"""
+        cell_range = self.cell_range(sprite.rect)
+        old = self.entries.get(sprite)
+        if old == cell_range:
+            return False
+        if old is not None:
+            for key in self._cells(old):
+                cell = self.cells[key]
+                cell.discard(sprite)
+                if not cell:
+                    del self.cells[key]
+        self.entries[sprite] = cell_range
+        for key in self._cells(cell_range):
+            self.cells[key].add(sprite)
+        return True
+
+    def update_all(self) -> int:
+        """update every sprite that is not static, returns how many changed cells\n"""
+        static = self.static
+        return sum(self.update(sprite) for sprite in list(self.entries) if sprite not in static)
+
+    def candidates(self, rect: pygame.Rect) -> set:
+        """every sprite stored in the cells a rect covers, not yet tested against the rect\n"""
+        found = set()
+        cells = self.cells
+        for key in self._cells(self.cell_range(rect)):
+            cell = cells.get(key)
+            if cell:
+                found |= cell
+        return found
+
+    def query_point(self, pos: tuple, group: pygame.sprite.AbstractGroup = None) -> list:
+        """sprites whose rect contains the point, optionally only members of a group\n"""
+        cell = self.cells.get((int(pos[0] // self.cell_w), int(pos[1] // self.cell_h)), ())
+        return [s for s in cell if s.rect.collidepoint(pos) and (group is None or group.has(s))]
+
+    def query_rect(self, rect: pygame.Rect, group: pygame.sprite.AbstractGroup = None) -> list:
+        """sprites whose rect overlaps the rect, optionally only members of a group\n"""
+        return [s for s in self.candidates(rect) if s.rect.colliderect(rect) and (group is None or group.has(s))]
+
+    def query_radius(self, pos: tuple, radius: float, group: pygame.sprite.AbstractGroup = None) -> list:
+        """sprites whose rect center is within radius of the point, optionally only members of a group\n"""
+        x, y = pos
+        area = pygame.Rect(math.floor(x - radius), math.floor(y - radius),
+                           math.ceil(radius * 2) + 1, math.ceil(radius * 2) + 1)
+        r2 = radius * radius
+        found = []
+        for s in self.candidates(area):
+            c_x, c_y = s.rect.center
+            if (c_x - x) ** 2 + (c_y - y) ** 2 <= r2 and (group is None or group.has(s)):
+                found.append(s)
+        return found
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f'SpatialHash(cell=({self.cell_w}, {self.cell_h}), sprites={len(self.entries)}, cells={len(self.cells)})'
+
+
+class KDTree:
+    def __init__(self, points, leaf_size: int = 8):
+        """
+        Static 2d tree over points, cheap enough to rebuild every frame for moving targets.
+        Args:
+            points: (M, 2) positions.
+            leaf_size (int, optional): most points in a leaf. Defaults to 8.
+        """
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        lo, hi, children, ranges, order = [], [], [], [], []
+
+        def build(idx):
+            node = len(lo)
+            pts = self.points[idx]
+            lo.append(pts.min(axis=0))
+            hi.append(pts.max(axis=0))
+            children.append((-1, -1))
+            ranges.append((len(order), len(idx)))
+            if len(idx) <= leaf_size:
+                order.extend(idx.tolist())
+                return node
+            # split the longer side of the box at the median
+            axis = int(np.argmax(hi[node] - lo[node]))
+            idx = idx[np.argsort(pts[:, axis], kind='stable')]
+            mid = len(idx) // 2
+            children[node] = (build(idx[:mid]), build(idx[mid:]))
+            return node
+
+        if len(self.points):
+            build(np.arange(len(self.points)))
+        self.lo = np.array(lo, dtype=np.float64).reshape(-1, 2)
+        self.hi = np.array(hi, dtype=np.float64).reshape(-1, 2)
+        self.left, self.right = np.array(children, dtype=np.int64).reshape(-1, 2).T
+        self.start, self.count = np.array(ranges, dtype=np.int64).reshape(-1, 2).T
+        # point indices in leaf order, leaf i holds order[start[i]:start[i] + count[i]]
+        self.order = np.array(order, dtype=np.int64)
+
+    def nearest_within(self, points, radii) -> tuple:
+        """
+        Nearest tree point within each query's radius, every query in one pass.
+        Args:
+            points: (N, 2) query positions.
+            radii: (N,) search radii or one radius for all, the radius itself counts as in range.
+        Returns:
+            tuple: (index, dist) arrays, index into the tree's points or -1 with dist inf when nothing is in range.
+        """
+        queries = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        n = len(queries)
+        best = np.broadcast_to(np.asarray(radii, dtype=np.float64), (n,)).copy()
+        index = np.full(n, -1, dtype=np.int64)
+        if n == 0 or len(self.points) == 0:
+            return index, np.full(n, np.inf)
+        # (query, node) pairs still to visit, one tree level per loop
+        q = np.arange(n)
+        node = np.zeros(n, dtype=np.int64)
+        while len(q):
+            # skip boxes further away than the best point found so far
+            gap = np.maximum(np.maximum(self.lo[node] - queries[q], queries[q] - self.hi[node]), 0)
+            keep = np.hypot(gap[:, 0], gap[:, 1]) <= best[q]
+            q, node = q[keep], node[keep]
+            leaf = self.left[node] < 0
+            if leaf.any():
+                leaf_q, leaf_node = q[leaf], node[leaf]
+                start, count = self.start[leaf_node], self.count[leaf_node]
+                cand_q = np.repeat(leaf_q, count)
+                cand = self.order[np.repeat(start - np.cumsum(count) + count, count) + np.arange(count.sum())]
+                d = np.hypot(*(self.points[cand] - queries[cand_q]).T)
+                # closest candidate of each query, kept if it beats the best so far
+                by_query = np.lexsort((d, cand_q))
+                first = by_query[np.r_[True, cand_q[by_query][1:] != cand_q[by_query][:-1]]]
+                f_q, f_d = cand_q[first], d[first]
+                better = (f_d < best[f_q]) | ((index[f_q] < 0) & (f_d <= best[f_q]))
+                best[f_q[better]] = f_d[better]
+                index[f_q[better]] = cand[first][better]
+            inner = ~leaf
+            q = np.repeat(q[inner], 2)
+            node = np.stack([self.left[node[inner]], self.right[node[inner]]], axis=1).ravel()
+        return index, np.where(index >= 0, best, np.inf)
+
+    def __len__(self):
+        return len(self.points)
+
+    def __repr__(self):
+        return f'KDTree({len(self.points)} points, {len(self.lo)} nodes)'
@@ -0,0 +1,1005 @@
+# Author: Cameron Kerley
+# Date: 10/19/2026
+# Description: unittest cases for the game systems that do not need a window or user input,
+# world layer ordering, rendering helpers, collision and navigation.
+import unittest
+import pathlib
+import tempfile
+import os
+import random
+import math
+import json
+import time
+import types
+
+import numpy as np
+import pygame
+
+from GameObjects import YSortGroup
+from render_target import RenderTarget
+from sceneObj import Background
+from camera import Camera, WorldChunks, ZoomCamera, MipCache
+from lighting import LightMap
+from debug_overlay import DebugOverlay
+from compositor import Compositor
+from frame_capture import FrameCapture
+from minimap import Minimap
+from collision import WalkGrid, DistanceField, MaskCache, collide_precise, distance_to
+from GameObjects import hit_box, hb_group, Enemy, EnemyBatch, EnemyGroup
+from spatial import SpatialHash, KDTree
+from collision_geometry import CollisionGeometry, split_strokes
+from navigation import NavGrid, FlowField, PathJobs
+from scheduling import SimulationLod, AiScheduler, TimerWheel
+import collision_extract
+from rect_array import RectArray
+pygame.init()
+
+def make_sprite(x, y, size=(10, 10)):
+    sprite = pygame.sprite.Sprite()
+    sprite.image = pygame.Surface(size)
+    sprite.rect = sprite.image.get_rect(topleft=(x, y))
+    return sprite
+
+def make_background(screen, grid_shape=None):
+    pathDir = pathlib.Path('imgs/scene/')
+    fNames = ['dark_tile.png', 'light_tile.png', 'house_t.png']
+    return Background(screen,
+                      imgPaths=[pathDir / f for f in fNames],
+                      surfSize=screen.get_rect().size,
+                      offSet=[[0, 0], [0, 0], [0, 0]],
+                      grid_shape=grid_shape)
+
+class TestYSortGroup(unittest.TestCase):
+    def test_draw_order(self):
+        sprites = [make_sprite(0, y) for y in (50, 10, 30, 20)]
+        group = YSortGroup(sprites)
+        group.sort()
+        bottoms = [s.rect.bottom for s in group.sprites()]
+        self.assertEqual(bottoms, sorted(bottoms), "sprites are not ordered by rect.bottom")
+
+        # small moves only need a few shifts to repair the order
+        group.sprites()[0].rect.y = 25
+        shifts = group.sort()
+        self.assertEqual(shifts, 1, "order repair should be incremental")
+        self.assertEqual(group.sort(), 0, "sorted order should not shift")
+
+    def test_add_remove(self):
+        a, b = make_sprite(0, 0), make_sprite(0, 5)
+        group = YSortGroup(a)
+        group.add(b)
+        group.remove(a)
+        self.assertEqual(group.sprites(), [b])
+        self.assertEqual(len(group), 1)
+
+class TestRenderTarget(unittest.TestCase):
+    def test_present_and_remap(self):
+        display = pygame.display.set_mode((400, 300))
+        target = RenderTarget(display, (160, 90), integer_scale=True)
+        # 400x300 fits 160x90 twice, letterboxed vertically
+        self.assertEqual(target.scale, 2)
+        self.assertEqual(target.dest_rect.size, (320, 180))
+        target.surface.fill((0, 255, 0))
+        target.present()
+        self.assertEqual(display.get_at(target.dest_rect.center)[:3], (0, 255, 0))
+        self.assertEqual(display.get_at((0, 0))[:3], (0, 0, 0))
+
+        x, y = target.dest_rect.topleft
+        self.assertEqual(target.to_internal((x + 21, y + 41)), (10, 20))
+        event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, {'button': 1, 'pos': (x + 21, y + 41)})
+        self.assertEqual(target.remap_event(event).pos, (10, 20))
+        # points recorded on the 400x300 display land on the same spots of the 160x90 frame
+        self.assertEqual(target.scale_points([[200, 150], [400, 300]]), [[80, 45], [160, 90]])
+
+    def test_display_smaller_than_frame(self):
+        # integer scaling never goes below 1, the frame is cropped by the blit
+        display = pygame.display.set_mode((120, 80))
+        target = RenderTarget(display, (160, 90), integer_scale=True)
+        self.assertEqual(target.scale, 1)
+        target.surface.fill((0, 0, 255))
+        target.present()
+        self.assertEqual(display.get_at((60, 40))[:3], (0, 0, 255))
+
+    def test_smooth_scale(self):
+        display = pygame.display.set_mode((400, 300))
+        target = RenderTarget(display, (160, 90))
+        target.surface.fill((255, 0, 0))
+        target.present()
+        self.assertEqual(target.dest_rect.width, 400)
+        self.assertEqual(display.get_at(target.dest_rect.center)[:3], (255, 0, 0))
+
+    def test_saved_points_round_trip(self):
+        display = pygame.display.set_mode((400, 300))
+        target = RenderTarget(display, (160, 90))
+        recorded = [(10, 20), (150, 80)]
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'mouse_positions.json')
+            # saved and loaded again, points in internal coordinates are not scaled a second time
+            for _ in range(2):
+                with open(path, 'w') as f:
+                    json.dump(target.dump_points(recorded), f)
+                with open(path) as f:
+                    loaded = target.load_points(json.load(f))
+                self.assertEqual(loaded, [list(p) for p in recorded])
+                recorded = loaded
+        # saved at another internal resolution, scaled to this one
+        self.assertEqual(target.load_points({'size': [320, 180], 'points': [[20, 40]]}), [[10, 20]])
+        # old recordings are a plain list at the display resolution
+        self.assertEqual(target.load_points([[200, 150]]), [[80, 45]])
+
+class TestCamera(unittest.TestCase):
+    def test_follow_and_chunks(self):
+        screen = pygame.display.set_mode((200, 200))
+        # 20x20 tiles, the world is 30x30 tiles = 600x600
+        background = make_background(screen, grid_shape=(30, 30))
+        self.assertEqual(background.world_size, (600, 600))
+        camera = Camera((200, 200), background.world_size)
+        camera.follow(pygame.Rect(590, 590, 10, 10))
+        self.assertEqual(camera.rect.bottomright, (600, 600), "camera should stop at the world edge")
+
+        chunk_bytes = 128 * 128 * 4
+        chunks = WorldChunks(background, chunk_size=(128, 128), memory_budget=chunk_bytes * 9)
+        chunks.draw(screen, camera)
+        # a 200x200 view over 128x128 chunks touches at most 3x3 chunks
+        self.assertLessEqual(len(chunks.cache), 9)
+        camera.follow(pygame.Rect(0, 0, 10, 10))
+        chunks.draw(screen, camera)
+        self.assertLessEqual(chunks.memory_used, chunks.memory_budget)
+
+        # a tile edit only drops the chunk holding it
+        cached = len(chunks.cache)
+        background.add_tile(background.light_tile, 0, tType='light')
+        chunks.sync()
+        self.assertEqual(len(chunks.cache), cached - 1)
+        chunks.draw(screen, camera)
+        self.assertEqual(screen.get_at((5, 5)), background.get_tile(0, 0)[0].get_at((5, 5)))
+
+        # a whole world bake is not clipped to the screen
+        background.add_tile(background.light_tile, 899, tType='light')
+        image = background.draw_scene()
+        self.assertEqual(image.get_size(), (600, 600))
+        self.assertEqual(image.get_at((595, 595)), background.get_tile(29, 29)[0].get_at((15, 15)))
+
+    def test_zoom_levels(self):
+        screen = pygame.display.set_mode((200, 200))
+        background = make_background(screen, grid_shape=(40, 40))
+        camera = ZoomCamera((200, 200), background.world_size)
+        camera.follow(pygame.Rect(400, 400, 0, 0))
+        camera.zoom_out()
+        camera.zoom_out()
+        self.assertEqual(camera.rect.size, (800, 800))
+        self.assertEqual(camera.to_world(camera.to_screen((440, 480))), (440, 480))
+
+        chunks = WorldChunks(background, chunk_size=(128, 128))
+        chunks.draw(screen, camera)
+        self.assertEqual(chunks.get(0, 0, 2).get_size(), (32, 32))
+
+        # mip levels are built once and reused
+        frame = pygame.Surface((64, 64), pygame.SRCALPHA)
+        mips = MipCache()
+        quarter = mips.get(frame, 2)
+        self.assertEqual(quarter.get_size(), (16, 16))
+        self.assertIs(mips.get(frame, 2), quarter)
+        self.assertEqual(len(mips), 2)
+
+class TestLightMap(unittest.TestCase):
+    def test_apply(self):
+        surface = pygame.Surface((160, 120))
+        surface.fill((200, 200, 200))
+        # the light's 8x8 box is larger than a batch, the three 3x3 vision boxes share one
+        lighting = LightMap((160, 120), cell=8, ambient=0, max_elements=32)
+        lighting.add_light((40, 60), 30, color=(255, 255, 255))
+        for x in (100, 110, 120):
+            lighting.add_vision((x, 60), 10)
+        buffer = lighting.compute()
+        self.assertEqual(buffer.shape, (20, 15, 3))
+        # only pixels inside a light's radius are lit
+        xs, ys = np.meshgrid(lighting.xs, lighting.ys, indexing='ij')
+        inside = np.hypot(xs - 40, ys - 60) < 30
+        for x in (100, 110, 120):
+            inside |= np.hypot(xs - x, ys - 60) < 10
+        self.assertTrue((buffer[..., 0] > 0).any())
+        self.assertTrue((buffer[..., 0][~inside] == 0).all())
+        lighting.apply(surface)
+        # lit near the light, dark where nothing reaches
+        self.assertGreater(surface.get_at((40, 60))[0], 150)
+        self.assertEqual(surface.get_at((2, 2))[:3], (0, 0, 0))
+
+class TestDebugOverlay(unittest.TestCase):
+    def test_bake_and_lines(self):
+        surface = pygame.Surface((200, 200))
+        camera = Camera((200, 200), (200, 200))
+        overlay = DebugOverlay([[10, 10], [50, 60]])
+        overlay.draw(surface, camera)
+        layer = overlay.layer
+        self.assertEqual(overlay.layer_rect, pygame.Rect(10, 10, 44, 54))
+        self.assertEqual(surface.get_at((11, 11))[:3], (255, 0, 0))
+        # the layer is reused until the recording changes
+        overlay.draw(surface, camera)
+        self.assertIs(overlay.layer, layer)
+        # a point inside the layer is drawn onto it, one past the edge grows it
+        overlay.add_point((30, 30))
+        self.assertIs(overlay.layer, layer)
+        self.assertEqual(layer.get_at((21, 21))[:3], (255, 0, 0))
+        overlay.add_point((150, 150))
+        overlay.draw(surface, camera)
+        self.assertIsNot(overlay.layer, layer)
+        self.assertTrue(overlay.layer_rect.contains(pygame.Rect(10, 10, 144, 144)))
+        self.assertEqual(surface.get_at((151, 151))[:3], (255, 0, 0))
+        self.assertEqual(surface.get_at((31, 31))[:3], (255, 0, 0))
+
+        for y in (20, 100, 180):
+            overlay.queue_line((20, y), (100, 100))
+        overlay.draw(surface, camera)
+        self.assertEqual(surface.get_at((60, 60))[:3], (0, 255, 0))
+        self.assertEqual(overlay.lines, {})
+
+class TestCompositor(unittest.TestCase):
+    def test_parallel_bakes_match(self):
+        screen = pygame.display.set_mode((200, 200))
+        compositor = Compositor(workers=4)
+        background = make_background(screen)
+        background.add_tile(background.light_tile, 11, tType='light')
+        background.draw_scene()
+        serial = background.image.copy()
+        background.image.fill((0, 0, 0, 0))
+        background.draw_scene(compositor=compositor)
+        self.assertEqual(pygame.image.tobytes(serial, 'RGBA'), pygame.image.tobytes(background.image, 'RGBA'))
+
+        big = make_background(screen, grid_shape=(30, 30))
+        chunks = WorldChunks(big, chunk_size=(128, 128), compositor=compositor)
+        keys = chunks.visible_chunks(pygame.Rect(0, 0, 600, 600))
+        chunks.prebake(keys)
+        self.assertEqual(len(chunks.cache), len(keys))
+        self.assertEqual(chunks.get(1, 1).get_at((10, 10)), chunks.bake(1, 1).get_at((10, 10)))
+        # tiles on a chunk border are drawn by two jobs, each gets its own copy
+        originals = {id(img) for row in big.grid for img, _, _ in row}
+        tiles = chunks.job_tiles(1, 1)
+        shared = [img for img, rect in tiles if not chunks.chunk_rect(1, 1).contains(rect)]
+        self.assertTrue(shared)
+        self.assertFalse({id(img) for img in shared} & originals)
+        compositor.shutdown()
+
+class TestFrameCapture(unittest.TestCase):
+    def test_capture_sequence(self):
+        surface = pygame.Surface((32, 24))
+        with tempfile.TemporaryDirectory() as out_dir:
+            capture = FrameCapture((32, 24), out_dir, buffers=2, fmt='raw')
+            capture.capture(surface)
+            self.assertEqual(capture.frame, 0, "frames should not be captured while inactive")
+            capture.start()
+            for shade in range(5):
+                surface.fill((shade, shade, shade))
+                capture.capture(surface)
+            capture.stop()
+            files = sorted(os.listdir(out_dir))
+            self.assertEqual(len(files) + capture.dropped, 5)
+            with open(os.path.join(out_dir, files[0]), 'rb') as f:
+                self.assertEqual(len(f.read()), 32 * 24 * 3)
+
+            # a second session, or a new FrameCapture on the same folder, numbers after the saved frames
+            for session in (capture, FrameCapture((32, 24), out_dir, buffers=2, fmt='raw')):
+                saved = len(os.listdir(out_dir))
+                session.start()
+                session.capture(surface)
+                session.stop()
+                self.assertEqual(len(os.listdir(out_dir)), saved + 1 - session.dropped)
+
+class TestMinimap(unittest.TestCase):
+    def test_incremental_cells(self):
+        screen = pygame.display.set_mode((200, 200))
+        background = make_background(screen)
+        minimap = Minimap(background, cell=2)
+        minimap.update([(5, 5)], (105, 105))
+        self.assertEqual(minimap.surface.get_at((0, 0))[:3], (220, 40, 40))
+        self.assertEqual(minimap.surface.get_at((10, 10))[:3], (40, 220, 40))
+        self.assertEqual(minimap.surface.get_at((2, 0))[:3], (45, 45, 60))
+
+        # the enemy leaves its cell and a tile changes
+        background.add_tile(background.light_tile, 1, tType='light')
+        minimap.update([(45, 5)], (105, 105))
+        self.assertEqual(minimap.surface.get_at((0, 0))[:3], (45, 45, 60))
+        self.assertEqual(minimap.surface.get_at((2, 0))[:3], (200, 170, 110))
+        self.assertEqual(minimap.surface.get_at((4, 0))[:3], (220, 40, 40))
+
+class TestWalkGrid(unittest.TestCase):
+    def test_matches_groupcollide(self):
+        screen = pygame.display.set_mode((200, 200))
+        background = make_background(screen)
+        np.vectorize(background.add_tile)(background.light_tile, [0, 1, 11, 12], tType='light')
+        walk_grid = WalkGrid(background)
+        self.assertEqual(int(walk_grid.grid.sum()), 4)
+
+        light_group = pygame.sprite.Group()
+        for rect in background.entityDict['light']:
+            light_group.add(pygame.sprite.Sprite())
+            light_group.sprites()[-1].rect = rect
+        boxes = hb_group()
+        for x, y in [(5, 5), (15, 15), (45, 5), (35, 25), (150, 150), (-20, 5), (190, 190)]:
+            boxes.add(hit_box((x, y), (10, 8)))
+        expected = [e not in pygame.sprite.groupcollide(boxes, light_group, False, False) for e in boxes.sprites()]
+        self.assertEqual(boxes.walkable_update(walk_grid).tolist(), expected)
+
+        # the grid follows tile changes
+        background.add_tile(background.light_tile, 99, tType='light')
+        self.assertFalse(walk_grid.colliding([pygame.Rect(190, 190, 5, 5)])[0])
+
+    def test_sweep(self):
+        screen = pygame.display.set_mode((200, 200))
+        background = make_background(screen)
+        # 20x20 tiles, light at (row 0, col 0), (0, 1), (1, 1), (1, 2)
+        np.vectorize(background.add_tile)(background.light_tile, [0, 1, 11, 12], tType='light')
+        walk_grid = WalkGrid(background)
+        box = pygame.Rect(2, 2, 6, 6)
+        # the wall at x=40 stops the box no matter how fast it moves
+        for speed in (100, 1000, 10 ** 6):
+            toi, normal = walk_grid.sweep(box, (speed, 0))
+            self.assertAlmostEqual(toi * speed, 32)
+            self.assertEqual(normal, (-1, 0))
+        self.assertEqual(walk_grid.sweep(box, (20, 0)), (1.0, (0, 0)))
+        toi, normal = walk_grid.sweep(pygame.Rect(25, 2, 6, 6), (0, 100))
+        self.assertAlmostEqual(toi, 0.32)
+        self.assertEqual(normal, (0, -1))
+
+        # the blocked x part of the move is dropped and the rest slides along the wall
+        (dx, dy), toi, slide = walk_grid.move(box, (100, 10))
+        self.assertAlmostEqual(dx, 32)
+        self.assertAlmostEqual(dy, 10)
+        self.assertAlmostEqual(slide[1], 6.8)
+        self.assertEqual(slide[0], 0)
+        # resting against the wall the box can still move away from it
+        resting = (34, 2, 6, 6)
+        self.assertEqual(walk_grid.sweep(resting, (5, 0))[0], 0)
+        self.assertEqual(walk_grid.sweep(resting, (-5, 0))[0], 1.0)
+
+    def test_distance_field(self):
+        # brute force distances match the separable transform
+        rng = np.random.default_rng(5)
+        mask = rng.random((13, 17)) > 0.8
+        ys, xs = np.nonzero(mask)
+        r, c = np.indices(mask.shape)
+        expected = np.sqrt(((r[..., None] - ys) ** 2 + (c[..., None] - xs) ** 2).min(axis=-1))
+        self.assertTrue(np.allclose(distance_to(mask), expected))
+
+        screen = pygame.display.set_mode((200, 200))
+        background = make_background(screen)
+        # a 3x3 block of 20x20 light tiles from (20, 20) to (80, 80)
+        np.vectorize(background.add_tile)(background.light_tile, [11, 12, 13, 21, 22, 23, 31, 32, 33], tType='light')
+        field = DistanceField(WalkGrid(background), cell=4)
+        self.assertAlmostEqual(field.distance((50, 50)), 28, delta=2)
+        self.assertAlmostEqual(field.distance((24, 50)), 4, delta=2)
+        self.assertLess(field.distance((10, 50)), 0)
+        # near the left wall the way out of the wall is to the right
+        g_x, g_y = field.direction((26, 50))
+        self.assertGreater(g_x, 0.5)
+        self.assertAlmostEqual(g_y, 0, delta=0.1)
+        self.assertEqual(field.distances([(50, 50), (10, 50)]).shape, (2,))
+
+        background.add_tile(background.light_tile, 14, tType='light')
+        field.sync()
+        self.assertGreater(field.distance((90, 30)), 0)
+
+class TestEnemyBatch(unittest.TestCase):
+    def make_enemies(self, screen, world):
+        # same seed, same agro ranges and roam schedules
+        random.seed(11)
+        img = pygame.Surface((40, 60))
+        angles = np.linspace(0, 2 * np.pi, 20, endpoint=False)
+        return [Enemy(screen, [[img, 2]], img, (int(600 + 130 * np.cos(a)), int(500 + 130 * np.sin(a))), world)
+                for a in angles]
+
+    def test_matches_per_enemy_update(self):
+        screen = pygame.display.set_mode((200, 200))
+        world = pygame.Rect(0, 0, 2000, 2000)
+        target = (500, 400)
+        single = self.make_enemies(screen, world)
+        batched = self.make_enemies(screen, world)
+        group = pygame.sprite.Group(batched)
+        batch = EnemyBatch(group, world)
+        for _ in range(5):
+            for e in single:
+                e.update([target])
+                e.agro_circle.update()
+            batch.update(target)
+            for e in batched:
+                e.update([target])
+        for a, b in zip(single, batched):
+            self.assertAlmostEqual(a.x, b.x)
+            self.assertAlmostEqual(a.y, b.y)
+            self.assertEqual(a.rect, b.rect)
+            self.assertEqual(a.flipped, b.flipped)
+            # the batch plays the same walking frames and idles the same enemies
+            self.assertEqual(a.image is a.idle_sprite, b.image is b.idle_sprite)
+        self.assertEqual(batch.ani_frame.tolist(), [e.walking_ani.frame_count for e in single])
+        self.assertTrue((batch.state != EnemyBatch.IDLE).any())
+
+        # removing an enemy repacks the arrays, releasing hands movement back
+        group.remove(batched[0])
+        batch.update(target)
+        self.assertEqual(len(batch), 19)
+        self.assertFalse(batched[0].batched)
+        batch.release()
+        self.assertFalse(any(e.batched for e in batched))
+
+    def test_replan_flags_a_new_goal(self):
+        screen = pygame.display.set_mode((200, 200))
+        world = pygame.Rect(0, 0, 2000, 2000)
+        single = self.make_enemies(screen, world)
+        batched = self.make_enemies(screen, world)
+        batch = EnemyBatch(pygame.sprite.Group(batched), world)
+        for e in single:
+            e.update([(5000, 5000)])
+            e.agro_circle.update()
+        batch.update((5000, 5000))
+        # replanning leaves the roam schedule alone, the goal changes on the next roaming step
+        counts = [e.e_pathing.frame_count for e in single]
+        for e in single:
+            e.replan()
+        batch.replan(np.ones(len(batch), dtype=bool))
+        self.assertEqual([e.e_pathing.frame_count for e in single], counts)
+        self.assertEqual(batch.frame_count.tolist(), counts)
+        for _ in range(40):
+            for e in single:
+                e.update([(5000, 5000)])
+                e.agro_circle.update()
+            batch.update((5000, 5000))
+        roamed = [e for e in single if not e.goal_due]
+        self.assertTrue(roamed)
+        self.assertEqual([not e.goal_due for e in single], (~batch.goal_due).tolist())
+
+    def test_walls_slide_like_per_enemy_update(self):
+        screen = pygame.display.set_mode((1000, 1000))
+        background = make_background(screen)
+        # 100x100 tiles, light everywhere except a wall between the enemies and the target
+        floor = [i for i in range(100) if not (i % 10 == 6 and i // 10 < 7)]
+        np.vectorize(background.add_tile)(background.light_tile, floor, tType='light')
+        walk_grid = WalkGrid(background)
+        world = pygame.Rect((0, 0), background.world_size)
+        target = (800, 450)
+        single = self.make_enemies(screen, world)
+        batched = self.make_enemies(screen, world)
+        batch = EnemyBatch(pygame.sprite.Group(batched), world)
+        for e in single + batched:
+            e.agro_range = 400
+            e.walk_grid = walk_grid
+            e.collisionSprite.update()
+        for _ in range(30):
+            for e in single:
+                e.update([target])
+                e.agro_circle.update()
+                e.collisionSprite.update()
+            batch.update(target, walk_grid)
+        for a, b in zip(single, batched):
+            self.assertEqual(a.rect, b.rect)
+        # enemies stopped at the wall keep sliding along it
+        wall = [e for e in batched if 560 < e.collisionSprite.rect.right <= 600]
+        self.assertTrue(wall)
+
+    def test_flow_chase_with_lod_steps(self):
+        screen = pygame.display.set_mode((1000, 1000))
+        background = make_background(screen)
+        np.vectorize(background.add_tile)(background.light_tile, range(100), tType='light')
+        flow = FlowField(NavGrid(WalkGrid(background)))
+        world = pygame.Rect((0, 0), background.world_size)
+        target = (500, 400)
+        flow.update(target)
+        enemies = self.make_enemies(screen, world)
+        batch = EnemyBatch(pygame.sprite.Group(enemies), world)
+        steps = np.array([0, 1, 2, 3] * 5)
+        batch.update(target, flow=flow, steps=steps)
+        start = batch.frame_count.copy()
+        for _ in range(2):
+            # the flow steps of the chasers must not replace the lod steps
+            batch.update(target, flow=flow, steps=steps)
+        self.assertTrue((batch.state == EnemyBatch.CHASE).any())
+        self.assertEqual((batch.frame_count - start).tolist(), (steps * 2).tolist())
+
+    def test_lod_steps_match_per_enemy_update(self):
+        screen = pygame.display.set_mode((200, 200))
+        world = pygame.Rect(0, 0, 2000, 2000)
+        target = (500, 400)
+        single = self.make_enemies(screen, world)
+        batched = self.make_enemies(screen, world)
+        batch = EnemyBatch(pygame.sprite.Group(batched), world)
+        # skipped, full, and enemies catching up on 2 and 3 frames
+        steps = np.array([0, 1, 2, 3] * 5)
+        for e, step in zip(single + batched, np.tile(steps, 2).tolist()):
+            e.lod_step = step
+        start = [e.rect.topleft for e in single]
+        for _ in range(3):
+            for e in single:
+                e.update([target])
+                e.agro_circle.update()
+            batch.update(target, steps=steps)
+            for e in batched:
+                e.update([target])
+        for a, b in zip(single, batched):
+            self.assertAlmostEqual(a.x, b.x)
+            self.assertAlmostEqual(a.y, b.y)
+            self.assertEqual(a.rect, b.rect)
+        self.assertEqual([e.rect.topleft for e in single[::4]], start[::4])
+
+    def test_scheduled_enemies_glide_between_decisions(self):
+        screen = pygame.display.set_mode((200, 200))
+        world = pygame.Rect(0, 0, 2000, 2000)
+        target = (500, 400)
+        reference = self.make_enemies(screen, world)
+        single = self.make_enemies(screen, world)
+        batched = self.make_enemies(screen, world)
+        batch = EnemyBatch(pygame.sprite.Group(batched), world)
+        for e in single:
+            e.scheduled = True
+        # everyone decides on the first frame, nobody on the next three
+        for frame in range(4):
+            think = np.full(len(batched), frame == 0)
+            for e in reference:
+                e.update([target])
+                e.agro_circle.update()
+            for e in single:
+                if frame == 0:
+                    e.think([target])
+                e.update([target])
+                e.agro_circle.update()
+            batch.update(target, think=think)
+            for e in batched:
+                e.update([target])
+        chasers = np.flatnonzero(batch.state == EnemyBatch.CHASE).tolist()
+        self.assertTrue(chasers)
+        for i in chasers:
+            self.assertAlmostEqual(single[i].x, batched[i].x)
+            self.assertAlmostEqual(single[i].y, batched[i].y)
+            # a straight chase at a standing target barely changes between decisions
+            self.assertAlmostEqual(single[i].x, reference[i].x, delta=1.5)
+            self.assertAlmostEqual(single[i].y, reference[i].y, delta=1.5)
+
+    def test_scheduled_decisions_scale_with_the_crowd(self):
+        screen = pygame.display.set_mode((200, 200))
+        world = pygame.Rect(0, 0, 4000, 4000)
+        img = pygame.Surface((40, 60))
+        decisions = {}
+        for n in (100, 2000):
+            random.seed(3)
+            enemies = [Enemy(screen, [[img, 2]], img, (random.randint(0, 3900), random.randint(0, 3900)), world)
+                       for _ in range(n)]
+            # EnemyGroup loads its rig from disk, the batch update only needs its movement settings
+            group = types.SimpleNamespace(batch=EnemyBatch(pygame.sprite.Group(enemies), world),
+                                          scheduler=AiScheduler(budget_ms=2.0), walk_grid=None, distance_field=None,
+                                          nav=None, flow=None, path_jobs=None, lod_tiers=None, lod_steps=None)
+            thought = []
+            for _ in range(20):
+                EnemyGroup.batch_update(group, [(2000, 2000), (1000, 3000)])
+                thought.append(group.scheduler.thought)
+            decisions[n] = np.mean(thought[5:])
+        # the moves of the whole crowd are not charged to the decisions, a bigger crowd gets at least as many turns
+        self.assertGreaterEqual(decisions[2000], decisions[100] * 0.9)
+
+    def test_timed_roaming_matches_per_enemy_update(self):
+        screen = pygame.display.set_mode((200, 200))
+        world = pygame.Rect(0, 0, 2000, 2000)
+        # out of every enemy's aggro range, everyone roams
+        target = (1900, 1900)
+        single = self.make_enemies(screen, world)
+        batched = self.make_enemies(screen, world)
+        single_timers, batch_timers = TimerWheel(), TimerWheel()
+        for e in single:
+            e.setTimers(single_timers)
+        for e in batched:
+            e.setTimers(batch_timers)
+        batch = EnemyBatch(pygame.sprite.Group(batched), world)
+        start = [e.rect.topleft for e in single]
+        for _ in range(70):
+            for e, kind in single_timers.advance():
+                e.wake(kind)
+            for e, kind in batch_timers.advance():
+                e.wake(kind)
+                batch.wake(e, kind)
+            for e in single:
+                e.update([target])
+                e.agro_circle.update()
+            batch.update(target)
+            for e in batched:
+                e.update([target])
+        for a, b in zip(single, batched):
+            self.assertAlmostEqual(a.x, b.x)
+            self.assertAlmostEqual(a.y, b.y)
+            self.assertEqual(a.roaming, b.roaming)
+        self.assertNotEqual([e.rect.topleft for e in single], start)
+        # one roam or rest timer and one goal timer per enemy
+        self.assertEqual(len(single_timers), 40)
+
+    def test_multiple_targets(self):
+        screen = pygame.display.set_mode((200, 200))
+        world = pygame.Rect(0, 0, 2000, 2000)
+        # one target on each side of the ring of enemies
+        targets = [(450, 500), (750, 500)]
+        single = self.make_enemies(screen, world)
+        batched = self.make_enemies(screen, world)
+        batch = EnemyBatch(pygame.sprite.Group(batched), world)
+        start = [e.rect.center for e in single]
+        for _ in range(5):
+            for e in single:
+                e.update(targets)
+                e.agro_circle.update()
+            batch.update(targets)
+            for e in batched:
+                e.update(targets)
+        for a, b in zip(single, batched):
+            self.assertAlmostEqual(a.x, b.x)
+            self.assertAlmostEqual(a.y, b.y)
+        # the enemies on each side went for the target on their side
+        moved = [np.subtract(e.rect.center, s) for e, s in zip(single, start)]
+        self.assertTrue(any(m[0] < 0 for m, s in zip(moved, start) if s[0] < 560))
+        self.assertTrue(any(m[0] > 0 for m, s in zip(moved, start) if s[0] > 640))
+        self.assertTrue((batch.state == EnemyBatch.CHASE).any())
+
+    def test_hidden_enemies_are_not_animated(self):
+        screen = pygame.display.set_mode((200, 200))
+        img = pygame.Surface((40, 60))
+        frames = [[pygame.Surface((40, 60)), 1], [pygame.Surface((40, 60)), 1]]
+        enemy = Enemy(screen, frames, img, (100, 100))
+        enemy.updateMe = True
+        enemy.handleAnimationState()
+        shown = enemy.image
+        enemy.visible = False
+        enemy.updateMe = True
+        enemy.handleAnimationState()
+        self.assertIs(enemy.image, shown)
+        self.assertEqual(enemy.walking_ani.frame_count, 1)
+
+    def test_roams_along_routes(self):
+        screen = pygame.display.set_mode((1000, 1000))
+        background = make_background(screen)
+        # 100x100 tiles, an L shaped floor
+        np.vectorize(background.add_tile)(background.light_tile, [0, 10, 20, 21, 22], tType='light')
+        walk_grid = WalkGrid(background)
+        nav = NavGrid(walk_grid)
+        world = pygame.Rect((0, 0), background.world_size)
+        random.seed(2)
+        img = pygame.Surface((40, 60))
+        enemies = [Enemy(screen, [[img, 2]], img, (120, 120), world) for _ in range(6)]
+        group = pygame.sprite.Group(enemies)
+        boxes = hb_group()
+        boxes.add([e.collisionSprite for e in enemies])
+        for e in enemies:
+            e.setNavigation(nav)
+            e.collisionSprite.update()
+        batch = EnemyBatch(group, world)
+        start = [e.rect.center for e in enemies]
+        for _ in range(600):
+            boxes.walkable_update(walk_grid)
+            batch.update((5000, 5000), walk_grid, nav=nav)
+            boxes.update()
+        self.assertFalse(boxes.walkable_update(walk_grid).any())
+        self.assertNotEqual([e.rect.center for e in enemies], start)
+        self.assertGreater(nav.hits + nav.misses, 0)
+
+class TestSimulationLod(unittest.TestCase):
+    def test_tiers(self):
+        lod = SimulationLod(near=100, far=300, reduced_every=4, dormant_every=8, hysteresis=20)
+        dist = np.array([50, 150, 500, 500])
+        visible = np.array([False, False, False, True])
+        tiers = lod.tiers(dist, visible, np.zeros(4, dtype=np.int8))
+        self.assertEqual(tiers.tolist(), [0, 1, 2, 0])
+        # promoted only once well inside the boundary, demoted right away
+        reduced = np.ones(3, dtype=np.int8)
+        self.assertEqual(lod.tiers(np.array([90, 70, 310]), np.zeros(3, dtype=bool), reduced).tolist(), [1, 0, 2])
+
+    def test_ticks_are_spread_and_catch_up(self):
+        lod = SimulationLod(near=100, far=300, reduced_every=4, dormant_every=8)
+        n = 8
+        tier = np.ones(n, dtype=np.int8)
+        last_tick = np.zeros(n, dtype=np.int64)
+        phase = np.arange(n)
+        dist = np.full(n, 200.0)
+        hidden = np.zeros(n, dtype=bool)
+        covered = np.zeros(n, dtype=np.int64)
+        for frame in range(1, 9):
+            tier, steps = lod.update(frame, dist, hidden, tier, last_tick, phase)
+            # two of the eight reduced entities tick each frame
+            self.assertEqual(int((steps > 0).sum()), 2)
+            covered += steps
+        # every skipped frame is made up on the next tick
+        self.assertEqual(covered.tolist(), last_tick.tolist())
+
+        # walking up to the focus ticks right away and covers the frames since the last tick
+        dist[0] = 10
+        tier, steps = lod.update(9, dist, hidden, tier, last_tick, phase)
+        self.assertEqual(tier[0], SimulationLod.FULL)
+        self.assertEqual(steps[0], 9 - covered[0])
+
+
+class TestAiScheduler(unittest.TestCase):
+    def test_round_robin_budget(self):
+        scheduler = AiScheduler(budget_ms=3.0)
+        entities = list(range(10))
+        # the first frame measures, everyone decides
+        self.assertEqual(scheduler.plan(entities), entities)
+        scheduler.spent(10, 0.010)
+        self.assertAlmostEqual(scheduler.stats()['cost_ms'], 1.0)
+        seen = []
+        for _ in range(4):
+            picked = scheduler.plan(entities)
+            self.assertEqual(len(picked), 3)
+            seen += picked
+            scheduler.spent(3, 0.003)
+        # round robin, nobody thinks twice before everyone had a turn
+        self.assertEqual(sorted(seen[:10]), entities)
+        self.assertLessEqual(scheduler.stats()['max_staleness'], 4)
+
+    def test_eligible_and_members(self):
+        scheduler = AiScheduler(budget_ms=2.0)
+        scheduler.cost = 0.001
+        entities = list('abcdef')
+        # b waits for its lod tick without losing its place
+        self.assertEqual(scheduler.plan(entities, lambda e: e != 'b'), ['a', 'c'])
+        self.assertEqual(scheduler.plan(entities), ['b', 'd'])
+        # new entities decide first, removed ones are forgotten
+        entities = ['z'] + entities[1:]
+        self.assertEqual(scheduler.plan(entities), ['z', 'e'])
+        self.assertNotIn('a', scheduler.last_think)
+        self.assertEqual(scheduler.staleness('f'), 3)
+        calls = []
+        self.assertEqual(scheduler.run(entities, calls.append), ['f', 'c'])
+        self.assertEqual(calls, ['f', 'c'])
+
+
+class TestTimerWheel(unittest.TestCase):
+    def test_timers_fire_on_their_tick(self):
+        random.seed(4)
+        # 4 slots and 2 levels cover 16 ticks, later timers go through the overflow list
+        wheel = TimerWheel(slots=4, levels=2)
+        canceled = wheel.schedule(100, ('canceled', 100))
+        scheduled = 0
+        fired = []
+        for tick in range(200):
+            if tick % 3 == 0:
+                delay = random.randint(1, 60)
+                wheel.schedule(delay, (tick, tick + delay))
+                scheduled += 1
+            if tick == 30:
+                wheel.cancel(canceled)
+            for name, due in wheel.advance():
+                fired.append(name)
+                self.assertEqual(wheel.now, due)
+        self.assertNotIn('canceled', fired)
+        self.assertEqual(len(fired) + len(wheel), scheduled)
+        # idle ticks fire nothing
+        self.assertEqual(TimerWheel().advance(100), [])
+
+
+class TestNavGrid(unittest.TestCase):
+    def test_paths_cache_and_goals(self):
+        screen = pygame.display.set_mode((200, 200))
+        background = make_background(screen)
+        # a U shaped corridor of 20x20 tiles: down column 0, along row 4, up column 4, and one cut off tile
+        corridor = [0, 10, 20, 30, 40, 41, 42, 43, 44, 34, 24, 14, 4, 99]
+        np.vectorize(background.add_tile)(background.light_tile, corridor, tType='light')
+        nav = NavGrid(WalkGrid(background), cache_size=2)
+        route = nav.find_path((10, 10), (90, 10))
+        self.assertEqual(route[-1], (90, 10))
+        cells = [nav.cell_of(p) for p in route]
+        self.assertTrue(all(nav.walkable(c) for c in cells))
+        # 4 down, 4 across, 4 up, diagonals would cut the walls at the corners
+        self.assertEqual(len(route), 12)
+        self.assertIsNone(nav.find_path((10, 10), (190, 190)))
+
+        nav.find_path((10, 10), (90, 10))
+        self.assertEqual((nav.hits, nav.misses), (1, 2))
+        # LRU eviction
+        nav.find_path((10, 30), (90, 10))
+        nav.find_path((10, 50), (90, 10))
+        self.assertNotIn(((0, 0), (0, 4)), nav.cache)
+
+        for _ in range(20):
+            goal = nav.random_goal((10, 10))
+            self.assertIsNotNone(nav.find_path((10, 10), goal))
+        self.assertEqual(nav.cell_of(nav.random_goal((190, 190))), (9, 9))
+
+        # a shortcut tile invalidates the cached paths
+        background.add_tile(background.light_tile, 2, tType='light')
+        background.add_tile(background.light_tile, 1, tType='light')
+        background.add_tile(background.light_tile, 3, tType='light')
+        self.assertEqual(len(nav.find_path((10, 10), (90, 10))), 4)
+
+    def test_path_jobs(self):
+        screen = pygame.display.set_mode((200, 200))
+        background = make_background(screen)
+        corridor = [0, 10, 20, 30, 40, 41, 42, 43, 44, 34, 24, 14, 4]
+        np.vectorize(background.add_tile)(background.light_tile, corridor, tType='light')
+        nav = NavGrid(WalkGrid(background))
+        jobs = PathJobs(nav, workers=2, max_apply=2)
+        routes = []
+        futures = [jobs.submit((10, 10), (90, 10 + i), routes.append) for i in range(3)]
+        futures.append(jobs.submit((10, 10), (190, 190), routes.append))
+        for future in futures:
+            future.result(timeout=5)
+        # results only reach the callbacks through apply, a few per frame
+        self.assertEqual(routes, [])
+        self.assertEqual(jobs.apply(), 2)
+        self.assertEqual(jobs.apply(), 2)
+        self.assertEqual(len(jobs), 0)
+        self.assertEqual([len(r) for r in routes[:3]], [12, 12, 12])
+        self.assertIsNone(routes[3])
+        # the main thread filled the shared cache
+        self.assertIn(((0, 0), (0, 4)), nav.cache)
+
+        # a route searched before a tile change is searched again on the new tiles
+        future = jobs.submit((10, 10), (90, 30), routes.append)
+        future.result(timeout=5)
+        np.vectorize(background.add_tile)(background.light_tile, [11, 12, 13], tType='light')
+        for _ in range(100):
+            if jobs.apply():
+                break
+            time.sleep(0.01)
+        self.assertEqual(jobs.resubmitted, 1)
+        self.assertEqual(len(routes[-1]), 5)
+
+        # a removed walker's jobs are dropped without running the callback or filling the cache
+        walker = object()
+        count = len(routes)
+        jobs.submit((10, 10), (50, 90), routes.append, owner=walker).result(timeout=5)
+        self.assertEqual(jobs.cancel(walker), 1)
+        self.assertEqual(jobs.apply(), 0)
+        self.assertEqual(len(routes), count)
+        self.assertNotIn(((0, 0), (4, 2)), nav.cache)
+        jobs.shutdown()
+
+    def test_flow_field(self):
+        screen = pygame.display.set_mode((200, 200))
+        background = make_background(screen)
+        corridor = [0, 10, 20, 30, 40, 41, 42, 43, 44, 34, 24, 14, 4, 99]
+        np.vectorize(background.add_tile)(background.light_tile, corridor, tType='light')
+        nav = NavGrid(WalkGrid(background))
+        flow = FlowField(nav)
+        self.assertTrue(flow.update((90, 10)))
+        self.assertFalse(flow.update((95, 15)), "same cell should not rebuild")
+        self.assertEqual(flow.cost[0, 0], 12)
+        # from the top of the left column the way to the right column is down first
+        self.assertEqual(flow.next_point((10, 10)), (10, 30))
+        self.assertEqual(flow.next_point((90, 90)), (90, 70))
+        # the target's own cell and unreachable cells head straight
+        self.assertIsNone(flow.next_point((90, 10)))
+        self.assertIsNone(flow.next_point((190, 190)))
+        self.assertEqual(flow.next_points([(10, 10), (190, 190)]).shape, (2, 2))
+        # only targets on the goal's cell can be chased along the field
+        self.assertEqual(flow.leads_to([(95, 15), (10, 10)]).tolist(), [True, False])
+
+        # costs match A* on a random map
+        rng = np.random.default_rng(7)
+        background = make_background(screen)
+        cells = np.flatnonzero(rng.random(100) > 0.3)
+        np.vectorize(background.add_tile)(background.light_tile, cells, tType='light')
+        nav = NavGrid(WalkGrid(background))
+        flow = FlowField(nav)
+        goal = divmod(int(cells[0]), 10)
+        flow.build(goal)
+        for cell in cells[1:].tolist():
+            start = divmod(cell, 10)
+            path = nav.astar(start, goal)
+            if path is None:
+                self.assertFalse(np.isfinite(flow.cost[start]))
+                continue
+            steps = [start, *path]
+            length = sum(math.dist(a, b) for a, b in zip(steps, steps[1:]))
+            self.assertAlmostEqual(flow.cost[start], length)
+
+class TestSpatialHash(unittest.TestCase):
+    def test_queries(self):
+        a, b, c = make_sprite(5, 5), make_sprite(200, 200), make_sprite(95, 5)
+        group = pygame.sprite.Group(a, c)
+        spatial_hash = SpatialHash(100)
+        for sprite in (a, b, c):
+            spatial_hash.insert(sprite)
+        # c spans two cells
+        self.assertEqual(len(spatial_hash.cells[(0, 0)]), 2)
+        self.assertEqual(spatial_hash.query_point((8, 8)), [a])
+        self.assertEqual(set(spatial_hash.query_rect(pygame.Rect(0, 0, 300, 300), group)), {a, c})
+        self.assertEqual(spatial_hash.query_radius((205, 205), 5), [b])
+
+        # moving inside a cell does not touch the buckets
+        a.rect.x += 10
+        self.assertEqual(spatial_hash.update_all(), 0)
+        b.rect.topleft = (10, 10)
+        self.assertEqual(spatial_hash.update_all(), 1)
+        self.assertEqual(set(spatial_hash.query_radius((10, 10), 20)), {a, b})
+        spatial_hash.remove(b)
+        self.assertEqual(len(spatial_hash), 2)
+        self.assertNotIn((2, 2), spatial_hash.cells)
+
+        # static sprites are left where they were inserted
+        wall = make_sprite(500, 500)
+        spatial_hash.insert(wall, static=True)
+        wall.rect.topleft = (0, 0)
+        self.assertEqual(spatial_hash.update_all(), 0)
+        self.assertEqual(spatial_hash.entries[wall], (5, 5, 5, 5))
+
+    def test_kd_tree_nearest_within(self):
+        rng = np.random.default_rng(3)
+        queries = rng.uniform(0, 1000, (300, 2))
+        radii = rng.uniform(0, 250, 300)
+        for m in (1, 7, 60):
+            points = rng.uniform(0, 1000, (m, 2))
+            index, dist = KDTree(points, leaf_size=4).nearest_within(queries, radii)
+            # same answer as checking every pair
+            pair_dist = np.hypot(*(queries[:, None] - points[None]).transpose(2, 0, 1))
+            in_range = pair_dist.min(axis=1) <= radii
+            self.assertEqual(index.tolist(), np.where(in_range, pair_dist.argmin(axis=1), -1).tolist())
+            self.assertTrue(np.allclose(dist, np.where(in_range, pair_dist.min(axis=1), np.inf)))
+        # the radius itself is in range, an empty tree finds nothing
+        self.assertEqual(KDTree([(3, 4)]).nearest_within([(0, 0)], 5)[0].tolist(), [0])
+        self.assertEqual(KDTree(np.empty((0, 2))).nearest_within([(0, 0)], 5)[0].tolist(), [-1])
+
+class TestPreciseCollision(unittest.TestCase):
+    def test_mask_overlap(self):
+        # a ring shaped element, its bounding box overlaps the box but its pixels do not
+        element = pygame.sprite.Sprite()
+        element.image = pygame.Surface((100, 100), pygame.SRCALPHA)
+        pygame.draw.circle(element.image, (255, 255, 255), (50, 50), 50, 10)
+        element.rect = element.image.get_rect()
+        box = make_sprite(45, 45)
+        masks = MaskCache()
+        self.assertEqual(collide_precise(box, [element], masks), [])
+        box.rect.topleft = (0, 45)
+        self.assertEqual(collide_precise(box, [element], masks), [element])
+        # masks are built once per surface
+        self.assertEqual(len(masks), 2)
+        box.rect.topleft = (300, 300)
+        self.assertEqual(collide_precise(box, [element], masks), [])
+
+class TestCollisionGeometry(unittest.TestCase):
+    def test_compile_and_query(self):
+        # two strokes: a dense horizontal line and an L shape
+        line = [[x, 100] for x in range(0, 200)]
+        corner = [[300, y] for y in range(0, 100)] + [[x, 100] for x in range(300, 400)]
+        self.assertEqual(len(split_strokes(line + corner)), 2)
+        geometry = CollisionGeometry.from_points(line + corner, tolerance=1)
+        self.assertEqual(len(geometry), 3)
+
+        self.assertTrue(geometry.rect_hits(pygame.Rect(50, 95, 10, 10)))
+        self.assertFalse(geometry.rect_hits(pygame.Rect(50, 50, 10, 10)))
+        self.assertEqual(len(geometry.query_rect(pygame.Rect(290, 90, 20, 20))), 2)
+        self.assertEqual(len(geometry.segment_hits((250, 50), (350, 50))), 1)
+        self.assertEqual(geometry.segment_hits((250, 50), (280, 50)), [])
+
+        loaded = CollisionGeometry.from_json(geometry.to_json())
+        self.assertEqual(loaded.segments.tolist(), geometry.segments.tolist())
+
+    def test_extract_from_image(self):
+        # a light 32x32 floor in a dark 64x64 image
+        surface = pygame.Surface((64, 64))
+        surface.fill((20, 20, 20))
+        surface.fill((200, 170, 110), pygame.Rect(16, 16, 32, 32))
+        mask = collision_extract.walkable_mask(pygame.surfarray.array3d(surface), color=(200, 170, 110))
+        grid, cell_size, geometry = collision_extract.extract(mask, cell=8, scale=(2, 2))
+        self.assertEqual(grid.shape, (8, 8))
+        self.assertEqual(int(grid.sum()), 16)
+        self.assertTrue(grid[2:6, 2:6].all())
+        self.assertEqual(cell_size, (16.0, 16.0))
+        # the square outline simplifies to its 4 sides, in world pixels
+        self.assertEqual(len(geometry), 4)
+        self.assertTrue(geometry.rect_hits(pygame.Rect(30, 60, 4, 4)))
+        self.assertFalse(geometry.rect_hits(pygame.Rect(60, 60, 4, 4)))
+
+
+class TestRectArray(unittest.TestCase):
+    def test_matches_pygame_rect(self):
+        rng = np.random.default_rng(3)
+        rects = [pygame.Rect(*xy, *wh) for xy, wh in zip(rng.integers(0, 100, (40, 2)).tolist(),
+                                                          rng.integers(0, 30, (40, 2)).tolist())]
+        array = RectArray(rects)
+        self.assertEqual(array.to_rects(), rects)
+        probe = pygame.Rect(40, 40, 25, 25)
+        self.assertEqual(array.intersects_rect(probe).tolist(), [r.colliderect(probe) for r in rects])
+        self.assertEqual(array.contains_point((50, 50)).tolist(), [r.collidepoint(50, 50) for r in rects])
+        others = rects[:7]
+        self.assertEqual(array.overlaps(others).tolist(), [[a.colliderect(b) for b in others] for a in rects])
+        self.assertEqual(array.bounds(), rects[0].unionall(rects[1:]))
+        self.assertEqual(array.union(probe).to_rects(), [r.union(probe) for r in rects])
+        hits = [i for i, r in enumerate(rects) if r.collidepoint(50, 50)]
+        self.assertEqual(array.pick((50, 50)), hits[-1] if hits else -1)
+        self.assertEqual(array[2], rects[2])
+
+
+if __name__ == '__main__':
+    # usage example:
+    # python -m unittest test_gameSystems.TestYSortGroup
+    unittest.main()